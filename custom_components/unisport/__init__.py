@@ -8,27 +8,114 @@ https://github.com/chenseanxy/hass_unisport
 from __future__ import annotations
 
 from datetime import timedelta
+from pathlib import Path
 from typing import TYPE_CHECKING
 
 from homeassistant.const import Platform
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
 from homeassistant.loader import async_get_loaded_integration
 
-from .api import UnisportApiClient
-from .const import DOMAIN, LOGGER
+from .api import UnisportApiClient, UnisportApiClientError, populartimes_url
+from .const import (
+    CONF_DEADBAND,
+    CONF_DEADBAND_MODE,
+    CONF_HEARTBEAT,
+    CONF_IMPORT_STATISTICS,
+    CONF_LOCATIONS,
+    CONF_MAX_INTERVAL,
+    CONF_OPEN_INTERVAL,
+    CONF_RECORD,
+    CONF_SCHEDULE_INTERVAL,
+    CONF_STALE_WINDOW,
+    CONF_STRICT_VALIDATION,
+    CONF_TENANT,
+    CONF_THRESHOLDS,
+    DEFAULT_DEADBAND,
+    DEFAULT_HEARTBEAT,
+    DEFAULT_MAX_INTERVAL,
+    DEFAULT_OPEN_INTERVAL,
+    DEFAULT_SCHEDULE_INTERVAL,
+    DEFAULT_STALE_WINDOW,
+    DEFAULT_TENANT,
+    DOMAIN,
+    LOGGER,
+)
 from .coordinator import UnisportDataUpdateCoordinator
 from .data import UnisportData
+from .deadband import DEADBAND_ABSOLUTE, UnisportDeadband
+from .fetcher import async_get_fetcher
+from .forecast import UnisportForecaster
+from .history import UnisportHistory
+from .metrics import UnisportMetrics
+from .recording import UnisportRecorder
+from .scheduler import UnisportPollScheduler
+from .services import async_setup_services
+from .serving import UnisportServingClient
+from .session import async_get_session
+from .snapshot import UnisportSnapshotStore
+from .thresholds import UnisportThreshold, UnisportThresholdEngine
+from .websocket_api import async_setup_websocket_api
 
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.typing import ConfigType
 
     from .data import UnisportConfigEntry
 
 PLATFORMS: list[Platform] = [
     Platform.SENSOR,
     Platform.BINARY_SENSOR,
+    Platform.CALENDAR,
 ]
 
+CONFIG_SCHEMA = cv.empty_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, _: ConfigType) -> bool:
+    """Set up the services and websocket commands of this integration."""
+    async_setup_services(hass)
+    async_setup_websocket_api(hass)
+    return True
+
+
+def _get_interval(
+    entry: UnisportConfigEntry,
+    key: str,
+    default: timedelta,
+) -> timedelta:
+    """Get an interval option, stored in minutes."""
+    if key not in entry.options:
+        return default
+    return timedelta(minutes=entry.options[key])
+
+
+def _get_location_ids(entry: UnisportConfigEntry) -> frozenset[int] | None:
+    """Get the ids of the selected locations, None for every location."""
+    location_ids = frozenset(
+        int(location_id) for location_id in entry.options.get(CONF_LOCATIONS, ())
+    )
+    return location_ids or None
+
+
+def _async_remove_unselected_devices(
+    hass: HomeAssistant,
+    entry: UnisportConfigEntry,
+    location_ids: frozenset[int],
+) -> None:
+    """Remove the devices, and so the entities, of unselected locations."""
+    device_registry = dr.async_get(hass)
+    selected = {f"{entry.entry_id}-{location_id}" for location_id in location_ids}
+    prefix = f"{entry.entry_id}-"
+    for device in dr.async_entries_for_config_entry(device_registry, entry.entry_id):
+        if any(
+            domain == DOMAIN
+            and identifier.startswith(prefix)
+            and identifier not in selected
+            for domain, identifier in device.identifiers
+        ):
+            device_registry.async_remove_device(device.id)
+
 
 # https://developers.home-assistant.io/docs/config_entries_index/#setting-up-an-entry
 async def async_setup_entry(
@@ -36,22 +123,125 @@ async def async_setup_entry(
     entry: UnisportConfigEntry,
 ) -> bool:
     """Set up this integration using UI."""
+    scheduler = UnisportPollScheduler(
+        open_interval=_get_interval(entry, CONF_OPEN_INTERVAL, DEFAULT_OPEN_INTERVAL),
+        max_interval=_get_interval(entry, CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL),
+        schedule_interval=_get_interval(
+            entry, CONF_SCHEDULE_INTERVAL, DEFAULT_SCHEDULE_INTERVAL
+        ),
+    )
     coordinator = UnisportDataUpdateCoordinator(
         hass=hass,
         logger=LOGGER,
+        config_entry=entry,
         name=DOMAIN,
-        update_interval=timedelta(minutes=5),
+        update_interval=scheduler.open_interval,
+        always_update=False,
+    )
+    # Cancels the scheduled opening and closing transitions too
+    entry.async_on_unload(coordinator.async_shutdown)
+    history = UnisportHistory(hass, entry.entry_id)
+    await history.async_load()
+    # The samples since the last delayed save would be lost otherwise
+    entry.async_on_unload(history.async_save)
+    forecaster = UnisportForecaster()
+    forecaster.seed(history)
+    snapshots = UnisportSnapshotStore(hass, entry.entry_id)
+    # Loaded again right away on a reload, and the pending delayed saves
+    # would write the files back after the entry is removed
+    entry.async_on_unload(snapshots.async_flush)
+    thresholds = UnisportThresholdEngine(
+        hass,
+        entry.entry_id,
+        [
+            UnisportThreshold.from_config(threshold)
+            for threshold in entry.options.get(CONF_THRESHOLDS, ())
+        ],
+    )
+    await thresholds.async_load()
+    entry.async_on_unload(thresholds.async_save)
+    entry.async_on_unload(thresholds.async_shutdown)
+    metrics = UnisportMetrics()
+    location_ids = _get_location_ids(entry)
+    if location_ids is not None:
+        _async_remove_unselected_devices(hass, entry, location_ids)
+    url = populartimes_url(entry.data.get(CONF_TENANT, DEFAULT_TENANT))
+    fetcher = async_get_fetcher(hass)
+    entry.async_on_unload(fetcher.async_register(url))
+    client = UnisportApiClient(
+        session=async_get_session(hass),
+        url=url,
+        strict=entry.options.get(CONF_STRICT_VALIDATION, False),
+        location_ids=location_ids,
+        metrics=metrics,
+        fetcher=fetcher,
+        recorder=UnisportRecorder(
+            Path(hass.config.path(f"{DOMAIN}_recordings", entry.entry_id))
+        )
+        if entry.options.get(CONF_RECORD, False)
+        else None,
+    )
+    serving = UnisportServingClient(
+        client,
+        max_age=_get_interval(entry, CONF_STALE_WINDOW, DEFAULT_STALE_WINDOW),
     )
     entry.runtime_data = UnisportData(
-        client=UnisportApiClient(
-            session=async_get_clientsession(hass),
-        ),
+        client=client,
+        serving=serving,
         integration=async_get_loaded_integration(hass, entry.domain),
         coordinator=coordinator,
+        scheduler=scheduler,
+        history=history,
+        forecaster=forecaster,
+        snapshots=snapshots,
+        metrics=metrics,
+        deadband=UnisportDeadband(
+            deadband=entry.options.get(CONF_DEADBAND, DEFAULT_DEADBAND),
+            mode=entry.options.get(CONF_DEADBAND_MODE, DEADBAND_ABSOLUTE),
+            heartbeat=_get_interval(entry, CONF_HEARTBEAT, DEFAULT_HEARTBEAT),
+            # The statistics are imported from the history instead, so that
+            # the recorder does not write a state row for every change
+            heartbeat_only=entry.options.get(CONF_IMPORT_STATISTICS, False),
+        ),
+        thresholds=thresholds,
+        fetcher=fetcher,
     )
 
-    # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
-    await coordinator.async_config_entry_first_refresh()
+    if entry.options.get(CONF_IMPORT_STATISTICS, False):
+        # Only load the recorder statistics when needed
+        from .external_statistics import (  # noqa: PLC0415
+            UnisportStatisticsImporter,
+        )
+
+        entry.runtime_data.statistics = UnisportStatisticsImporter(
+            hass, history, entry.data.get(CONF_TENANT, DEFAULT_TENANT)
+        )
+        entry.async_on_unload(entry.runtime_data.statistics.async_flush)
+
+    if (snapshot := await snapshots.async_load()) is not None:
+        locations, live_validations, updated = snapshot
+        try:
+            data = client.decode(locations, live_validations)
+        except UnisportApiClientError as exception:
+            LOGGER.warning("Ignoring the saved snapshot: %s", exception)
+        else:
+            # Only has the locations selected then, the ones selected since
+            # would not be set up until the first refresh
+            if location_ids is None or location_ids <= data["locations"].keys():
+                coordinator.async_set_stale_data(data)
+                # Serve it through failures for the rest of its staleness window
+                serving.last_success = updated
+    if coordinator.stale:
+        # Set the entities up from the snapshot right away, without waiting
+        # for the API
+        entry.async_create_background_task(
+            hass,
+            coordinator.async_refresh(),
+            f"{DOMAIN} first refresh",
+        )
+    else:
+        # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
+        await coordinator.async_config_entry_first_refresh()
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
@@ -67,10 +257,19 @@ async def async_unload_entry(
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
 
+async def async_remove_entry(
+    hass: HomeAssistant,
+    entry: UnisportConfigEntry,
+) -> None:
+    """Remove the data stored for an entry."""
+    await UnisportHistory(hass, entry.entry_id).async_remove()
+    await UnisportSnapshotStore(hass, entry.entry_id).async_remove()
+    await UnisportThresholdEngine(hass, entry.entry_id, ()).async_remove()
+
+
 async def async_reload_entry(
     hass: HomeAssistant,
     entry: UnisportConfigEntry,
 ) -> None:
     """Reload config entry."""
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
+    await hass.config_entries.async_reload(entry.entry_id)
@@ -2,20 +2,66 @@
 
 from __future__ import annotations
 
+import asyncio
+import datetime
+import hashlib
 import json
-import re
 import socket
+import time
+from functools import partial
+from http import HTTPStatus
 from typing import TYPE_CHECKING
 
 import aiohttp
-import async_timeout
+from aiohttp import hdrs
+from aiohttp.compression_utils import (
+    HAS_BROTLI,
+    BrotliDecompressor,
+    ZLibDecompressor,
+)
 
 from .const import LOGGER
-from .data import UnisportLocation
+from .data import UnisportDecoder
+from .metrics import (
+    SIZE_PAGE,
+    SIZE_PAYLOAD,
+    SIZE_WIRE,
+    STAGE_DECODE,
+    STAGE_DOWNLOAD,
+    STAGE_EXTRACT,
+    STAGE_FETCH,
+    STAGE_JSON,
+    STAGE_PARSE,
+    STAGE_RESPONSE,
+    UNIT_BYTES,
+    UNIT_MS,
+    UnisportMetrics,
+)
 
 if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Collection
     from typing import Any
 
+    from .fetcher import UnisportFetchScheduler
+    from .recording import UnisportRecorder, UnisportReplay
+
+# Size of the chunks read from the populartimes response body
+READ_CHUNK_SIZE = 64 * 1024
+# Most bytes read after the assignments to keep the connection alive, longer
+# rests of the page are not downloaded and the connection is closed instead
+DRAIN_LIMIT = 64 * 1024
+# Seconds to connect, including DNS and TLS, between two reads, and in total
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30, connect=5, sock_read=10)
+
+# Enkora hosts the populartimes page of several tenants
+POPULARTIMES_URL_TEMPLATE = "https://oma.enkora.fi/{tenant}/populartimes"
+POPULARTIMES_URL = POPULARTIMES_URL_TEMPLATE.format(tenant="unisport")
+
+
+def populartimes_url(tenant: str) -> str:
+    """Get the url of the populartimes page of an Enkora tenant."""
+    return POPULARTIMES_URL_TEMPLATE.format(tenant=tenant)
+
 
 class UnisportApiClientError(Exception):
     """Exception to indicate a general API error."""
@@ -43,68 +89,305 @@ def _verify_response_or_raise(response: aiohttp.ClientResponse) -> None:
     response.raise_for_status()
 
 
+class _AssignmentScanner:
+    """
+    Incrementally extract `const <name> = <value>;` assignments from a page.
+
+    Bytes are fed in chunks as they arrive, and searched for the wanted
+    assignments without decoding them. Only the bytes that may still hold an
+    assignment are kept, and only the matched values are copied out. A value
+    spans up to the last `;` of its line, matching the previous
+    `const <name> = (.*);` regexes.
+    """
+
+    def __init__(self, *names: str) -> None:
+        """Initialize the scanner for the given variable names."""
+        self._markers = {name: f"const {name} = ".encode() for name in names}
+        # Bytes kept between chunks, so that markers split across them are found
+        self._overlap = max(len(marker) for marker in self._markers.values()) - 1
+        self._buffer = bytearray()
+        # Name and start of the value being read until the end of its line
+        self._pending: tuple[str, int] | None = None
+        self._scanned = 0
+        self.values: dict[str, bytes] = {}
+
+    @property
+    def done(self) -> bool:
+        """Return true once every wanted assignment has been found."""
+        return len(self.values) == len(self._markers)
+
+    def feed(self, chunk: bytes) -> bool:
+        """Scan a chunk of the page, return true once everything is found."""
+        self._buffer += chunk
+        self._scan(final=False)
+        return self.done
+
+    def close(self) -> None:
+        """Scan whatever is left once the page has been read."""
+        if not self.done:
+            self._scan(final=True)
+        self._buffer.clear()
+        self._pending = None
+
+    def _scan(self, *, final: bool) -> None:
+        buffer = self._buffer
+        search_from = 0
+        while not self.done:
+            if self._pending is None:
+                self._pending = self._find_marker(search_from)
+                if self._pending is None:
+                    if not final:
+                        del buffer[: max(len(buffer) - self._overlap, 0)]
+                    return
+                self._scanned = self._pending[1]
+            name, start = self._pending
+            end = buffer.find(b"\n", self._scanned)
+            if end == -1:
+                if not final:
+                    self._scanned = len(buffer)
+                    return
+                end = len(buffer)
+            self._pending = None
+            stop = buffer.rfind(b";", start, end)
+            if stop != -1:
+                self.values[name] = bytes(buffer[start:stop])
+            # Other assignments may follow on the same line
+            search_from = start
+
+    def _find_marker(self, search_from: int) -> tuple[str, int] | None:
+        """Find the first marker still wanted, return its name and value start."""
+        found = None
+        for name, marker in self._markers.items():
+            if name in self.values:
+                continue
+            index = self._buffer.find(marker, search_from)
+            if index != -1 and (found is None or index < found[1]):
+                found = (name, index + len(marker))
+        return found
+
+
+async def _async_record(
+    recorder: UnisportRecorder,
+    values: dict[str, bytes],
+) -> None:
+    """Record the payloads of a response, in an executor."""
+    try:
+        await asyncio.get_running_loop().run_in_executor(
+            None,
+            recorder.append,
+            datetime.datetime.now(tz=datetime.UTC),
+            values,
+        )
+    except OSError as exception:
+        LOGGER.warning("Could not record the response: %s", exception)
+
+
+class _BodyDecoder:
+    """Decompress a response body as it is read, like aiohttp would."""
+
+    def __init__(self, encoding: str) -> None:
+        """Initialize for the content encoding of a response."""
+        encoding = encoding.strip().lower()
+        self._decompressor: ZLibDecompressor | BrotliDecompressor | None
+        if encoding in ("", "identity"):
+            self._decompressor = None
+        elif encoding in ("gzip", "deflate"):
+            self._decompressor = ZLibDecompressor(encoding=encoding)
+        elif encoding == "br" and HAS_BROTLI:
+            self._decompressor = BrotliDecompressor()
+        else:
+            msg = f"Unsupported content encoding {encoding}"
+            raise UnisportApiClientError(msg)
+
+    def decode(self, chunk: bytes) -> bytes:
+        """Decompress a chunk of the body."""
+        if self._decompressor is None:
+            return chunk
+        return self._decompressor.decompress_sync(chunk)
+
+    def flush(self) -> bytes:
+        """Decompress whatever is left once the body has been read."""
+        if self._decompressor is None:
+            return b""
+        return self._decompressor.flush()
+
+
+async def _drain(content: aiohttp.StreamReader, limit: int) -> int:
+    """Read the rest of a body, up to a limit, returns the bytes read."""
+    drained = 0
+    while drained <= limit and (chunk := await content.readany()):
+        drained += len(chunk)
+    return drained
+
+
+def _validators(response: aiohttp.ClientResponse) -> dict[str, str]:
+    """Get the validators of a response for the next conditional request."""
+    validators = {}
+    if etag := response.headers.get(hdrs.ETAG):
+        validators[hdrs.IF_NONE_MATCH] = etag
+    if last_modified := response.headers.get(hdrs.LAST_MODIFIED):
+        validators[hdrs.IF_MODIFIED_SINCE] = last_modified
+    return validators
+
+
 class UnisportApiClient:
     """Sample API Client."""
 
-    def __init__(
+    def __init__(  # noqa: PLR0913 Too many arguments
         self,
         session: aiohttp.ClientSession,
+        url: str = POPULARTIMES_URL,
+        *,
+        strict: bool = False,
+        location_ids: Collection[int] | None = None,
+        metrics: UnisportMetrics | None = None,
+        fetcher: UnisportFetchScheduler | None = None,
+        recorder: UnisportRecorder | None = None,
+        replay: UnisportReplay | None = None,
     ) -> None:
-        """Sample API Client."""
+        """
+        Sample API Client.
+
+        With a `recorder`, the payloads of every response are recorded. With
+        a `replay`, recorded payloads are served instead of requesting the
+        page.
+        """
         self._session = session
-        self._reg_locations = re.compile(r"const locations = (.*);")
-        self._reg_validations = re.compile(r"const live_validations = (.*);")
-
-    async def async_get_data(self) -> Any:
-        """Get data from the API."""
-        text = await self._api_wrapper(
-            method="get",
-            url="https://oma.enkora.fi/unisport/populartimes",
-            plain_response=True,
-        )
-        locations = self._reg_locations.search(text)
-        live_validations = self._reg_validations.search(text)
+        self._fetcher = fetcher
+        self._recorder = recorder
+        self._replay = replay
+        self.metrics = metrics if metrics is not None else UnisportMetrics()
+        self._url = url
+        self._decoder = UnisportDecoder(strict=strict, location_ids=location_ids)
+        # Cache validators (ETag / Last-Modified) per url
+        self._validators: dict[str, dict[str, str]] = {}
+        self._digest: bytes | None = None
+
+    @property
+    def url(self) -> str:
+        """Get the url of the populartimes page."""
+        return self._url
+
+    @property
+    def available_locations(self) -> dict[int, str]:
+        """Get the names of every location of the last response, selected or not."""
+        return self._decoder.available
 
-        if locations is None or live_validations is None:
+    async def async_get_data(self, *, force: bool = False) -> Any:
+        """
+        Get data from the API.
+
+        Returns None if the data has not changed since the previous call,
+        either because the server answered 304 Not Modified or because the
+        extracted payloads hash to the same digest. Use `force` to always
+        get a full result.
+        """
+        if force:
+            self._validators.pop(self._url, None)
+        with self.metrics.timer(STAGE_FETCH):
+            if self._replay is not None:
+                values = self._replay.values()
+            else:
+                values = await self._api_wrapper(
+                    method="get",
+                    url=self._url,
+                    reader=self._read_populartimes,
+                    conditional=True,
+                )
+        if values is None:
+            LOGGER.debug("Populartimes not modified")
+            return None
+        if "locations" not in values or "live_validations" not in values:
+            # Do not let a broken page be answered by 304s from now on
+            self._validators.pop(self._url, None)
             msg = "Failed to parse locations or live validations"
             raise UnisportApiClientError(msg)
 
-        locations = json.loads(locations.group(1))
-        live_validations = json.loads(live_validations.group(1))
-        LOGGER.debug("Got live_validations: %s", live_validations)
-        LOGGER.debug("Got locations: %s", locations)
-        if not live_validations:
-            live_validations = {}
-        return {
-            "locations": {int(k): UnisportLocation(**v) for k, v in locations.items()},
-            "live_validations": {int(k): int(v) for k, v in live_validations.items()},
-        }
-
-    async def _api_wrapper(
+        if self._recorder is not None:
+            await _async_record(self._recorder, values)
+        self.metrics.add(
+            SIZE_PAYLOAD,
+            len(values["locations"]) + len(values["live_validations"]),
+            UNIT_BYTES,
+        )
+        digest = hashlib.blake2b(values["locations"], digest_size=16)
+        digest.update(b"\0")
+        digest.update(values["live_validations"])
+        if not force and digest.digest() == self._digest:
+            LOGGER.debug("Populartimes payloads unchanged")
+            return None
+
+        try:
+            with self.metrics.timer(STAGE_PARSE):
+                with self.metrics.timer(STAGE_JSON):
+                    locations = json.loads(values["locations"])
+                    live_validations = json.loads(values["live_validations"])
+                LOGGER.debug("Got live_validations: %s", live_validations)
+                LOGGER.debug("Got locations: %s", locations)
+                with self.metrics.timer(STAGE_DECODE):
+                    result = self._decoder.decode(locations, live_validations)
+        except (KeyError, TypeError, ValueError, AttributeError) as exception:
+            self._validators.pop(self._url, None)
+            msg = f"Failed to decode locations or live validations - {exception!r}"
+            raise UnisportApiClientError(msg) from exception
+        self._digest = digest.digest()
+        return result
+
+    def decode(self, locations: Any, live_validations: Any) -> dict[str, Any]:
+        """
+        Decode payloads obtained elsewhere, such as a persisted snapshot.
+
+        Shares the opening hours of the decoded locations with later polls.
+        Raises `UnisportApiClientError` on invalid payloads.
+        """
+        try:
+            return self._decoder.decode(locations, live_validations)
+        except (KeyError, TypeError, ValueError, AttributeError) as exception:
+            msg = f"Failed to decode locations or live validations - {exception!r}"
+            raise UnisportApiClientError(msg) from exception
+
+    async def _api_wrapper(  # noqa: PLR0913 Too many arguments
         self,
         method: str,
         url: str,
         data: dict | None = None,
         headers: dict | None = None,
         *,
-        plain_response: bool = False,
+        reader: Callable[[aiohttp.ClientResponse], Awaitable[Any]] | None = None,
+        conditional: bool = False,
     ) -> Any:
-        """Get information from the API."""
+        """
+        Get information from the API.
+
+        With `conditional`, the validators of the previous response are sent
+        along, and None is returned if the server answers 304 Not Modified.
+        With a fetch scheduler, requests without a body are shared with the
+        same requests of other entries in flight.
+        """
+        if conditional and url in self._validators:
+            headers = {**(headers or {}), **self._validators[url]}
+        fetch = partial(
+            self._fetch,
+            method,
+            url,
+            data,
+            headers,
+            reader=reader,
+            conditional=conditional,
+        )
         try:
-            async with async_timeout.timeout(10):
-                response = await self._session.request(
-                    method=method,
-                    url=url,
-                    headers=headers,
-                    json=data,
-                )
-                _verify_response_or_raise(response)
-                return (
-                    await response.json()
-                    if not plain_response
-                    else await response.text()
+            if self._fetcher is not None and data is None:
+                modified, result, validators = await self._fetcher.async_fetch(
+                    (
+                        method,
+                        url,
+                        frozenset((headers or {}).items()),
+                        reader.__name__ if reader is not None else None,
+                    ),
+                    fetch,
                 )
-
+            else:
+                modified, result, validators = await fetch()
         except TimeoutError as exception:
             msg = f"Timeout error fetching information - {exception}"
             raise UnisportApiClientCommunicationError(
@@ -120,3 +403,89 @@ class UnisportApiClient:
             raise UnisportApiClientError(
                 msg,
             ) from exception
+        if not modified:
+            return None
+        if conditional:
+            if validators:
+                self._validators[url] = validators
+            else:
+                self._validators.pop(url, None)
+        return result
+
+    async def _fetch(  # noqa: PLR0913 Too many arguments
+        self,
+        method: str,
+        url: str,
+        data: dict | None,
+        headers: dict | None,
+        *,
+        reader: Callable[[aiohttp.ClientResponse], Awaitable[Any]] | None,
+        conditional: bool,
+    ) -> tuple[bool, Any, dict[str, str]]:
+        """
+        Send a request and read the response.
+
+        Returns whether the response was not a 304 Not Modified, the result
+        and the validators of the response.
+        """
+        with self.metrics.timer(STAGE_RESPONSE):
+            response = await self._session.request(
+                method=method,
+                url=url,
+                headers=headers,
+                json=data,
+                timeout=REQUEST_TIMEOUT,
+                # Readers decompress the body themselves, to count the bytes
+                # received
+                auto_decompress=reader is None,
+                # Connection figures, see `session.py`
+                trace_request_ctx=self.metrics,
+            )
+        _verify_response_or_raise(response)
+        if conditional and response.status == HTTPStatus.NOT_MODIFIED:
+            response.release()
+            return False, None, {}
+        result = await response.json() if reader is None else await reader(response)
+        return True, result, _validators(response)
+
+    async def _read_populartimes(
+        self,
+        response: aiohttp.ClientResponse,
+    ) -> dict[str, bytes]:
+        """
+        Stream the populartimes page and extract the embedded JSON values.
+
+        Once both assignments have been seen, the rest of the page is only
+        read if it is short, to keep the connection alive for the next
+        request, otherwise the connection is closed without downloading it.
+        """
+        scanner = _AssignmentScanner("locations", "live_validations")
+        decoder = _BodyDecoder(response.headers.get(hdrs.CONTENT_ENCODING, ""))
+        size = 0
+        wire = 0
+        extracting = 0.0
+        try:
+            with self.metrics.timer(STAGE_DOWNLOAD):
+                async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+                    wire += len(chunk)
+                    decoded = decoder.decode(chunk)
+                    size += len(decoded)
+                    start = time.perf_counter()
+                    done = scanner.feed(decoded)
+                    extracting += time.perf_counter() - start
+                    if done:
+                        break
+                else:
+                    scanner.feed(decoder.flush())
+                    scanner.close()
+                if scanner.done:
+                    wire += await _drain(response.content, DRAIN_LIMIT)
+        finally:
+            if response.content.at_eof():
+                response.release()
+            else:
+                response.close()
+        self.metrics.add(STAGE_EXTRACT, extracting * 1000, UNIT_MS)
+        self.metrics.add(SIZE_PAGE, size, UNIT_BYTES)
+        self.metrics.add(SIZE_WIRE, wire, UNIT_BYTES)
+        return scanner.values
@@ -10,7 +10,7 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntityDescription,
 )
 
-from .entity import UnisportEntity
+from .entity import UnisportEntity, async_add_location_entities
 
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
@@ -27,18 +27,23 @@ async def async_setup_entry(
 ) -> None:
     """Set up the binary_sensor platform."""
     coordinator = entry.runtime_data.coordinator
-    async_add_entities(
-        UnisportOpenStatusSensor(
-            coordinator=coordinator,
-            location=location,
-        )
-        for location in coordinator.data.get("locations", {}).values()
+    async_add_location_entities(
+        entry,
+        async_add_entities,
+        lambda location: [
+            UnisportOpenStatusSensor(
+                coordinator=coordinator,
+                location=location,
+            )
+        ],
     )
 
 
 class UnisportOpenStatusSensor(UnisportEntity, BinarySensorEntity):
     """Unisport Open Status Sensor class."""
 
+    _schedule_dependent = True
+
     def __init__(
         self,
         coordinator: UnisportDataUpdateCoordinator,
@@ -0,0 +1,87 @@
+"""Calendar platform for unisport."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+from homeassistant.util import dt as dt_util
+
+from .const import ATTRIBUTION
+from .entity import entry_device_info
+
+if TYPE_CHECKING:
+    import datetime
+
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+    from .data import UnisportConfigEntry
+    from .schedule import UnisportOpeningIndex
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,  # noqa: ARG001 Unused function argument: `hass`
+    entry: UnisportConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the calendar platform."""
+    async_add_entities([UnisportOpeningHoursCalendar(entry)])
+
+
+class UnisportOpeningHoursCalendar(CalendarEntity):
+    """Unisport opening hours of every location Calendar class."""
+
+    _attr_attribution = ATTRIBUTION
+    _attr_should_poll = False
+    _attr_name = "Unisport Opening Hours"
+    _attr_icon = "mdi:calendar-clock"
+
+    def __init__(self, entry: UnisportConfigEntry) -> None:
+        """Initialize the calendar class."""
+        self._index = entry.runtime_data.coordinator.opening_index
+        self._attr_unique_id = f"{entry.entry_id}-opening_hours"
+        self._attr_device_info = entry_device_info(entry)
+
+    async def async_added_to_hass(self) -> None:
+        """Update when the opening hours change."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._index.async_add_listener(self.async_write_ha_state),
+        )
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        """Return the opening in progress, or the next one."""
+        interval = self._index.next_interval(dt_util.now())
+        if interval is None:
+            return None
+        return _event(self._index, *interval)
+
+    async def async_get_events(
+        self,
+        hass: HomeAssistant,  # noqa: ARG002 Unused method argument: `hass`
+        start_date: datetime.datetime,
+        end_date: datetime.datetime,
+    ) -> list[CalendarEvent]:
+        """Return the openings of every location overlapping a range."""
+        return [
+            _event(self._index, *interval)
+            for interval in self._index.between(start_date, end_date)
+        ]
+
+
+def _event(
+    index: UnisportOpeningIndex,
+    opening: datetime.datetime,
+    closing: datetime.datetime,
+    location_id: int,
+) -> CalendarEvent:
+    name = index.name(location_id) or str(location_id)
+    return CalendarEvent(
+        start=opening,
+        end=closing,
+        summary=name,
+        location=name,
+        uid=f"{location_id}-{opening.isoformat()}",
+    )
@@ -2,10 +2,165 @@
 
 from __future__ import annotations
 
+import re
+from typing import TYPE_CHECKING
+
+import voluptuous as vol
 from homeassistant import config_entries
-from slugify import slugify
+from homeassistant.core import callback
+from homeassistant.helpers import selector
+
+from .api import (
+    UnisportApiClient,
+    UnisportApiClientCommunicationError,
+    UnisportApiClientError,
+    populartimes_url,
+)
+from .const import (
+    CONF_DEADBAND,
+    CONF_DEADBAND_MODE,
+    CONF_HEARTBEAT,
+    CONF_IMPORT_STATISTICS,
+    CONF_LOCATIONS,
+    CONF_MAX_INTERVAL,
+    CONF_OPEN_INTERVAL,
+    CONF_RECORD,
+    CONF_SCHEDULE_INTERVAL,
+    CONF_STALE_WINDOW,
+    CONF_STRICT_VALIDATION,
+    CONF_TENANT,
+    CONF_THRESHOLDS,
+    DEFAULT_DEADBAND,
+    DEFAULT_HEARTBEAT,
+    DEFAULT_MAX_INTERVAL,
+    DEFAULT_OPEN_INTERVAL,
+    DEFAULT_SCHEDULE_INTERVAL,
+    DEFAULT_STALE_WINDOW,
+    DEFAULT_TENANT,
+    DOMAIN,
+    LOGGER,
+)
+from .deadband import DEADBAND_ABSOLUTE, DEADBAND_RELATIVE
+from .session import async_get_session
+from .thresholds import THRESHOLDS_SCHEMA
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+    from datetime import timedelta
+
+    from .data import UnisportConfigEntry
+
+
+# A path segment of the Enkora urls
+TENANT_PATTERN = re.compile(r"[A-Za-z0-9_-]+")
+
+USER_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_TENANT, default=DEFAULT_TENANT): selector.TextSelector(),
+    }
+)
+
+
+def _minutes_selector(maximum: int) -> selector.NumberSelector:
+    return selector.NumberSelector(
+        selector.NumberSelectorConfig(
+            min=1,
+            max=maximum,
+            step=1,
+            unit_of_measurement="min",
+            mode=selector.NumberSelectorMode.BOX,
+        ),
+    )
+
+
+def _minutes(interval: timedelta) -> int:
+    return int(interval.total_seconds() // 60)
+
+
+OPTIONS_SCHEMA = vol.Schema(
+    {
+        vol.Required(
+            CONF_OPEN_INTERVAL,
+            default=_minutes(DEFAULT_OPEN_INTERVAL),
+        ): _minutes_selector(60),
+        vol.Required(
+            CONF_MAX_INTERVAL,
+            default=_minutes(DEFAULT_MAX_INTERVAL),
+        ): _minutes_selector(24 * 60),
+        vol.Required(
+            CONF_SCHEDULE_INTERVAL,
+            default=_minutes(DEFAULT_SCHEDULE_INTERVAL),
+        ): _minutes_selector(24 * 60),
+        vol.Required(
+            CONF_STALE_WINDOW,
+            default=_minutes(DEFAULT_STALE_WINDOW),
+        ): _minutes_selector(7 * 24 * 60),
+        vol.Required(CONF_DEADBAND, default=DEFAULT_DEADBAND): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                max=100,
+                step=1,
+                mode=selector.NumberSelectorMode.BOX,
+            ),
+        ),
+        vol.Required(
+            CONF_DEADBAND_MODE,
+            default=DEADBAND_ABSOLUTE,
+        ): selector.SelectSelector(
+            selector.SelectSelectorConfig(
+                options=[DEADBAND_ABSOLUTE, DEADBAND_RELATIVE],
+                translation_key=CONF_DEADBAND_MODE,
+                mode=selector.SelectSelectorMode.DROPDOWN,
+            ),
+        ),
+        vol.Required(
+            CONF_HEARTBEAT,
+            default=_minutes(DEFAULT_HEARTBEAT),
+        ): _minutes_selector(24 * 60),
+        vol.Required(
+            CONF_IMPORT_STATISTICS,
+            default=False,
+        ): selector.BooleanSelector(),
+        vol.Required(CONF_STRICT_VALIDATION, default=False): selector.BooleanSelector(),
+        vol.Required(CONF_RECORD, default=False): selector.BooleanSelector(),
+        vol.Optional(CONF_THRESHOLDS): selector.ObjectSelector(),
+    }
+)
 
-from .const import DOMAIN, LOGGER
+
+def _options_schema(locations: Mapping[int, str]) -> vol.Schema:
+    """Get the options schema, with a selector of the known locations."""
+    if not locations:
+        return OPTIONS_SCHEMA
+    return OPTIONS_SCHEMA.extend(
+        {
+            vol.Optional(CONF_LOCATIONS): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=[
+                        selector.SelectOptionDict(value=str(location_id), label=name)
+                        for location_id, name in sorted(
+                            locations.items(), key=lambda item: item[1]
+                        )
+                    ],
+                    multiple=True,
+                    mode=selector.SelectSelectorMode.LIST,
+                ),
+            ),
+        }
+    )
+
+
+def _known_locations(entry: UnisportConfigEntry) -> dict[int, str]:
+    """Get the names of every location, selected or not, of a loaded entry."""
+    if entry.state is not config_entries.ConfigEntryState.LOADED:
+        return {}
+    runtime_data = entry.runtime_data
+    return runtime_data.client.available_locations or {
+        location_id: location.name
+        for location_id, location in runtime_data.coordinator.data.get(
+            "locations", {}
+        ).items()
+    }
 
 
 class UnisportFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
@@ -13,20 +168,90 @@ class UnisportFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        _: config_entries.ConfigEntry,
+    ) -> UnisportOptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return UnisportOptionsFlowHandler()
+
     async def async_step_user(
         self,
-        _: dict | None = None,
+        user_input: dict | None = None,
     ) -> config_entries.ConfigFlowResult:
-        """Handle a flow initialized by the user."""
-        LOGGER.debug("Setting up unisport")
-        await self.async_set_unique_id(
-            ## Do NOT use this in production code
-            ## The unique_id should never be something that can change
-            ## https://developers.home-assistant.io/docs/config_entries_config_flow_handler#unique-ids
-            unique_id=slugify("unisport"),
+        """
+        Handle a flow initialized by the user.
+
+        Several entries may track the same tenant, for example with different
+        locations, so there is no unique id.
+        """
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            tenant = user_input[CONF_TENANT]
+            LOGGER.debug("Setting up unisport for %s", tenant)
+            errors = await self._async_validate_tenant(tenant)
+            if not errors:
+                return self.async_create_entry(
+                    title="Unisport" if tenant == DEFAULT_TENANT else tenant,
+                    data={CONF_TENANT: tenant},
+                )
+        return self.async_show_form(
+            step_id="user",
+            data_schema=self.add_suggested_values_to_schema(USER_SCHEMA, user_input),
+            errors=errors,
+        )
+
+    async def _async_validate_tenant(self, tenant: str) -> dict[str, str]:
+        """Check that a tenant has a populartimes page, returns the errors."""
+        if not TENANT_PATTERN.fullmatch(tenant):
+            return {CONF_TENANT: "invalid_tenant"}
+        client = UnisportApiClient(
+            session=async_get_session(self.hass),
+            url=populartimes_url(tenant),
         )
-        self._abort_if_unique_id_configured()
-        return self.async_create_entry(
-            title="Unisport",
-            data={},
+        try:
+            await client.async_get_data()
+        except UnisportApiClientCommunicationError as exception:
+            LOGGER.warning("Could not reach %s: %s", client.url, exception)
+            return {"base": "cannot_connect"}
+        except UnisportApiClientError as exception:
+            LOGGER.warning("No populartimes at %s: %s", client.url, exception)
+            return {CONF_TENANT: "invalid_tenant"}
+        return {}
+
+
+class UnisportOptionsFlowHandler(config_entries.OptionsFlow):
+    """Options flow for Unisport."""
+
+    async def async_step_init(
+        self,
+        user_input: dict | None = None,
+    ) -> config_entries.ConfigFlowResult:
+        """Manage the refresh intervals, validation and locations."""
+        locations = _known_locations(self.config_entry)
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            if not locations and CONF_LOCATIONS in self.config_entry.options:
+                # The selector was not shown, keep the selection
+                user_input[CONF_LOCATIONS] = self.config_entry.options[CONF_LOCATIONS]
+            try:
+                if CONF_THRESHOLDS in user_input:
+                    user_input[CONF_THRESHOLDS] = THRESHOLDS_SCHEMA(
+                        user_input[CONF_THRESHOLDS]
+                    )
+            except vol.Invalid as exception:
+                LOGGER.debug("Invalid thresholds: %s", exception)
+                errors[CONF_THRESHOLDS] = "invalid_thresholds"
+            else:
+                return self.async_create_entry(data=user_input)
+        # Without a selection nothing is ticked, which keeps following every
+        # location, including the ones added upstream later
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(
+                _options_schema(locations),
+                self.config_entry.options if user_input is None else user_input,
+            ),
+            errors=errors,
         )
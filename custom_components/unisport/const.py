@@ -1,5 +1,6 @@
 """Constants for unisport."""
 
+from datetime import timedelta
 from logging import Logger, getLogger
 
 import pytz
@@ -12,5 +13,41 @@ ATTRIBUTION = "Data from unisport.fi"
 UNISPORT_TZ_NAME = "Europe/Helsinki"
 UNISPORT_TZ = pytz.timezone(UNISPORT_TZ_NAME)
 
+EVENT_OCCUPANCY_THRESHOLD = "unisport_occupancy_threshold"
+
 STATE_OPEN = "open"
 STATE_CLOSED = "closed"
+
+ATTR_POPULAR_TIMES = "popular_times"
+ATTR_STALE = "stale"
+ATTR_AGE = "age"
+ATTR_LOCATION_ID = "location_id"
+ATTR_VISITORS = "visitors"
+
+# Data, path of the Enkora tenant
+CONF_TENANT = "tenant"
+DEFAULT_TENANT = "unisport"
+
+# Options, intervals in minutes
+CONF_OPEN_INTERVAL = "open_interval"
+CONF_MAX_INTERVAL = "max_interval"
+CONF_SCHEDULE_INTERVAL = "schedule_interval"
+CONF_STRICT_VALIDATION = "strict_validation"
+CONF_STALE_WINDOW = "stale_window"
+CONF_DEADBAND = "deadband"
+CONF_DEADBAND_MODE = "deadband_mode"
+CONF_HEARTBEAT = "heartbeat"
+CONF_IMPORT_STATISTICS = "import_statistics"
+# Record the payloads of every response, for replays
+CONF_RECORD = "record"
+# List of thresholds, see `thresholds.THRESHOLD_SCHEMA`
+CONF_THRESHOLDS = "thresholds"
+# Ids of the selected locations, as strings, every location if empty
+CONF_LOCATIONS = "locations"
+
+DEFAULT_OPEN_INTERVAL = timedelta(minutes=5)
+DEFAULT_MAX_INTERVAL = timedelta(minutes=15)
+DEFAULT_SCHEDULE_INTERVAL = timedelta(hours=6)
+DEFAULT_STALE_WINDOW = timedelta(hours=1)
+DEFAULT_DEADBAND = 0
+DEFAULT_HEARTBEAT = timedelta(hours=1)
@@ -2,18 +2,49 @@
 
 from __future__ import annotations
 
+import datetime
+from functools import partial
 from typing import TYPE_CHECKING, Any
 
+from homeassistant.core import CALLBACK_TYPE, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.event import async_track_point_in_utc_time
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
 from .api import (
     UnisportApiClientAuthenticationError,
     UnisportApiClientError,
 )
+from .const import UNISPORT_TZ
+from .metrics import COUNT_WRITES, STAGE_WRITE
+from .network import UnisportNetwork
+from .schedule import UnisportOpeningIndex, next_local_midnight
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+
     from .data import UnisportConfigEntry
+    from .profiler import UnisportProfiler
+
+
+def _diff_locations(old: dict[str, Any], new: dict[str, Any]) -> set[int]:
+    """Return ids of the locations whose visitors, capacity or schedule changed."""
+    old_locations = old.get("locations", {})
+    new_locations = new.get("locations", {})
+    old_validations = old.get("live_validations", {})
+    new_validations = new.get("live_validations", {})
+    return {
+        location_id
+        for location_id in old_locations.keys() | new_locations.keys()
+        # Unchanged locations are the same objects, see `UnisportDecoder`
+        if (
+            (old_location := old_locations.get(location_id))
+            is not (new_location := new_locations.get(location_id))
+            and old_location != new_location
+        )
+        or old_validations.get(location_id, 0) != new_validations.get(location_id, 0)
+    }
 
 
 # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
@@ -22,11 +53,260 @@ class UnisportDataUpdateCoordinator(DataUpdateCoordinator):
 
     config_entry: UnisportConfigEntry
 
+    # Ids of the locations changed by the last refresh, None meaning everything
+    # (first refresh, recovery from a failed one, ...)
+    changed_locations: set[int] | None = None
+    # Whether the data is the persisted snapshot of a previous run, not yet
+    # refreshed from the API
+    stale = False
+    # Profiles the next update cycles, see the `profile` service
+    profiler: UnisportProfiler | None = None
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize."""
+        super().__init__(*args, **kwargs)
+        # Location id -> listeners to update on opening / closing / midnight
+        self._schedule_listeners: dict[int, list[CALLBACK_TYPE]] = {}
+        # Location id -> cancel callback of the next scheduled transition
+        self._transitions: dict[int, CALLBACK_TYPE] = {}
+        # Totals over every location
+        self.network = UnisportNetwork()
+        # Opening hours of every location, for the calendar
+        self.opening_index = UnisportOpeningIndex()
+
+    async def _async_refresh(self, *args: Any, **kwargs: Any) -> None:
+        """Refresh data and update the listeners, under the profiler if any."""
+        if (profiler := self.profiler) is None:
+            await super()._async_refresh(*args, **kwargs)
+        else:
+            with profiler.cycle():
+                await super()._async_refresh(*args, **kwargs)
+        # Once the refresh is over, including the state writes
+        self.config_entry.runtime_data.metrics.async_notify()
+        if profiler is not None and profiler.finished and self.profiler is profiler:
+            self.profiler = None
+            self.config_entry.async_create_background_task(
+                self.hass, profiler.async_write(self.hass), "unisport profile"
+            )
+
     async def _async_update_data(self) -> Any:
         """Update data via library."""
+        runtime_data = self.config_entry.runtime_data
+        serving = runtime_data.serving
+        # Every entity got an `age` attribute while serving stale data, they
+        # are all updated on recovery
+        recovering = serving.serving_stale
+        previous = (
+            self.data
+            if self.last_update_success and not self.stale and not recovering
+            else None
+        )
+        self.changed_locations = None
         try:
-            return await self.config_entry.runtime_data.client.async_get_data()
+            data = await serving.async_get_data(force=self.data is None or self.stale)
         except UnisportApiClientAuthenticationError as exception:
             raise ConfigEntryAuthFailed(exception) from exception
         except UnisportApiClientError as exception:
+            self.update_interval = serving.retry_delay()
             raise UpdateFailed(exception) from exception
+
+        if serving.serving_stale:
+            # Keep serving the last good data, without adding it to the history
+            # again. Update every entity for their `age` attribute, which the
+            # refresh does not do by itself when handed back the same data
+            self.update_interval = serving.retry_delay()
+            self.logger.debug(
+                "Serving stale data, next try in %s: %s",
+                self.update_interval,
+                serving.last_error,
+            )
+            if self.last_update_success:
+                self.async_update_listeners()
+            return self.data
+
+        snapshot = data if data is not None else self.data
+        now = dt_util.utcnow()
+        visitors = {
+            location_id: snapshot["live_validations"].get(location_id, 0)
+            for location_id in snapshot["locations"]
+        }
+        runtime_data.history.add(now, visitors)
+        runtime_data.forecaster.add(now, visitors)
+        if runtime_data.statistics is not None:
+            runtime_data.statistics.add(now, snapshot["locations"])
+        # Spread from the polls of other tenants
+        self.update_interval = runtime_data.fetcher.align(
+            runtime_data.client.url,
+            runtime_data.scheduler.next_interval(
+                snapshot["locations"].values(),
+                changed=data is not None,
+            ),
+        )
+        self.logger.debug("Next refresh in %s", self.update_interval)
+
+        self.stale = False
+        if data is None:
+            # Nothing changed upstream: hand back the current snapshot, so that
+            # listeners are not notified (see `always_update`)
+            if previous is not None:
+                self.changed_locations = set()
+            elif recovering and self.last_update_success:
+                # Not updated by the refresh when handed back the same data
+                self.async_update_listeners()
+            return self.data
+        if previous is not None:
+            self.changed_locations = _diff_locations(previous, data)
+        runtime_data.snapshots.async_save(data, now)
+        return data
+
+    @callback
+    def async_set_stale_data(self, data: dict[str, Any]) -> None:
+        """
+        Start from a persisted snapshot, before the first refresh.
+
+        Entities can be set up from it right away, and are all updated once
+        the first refresh succeeds.
+        """
+        self.data = data
+        self.stale = True
+        self._async_update_network(data.get("locations", {}).keys())
+        self._async_update_opening_index()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """
+        Update listeners, skipping the ones of unchanged locations.
+
+        Entities subscribe with their location id as context, listeners without
+        a context are always updated.
+        """
+        self._async_schedule_transitions()
+        if self.changed_locations is None:
+            self._async_update_network(
+                self.data.get("locations", {}).keys() | self.network.location_ids
+            )
+        else:
+            self._async_update_network(self.changed_locations)
+        if self.changed_locations is None or self.changed_locations:
+            self._async_update_opening_index()
+        thresholds = self.config_entry.runtime_data.thresholds
+        thresholds.async_evaluate(
+            thresholds.location_ids
+            if self.changed_locations is None
+            else thresholds.location_ids & self.changed_locations,
+            self.data.get("locations", {}),
+            self.data.get("live_validations", {}),
+        )
+        metrics = self.config_entry.runtime_data.metrics
+        with metrics.timer(STAGE_WRITE):
+            if self.changed_locations is None:
+                writes = len(self._listeners)
+                super().async_update_listeners()
+            else:
+                writes = 0
+                for update_callback, context in list(self._listeners.values()):
+                    if context is None or context in self.changed_locations:
+                        update_callback()
+                        writes += 1
+        metrics.add(COUNT_WRITES, writes)
+
+    @callback
+    def async_add_schedule_listener(
+        self,
+        location_id: int,
+        update_callback: CALLBACK_TYPE,
+    ) -> CALLBACK_TYPE:
+        """
+        Listen for opening, closing and day changes of a location.
+
+        The callback is called at the exact time of the transition, independent
+        of the refresh interval. Returns a function to remove the listener.
+        """
+        listeners = self._schedule_listeners.setdefault(location_id, [])
+        listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            listeners.remove(update_callback)
+            if not listeners:
+                self._schedule_listeners.pop(location_id, None)
+
+        return remove_listener
+
+    async def async_shutdown(self) -> None:
+        """Cancel the scheduled transitions."""
+        await super().async_shutdown()
+        for cancel in self._transitions.values():
+            cancel()
+        self._transitions.clear()
+
+    @callback
+    def _async_schedule_transitions(self) -> None:
+        """Reschedule the transitions of the changed locations."""
+        if not self.data:
+            return
+        locations = self.data.get("locations", {})
+        if self.changed_locations is None:
+            changed = locations.keys() | self._transitions.keys()
+        else:
+            changed = self.changed_locations
+        for location_id in changed:
+            self._async_schedule_transition(location_id)
+
+    @callback
+    def _async_schedule_transition(self, location_id: int) -> None:
+        """Schedule the next transition of a location."""
+        if cancel := self._transitions.pop(location_id, None):
+            cancel()
+        location = self.data.get("locations", {}).get(location_id)
+        if location is None:
+            return
+        now = datetime.datetime.now(tz=UNISPORT_TZ)
+        # Today's opening and closing times change at midnight too
+        point = next_local_midnight(now)
+        transition = location.next_transition(now)
+        if transition is not None:
+            point = min(point, transition[0])
+        self._transitions[location_id] = async_track_point_in_utc_time(
+            self.hass,
+            partial(self._async_handle_transition, location_id),
+            point,
+        )
+
+    @callback
+    def _async_handle_transition(
+        self,
+        location_id: int,
+        _now: datetime.datetime,
+    ) -> None:
+        """Update the schedule listeners of a location and schedule the next one."""
+        self._transitions.pop(location_id, None)
+        self._async_update_network((location_id,))
+        for update_callback in list(self._schedule_listeners.get(location_id, ())):
+            update_callback()
+        self._async_schedule_transition(location_id)
+
+    @callback
+    def _async_update_opening_index(self) -> None:
+        """Rebuild the opening index if any name or schedule changed."""
+        if self.data and self.opening_index.update(self.data.get("locations", {})):
+            self.opening_index.async_notify()
+
+    @callback
+    def _async_update_network(self, location_ids: Iterable[int]) -> None:
+        """Update the totals for some locations, and notify if they changed."""
+        if not self.data:
+            return
+        locations = self.data.get("locations", {})
+        live_validations = self.data.get("live_validations", {})
+        changed = False
+        for location_id in location_ids:
+            location = locations.get(location_id)
+            changed |= self.network.update(
+                location_id,
+                location,
+                live_validations.get(location_id, 0),
+                is_open=bool(location and location.is_open_now()),
+            )
+        if changed:
+            self.network.async_notify()
@@ -2,20 +2,33 @@
 
 from __future__ import annotations
 
-import datetime
-from dataclasses import dataclass
-from typing import TYPE_CHECKING
+import sys
+from array import array
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
 
-from pydantic import BaseModel
-
-from .const import LOGGER, UNISPORT_TZ
+from .schedule import UnisportSchedule
 
 if TYPE_CHECKING:
+    import datetime
+    from collections.abc import Collection, Iterator
+
     from homeassistant.config_entries import ConfigEntry
     from homeassistant.loader import Integration
 
     from .api import UnisportApiClient
     from .coordinator import UnisportDataUpdateCoordinator
+    from .deadband import UnisportDeadband
+    from .external_statistics import UnisportStatisticsImporter
+    from .fetcher import UnisportFetchScheduler
+    from .forecast import UnisportForecaster
+    from .history import UnisportHistory
+    from .metrics import UnisportMetrics
+    from .scheduler import UnisportPollScheduler
+    from .serving import UnisportServingClient
+    from .snapshot import UnisportSnapshotStore
+    from .thresholds import UnisportThresholdEngine
 
 
 type UnisportConfigEntry = ConfigEntry[UnisportData]
@@ -26,78 +39,260 @@ class UnisportData:
     """Data for the unisport integration."""
 
     client: UnisportApiClient
+    serving: UnisportServingClient
     coordinator: UnisportDataUpdateCoordinator
     integration: Integration
+    scheduler: UnisportPollScheduler
+    history: UnisportHistory
+    forecaster: UnisportForecaster
+    snapshots: UnisportSnapshotStore
+    metrics: UnisportMetrics
+    deadband: UnisportDeadband
+    thresholds: UnisportThresholdEngine
+    fetcher: UnisportFetchScheduler
+    # Only with the `import_statistics` option
+    statistics: UnisportStatisticsImporter | None = None
 
 
-class UnisportLocationOpeningHour(BaseModel):
+@dataclass(frozen=True, slots=True)
+class UnisportLocationOpeningHour:
     """Opening hours for a location."""
 
     time_start: str
     time_end: str
 
 
-class UnisportLocation(BaseModel):
-    """Locations field of the response of the `populartimes` endpoint."""
+@dataclass(frozen=True, slots=True)
+class UnisportLocation:
+    """
+    Locations field of the response of the `populartimes` endpoint.
+
+    Reused across polls as long as its payload does not change.
+    """
 
     location_id: int
     name: str
     max_capacity: int
+    # Shared between locations with the same opening hours, do not modify
     opening_hours: dict[int, UnisportLocationOpeningHour]
+    # Compiled opening hours
+    schedule: UnisportSchedule = field(compare=False, repr=False)
 
     def get_opening_hour_today(
         self,
     ) -> tuple[datetime.datetime, datetime.datetime] | None:
         """Get the opening hours for today."""
-        today = datetime.datetime.now(tz=UNISPORT_TZ).today()
-        # opening_hours has 1-based index
-        opening_hour = self.opening_hours.get(today.weekday() + 1)
-
-        if not opening_hour:
-            LOGGER.debug(
-                "No opening hours for today: %s, weekday: %s, available: %s",
-                today,
-                today.weekday(),
-                self.opening_hours,
-            )
-            return None
+        return self.schedule.get_opening_hours_today()
+
+    def is_open_now(self) -> bool | None:
+        """Return if the location is open now."""
+        return self.schedule.is_open()
+
+    def next_transition(
+        self,
+        after: datetime.datetime,
+    ) -> tuple[datetime.datetime, bool] | None:
+        """Get the next opening (True) or closing (False) after a point in time."""
+        return self.schedule.next_transition(after)
+
 
+class UnisportVisitors(Mapping[int, int]):
+    """
+    Live visitor counts, by location id.
+
+    Counts are kept in an array, indexed through an id -> slot table shared
+    by the counts of every poll until the set of locations changes. Counts
+    sharing a table compare as arrays.
+    """
+
+    __slots__ = ("_counts", "_length", "_slots")
+
+    def __init__(self, slots: Mapping[int, int], counts: array[int]) -> None:
+        """Initialize, with -1 as the count of the slots without one."""
+        self._slots = slots
+        self._counts = counts
+        self._length = len(counts) - counts.count(-1)
+
+    def __getitem__(self, location_id: int) -> int:
+        """Get the count of a location."""
+        count = self._counts[self._slots[location_id]]
+        if count < 0:
+            raise KeyError(location_id)
+        return count
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the ids of the locations with a count."""
+        counts = self._counts
         return (
-            # Opening
-            UNISPORT_TZ.localize(
-                datetime.datetime.combine(
-                    today,
-                    datetime.time.fromisoformat(opening_hour.time_start),
-                ),
-            ),
-            # Closing
-            UNISPORT_TZ.localize(
-                datetime.datetime.combine(
-                    today,
-                    datetime.time.fromisoformat(opening_hour.time_end),
-                )
-                # 24:00:00 is not a valid time
-                # so we need to convert it to 00:00 the next day
-                if not opening_hour.time_end.startswith("24:")
-                else datetime.datetime.combine(
-                    today + datetime.timedelta(days=1),
-                    datetime.time(0, 0),
-                ),
-            ),
+            location_id
+            for location_id, slot in self._slots.items()
+            if counts[slot] >= 0
         )
 
-    def is_open_now(self) -> bool | None:
-        """Return if the location is open now."""
-        opening_hours = self.get_opening_hour_today()
-        if not opening_hours:
-            return None
-        now = datetime.datetime.now(tz=UNISPORT_TZ)
-        return opening_hours[0] <= now <= opening_hours[1]
+    def __len__(self) -> int:
+        """Get the number of locations with a count."""
+        return self._length
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the arrays when the slots are shared."""
+        if isinstance(other, UnisportVisitors) and other._slots is self._slots:
+            return self._counts == other._counts
+        return super().__eq__(other)
 
+    __hash__ = None  # type: ignore[assignment]
 
-class UnisportResponse(BaseModel):
-    """Response of the `populartimes` endpoint."""
+    def __repr__(self) -> str:
+        """Return the counts as a dict."""
+        return f"UnisportVisitors({dict(self)!r})"
 
-    # Key for these fields: location id
-    live_validations: dict[int, int]
-    locations: dict[int, UnisportLocation]
+
+def _as_int(value: Any) -> int:
+    """Coerce an int field the way pydantic does in lax mode."""
+    if isinstance(value, bool) or not isinstance(value, int | str):
+        msg = f"Expected an integer, got {value!r}"
+        raise TypeError(msg)
+    return int(value)
+
+
+def _as_str(value: Any) -> str:
+    if not isinstance(value, str):
+        msg = f"Expected a string, got {value!r}"
+        raise TypeError(msg)
+    return value
+
+
+class UnisportDecoder:
+    """
+    Decode the `populartimes` payloads into locations.
+
+    Opening hours are validated and compiled once per distinct schedule, and
+    reused across locations and polls. Locations whose payload did not change
+    since the last decode are reused as is, with their names interned, and
+    the visitor counts go into a `UnisportVisitors` array. With `strict`, the
+    payloads are first validated with the pydantic models of `validation`,
+    imported on demand. With `location_ids`, only those locations are
+    decoded; the names of all locations are kept in `available`. Raises
+    `KeyError`, `TypeError` or `ValueError` on invalid payloads.
+    """
+
+    def __init__(
+        self,
+        *,
+        strict: bool = False,
+        location_ids: Collection[int] | None = None,
+    ) -> None:
+        """Initialize."""
+        self._strict = strict
+        self._location_ids = frozenset(location_ids) if location_ids else None
+        # Location id -> name of every location of the last decode
+        self.available: dict[int, str] = {}
+        # Raw opening hours -> decoded and compiled ones, from the last decode
+        self._schedules: dict[
+            tuple[tuple[str, str, str], ...],
+            tuple[dict[int, UnisportLocationOpeningHour], UnisportSchedule],
+        ] = {}
+        # Location id -> raw fields and decoded location, from the last decode
+        self._locations: dict[int, tuple[tuple[Any, ...], UnisportLocation]] = {}
+        # Location id -> slot of its visitors in the counts array
+        self._slots: dict[int, int] = {}
+
+    def decode(self, locations: Any, live_validations: Any) -> dict[str, Any]:
+        """Decode the locations and live validations payloads."""
+        if self._strict:
+            # Only load pydantic when needed
+            from .validation import validate  # noqa: PLC0415
+
+            validate(locations, live_validations)
+
+        schedules = {}
+        reused = {}
+        decoded = {}
+        available = {}
+        for raw_location_id, location in locations.items():
+            location_id = _as_int(raw_location_id)
+            available[location_id] = str(location.get("name", location_id))
+            if self._location_ids is not None and location_id not in self._location_ids:
+                continue
+            raw_opening_hours = location["opening_hours"]
+            key = tuple(
+                (weekday, hours["time_start"], hours["time_end"])
+                for weekday, hours in raw_opening_hours.items()
+            )
+            fields = (
+                location["location_id"],
+                location["name"],
+                location["max_capacity"],
+                key,
+            )
+            previous = self._locations.get(location_id)
+            if previous is not None and previous[0] == fields:
+                # Keep the objects of the previous decode, so that the ones of
+                # this payload can be freed right away
+                schedules.setdefault(
+                    previous[0][3],
+                    (previous[1].opening_hours, previous[1].schedule),
+                )
+            else:
+                opening_hours = schedules.get(key) or self._schedules.get(key)
+                if opening_hours is None:
+                    opening_hours = self._compile(key)
+                schedules[key] = opening_hours
+                previous = (
+                    fields,
+                    UnisportLocation(
+                        location_id=_as_int(location["location_id"]),
+                        name=sys.intern(_as_str(location["name"])),
+                        max_capacity=_as_int(location["max_capacity"]),
+                        opening_hours=opening_hours[0],
+                        schedule=opening_hours[1],
+                    ),
+                )
+            reused[location_id] = previous
+            decoded[location_id] = previous[1]
+        self._schedules = schedules
+        self._locations = reused
+        self.available = available
+        return {
+            "locations": decoded,
+            "live_validations": self._decode_visitors(decoded, live_validations),
+        }
+
+    def _decode_visitors(
+        self,
+        locations: Mapping[int, UnisportLocation],
+        live_validations: Any,
+    ) -> UnisportVisitors:
+        """Decode the live validations into the counts array."""
+        slots = self._slots
+        if not locations.keys() <= slots.keys() or len(slots) > 2 * len(locations):
+            # New locations, or too many gone: start a new table
+            slots = self._slots = {
+                location_id: slot for slot, location_id in enumerate(sorted(locations))
+            }
+        counts = array("l", [-1]) * len(slots)
+        for raw_location_id, visitors in (live_validations or {}).items():
+            location_id = _as_int(raw_location_id)
+            if self._location_ids is not None and location_id not in self._location_ids:
+                continue
+            slot = slots.get(location_id)
+            if slot is None:
+                # Visitors of a location missing from the locations, the
+                # previous counts keep the table they were made with
+                slot = len(slots)
+                slots = self._slots = {**slots, location_id: slot}
+                counts.append(-1)
+            counts[slot] = _as_int(visitors)
+        return UnisportVisitors(slots, counts)
+
+    @staticmethod
+    def _compile(
+        key: tuple[tuple[str, str, str], ...],
+    ) -> tuple[dict[int, UnisportLocationOpeningHour], UnisportSchedule]:
+        opening_hours = {
+            _as_int(weekday): UnisportLocationOpeningHour(
+                time_start=_as_str(time_start),
+                time_end=_as_str(time_end),
+            )
+            for weekday, time_start, time_end in key
+        }
+        return opening_hours, UnisportSchedule(opening_hours)
@@ -0,0 +1,105 @@
+"""Significant change filter for the visitor counts."""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import datetime
+
+DEADBAND_ABSOLUTE = "absolute"
+DEADBAND_RELATIVE = "relative"
+
+
+class UnisportDeadband:
+    """
+    Decide which visitor counts are worth writing as a new state.
+
+    A count is written when it moves away from the last written one by at
+    least `deadband` visitors, or `deadband` percent of it in relative mode,
+    and in any case once `heartbeat` has passed since the last write. Any
+    change counts with a deadband of 0, none with `heartbeat_only`.
+    Suppressed writes are counted per location, and should be written once
+    `heartbeat_due`, without waiting for another count.
+    """
+
+    def __init__(
+        self,
+        *,
+        deadband: float,
+        mode: str,
+        heartbeat: datetime.timedelta,
+        heartbeat_only: bool = False,
+    ) -> None:
+        """Initialize."""
+        self.deadband = deadband
+        self.mode = mode
+        self.heartbeat = heartbeat
+        self.heartbeat_only = heartbeat_only
+        # Location id -> last written count and time
+        self._last: dict[int, tuple[int | None, datetime.datetime]] = {}
+        self.written: Counter[int] = Counter()
+        self.suppressed: Counter[int] = Counter()
+
+    def should_write(
+        self,
+        location_id: int,
+        value: int | None,
+        now: datetime.datetime,
+    ) -> bool:
+        """Return if a count should be written, and remember it if so."""
+        last = self._last.get(location_id)
+        if (
+            last is not None
+            and now - last[1] < self.heartbeat
+            and (self.heartbeat_only or not self._significant(last[0], value))
+        ):
+            self.suppressed[location_id] += 1
+            return False
+        self.record(location_id, value, now)
+        return True
+
+    def record(
+        self,
+        location_id: int,
+        value: int | None,
+        now: datetime.datetime,
+    ) -> None:
+        """Remember a count written regardless of the filter."""
+        self._last[location_id] = (value, now)
+        self.written[location_id] += 1
+
+    def heartbeat_due(self, location_id: int) -> datetime.datetime | None:
+        """Get when the count of a location is written anyway, None if never was."""
+        if (last := self._last.get(location_id)) is None:
+            return None
+        return last[1] + self.heartbeat
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the settings and the written and suppressed counts."""
+        return {
+            "deadband": self.deadband,
+            "mode": self.mode,
+            "heartbeat": self.heartbeat.total_seconds(),
+            "heartbeat_only": self.heartbeat_only,
+            "written": sum(self.written.values()),
+            "suppressed": sum(self.suppressed.values()),
+            "locations": {
+                location_id: {
+                    "written": self.written[location_id],
+                    "suppressed": self.suppressed[location_id],
+                }
+                for location_id in self._last
+            },
+        }
+
+    def _significant(self, last: int | None, value: int | None) -> bool:
+        if last is None or value is None:
+            return last != value
+        change = abs(value - last)
+        if self.mode == DEADBAND_RELATIVE:
+            threshold = self.deadband / 100 * abs(last)
+        else:
+            threshold = self.deadband
+        return change > 0 and change >= threshold
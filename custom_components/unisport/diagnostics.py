@@ -0,0 +1,52 @@
+"""Diagnostics support for unisport."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from .session import ACCEPT_ENCODING, DNS_CACHE_TTL, KEEPALIVE_TIMEOUT
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .data import UnisportConfigEntry
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant,  # noqa: ARG001 Unused function argument: `hass`
+    entry: UnisportConfigEntry,
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    runtime_data = entry.runtime_data
+    coordinator = runtime_data.coordinator
+    serving = runtime_data.serving
+    age = serving.age()
+    return {
+        "data": dict(entry.data),
+        "options": dict(entry.options),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": str(coordinator.update_interval),
+            "stale": coordinator.stale,
+            "locations": len((coordinator.data or {}).get("locations", {})),
+        },
+        "serving": {
+            "failures": serving.failures,
+            "last_error": repr(serving.last_error) if serving.last_error else None,
+            "age": age.total_seconds() if age is not None else None,
+            "open_until": serving.open_until,
+        },
+        "forecaster": {
+            "last_duration": runtime_data.forecaster.last_duration,
+            "max_duration": runtime_data.forecaster.max_duration,
+        },
+        "metrics": runtime_data.metrics.as_dict(),
+        "deadband": runtime_data.deadband.as_dict(),
+        "fetcher": runtime_data.fetcher.as_dict(),
+        # The bytes received and handshake times are in the metrics
+        "session": {
+            "accept_encoding": ACCEPT_ENCODING,
+            "keepalive_timeout": KEEPALIVE_TIMEOUT,
+            "dns_cache_ttl": DNS_CACHE_TTL,
+        },
+    }
@@ -2,22 +2,71 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
-from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import ATTRIBUTION
+from .const import ATTR_AGE, ATTR_STALE, ATTRIBUTION, DOMAIN
 from .coordinator import UnisportDataUpdateCoordinator
 
 if TYPE_CHECKING:
-    from .data import UnisportLocation
+    from collections.abc import Callable, Iterable
+
+    from homeassistant.helpers.entity import Entity
+    from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+    from .data import UnisportConfigEntry, UnisportLocation
+
+
+def entry_device_info(entry: UnisportConfigEntry) -> DeviceInfo:
+    """Get the device of the entities of an entry as a whole."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, entry.entry_id)},
+        name=entry.title,
+        manufacturer="Unisport",
+        model="Populartimes",
+        entry_type=DeviceEntryType.SERVICE,
+    )
+
+
+@callback
+def async_add_location_entities(
+    entry: UnisportConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    entities: Callable[[UnisportLocation], Iterable[Entity]],
+) -> None:
+    """
+    Add the entities of every location, then of the locations appearing later.
+
+    Such as a location added upstream, or selected but missing from the
+    snapshot the entry started from.
+    """
+    coordinator = entry.runtime_data.coordinator
+    added: set[int] = set()
+
+    @callback
+    def add_new_locations() -> None:
+        locations = coordinator.data.get("locations", {})
+        if new := locations.keys() - added:
+            added.update(new)
+            async_add_entities(
+                entity
+                for location_id in sorted(new)
+                for entity in entities(locations[location_id])
+            )
+
+    add_new_locations()
+    entry.async_on_unload(coordinator.async_add_listener(add_new_locations))
 
 
 class UnisportEntity(CoordinatorEntity[UnisportDataUpdateCoordinator]):
     """UnisportEntity class."""
 
     _attr_attribution = ATTRIBUTION
+    # Whether the state depends on the time of day through the schedule
+    _schedule_dependent = False
 
     def __init__(
         self,
@@ -26,8 +75,10 @@ class UnisportEntity(CoordinatorEntity[UnisportDataUpdateCoordinator]):
         class_: str,
     ) -> None:
         """Initialize."""
-        super().__init__(coordinator)
         location_id = location.location_id
+        # Only get updated when this location changed, see
+        # `UnisportDataUpdateCoordinator.async_update_listeners`
+        super().__init__(coordinator, context=location_id)
         device_id = f"{coordinator.config_entry.entry_id}-{location_id}"
         self._attr_unique_id = f"{device_id}-{class_}"
         self._attr_device_info = DeviceInfo(
@@ -46,3 +97,33 @@ class UnisportEntity(CoordinatorEntity[UnisportDataUpdateCoordinator]):
         if locations is None:
             return None
         return locations.get(self._location_id)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Flag states coming from a previous run or from before a failure."""
+        attributes: dict[str, Any] = {}
+        if self.coordinator.stale:
+            attributes[ATTR_STALE] = True
+        serving = self.coordinator.config_entry.runtime_data.serving
+        if serving.serving_stale and (age := serving.age()) is not None:
+            attributes[ATTR_AGE] = int(age.total_seconds())
+        return attributes or None
+
+    def _state_flags(self) -> tuple[bool, bool, bool]:
+        """Get the availability and staleness flags of the state."""
+        return (
+            self.available,
+            self.coordinator.stale,
+            self.coordinator.config_entry.runtime_data.serving.serving_stale,
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Listen for schedule transitions when the state depends on them."""
+        await super().async_added_to_hass()
+        if self._schedule_dependent:
+            self.async_on_remove(
+                self.coordinator.async_add_schedule_listener(
+                    self._location_id,
+                    self.async_write_ha_state,
+                ),
+            )
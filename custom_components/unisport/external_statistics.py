@@ -0,0 +1,183 @@
+"""Visitor statistics imported in batches into the recorder."""
+
+from __future__ import annotations
+
+import datetime
+from typing import TYPE_CHECKING
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.core import callback
+from homeassistant.util import slugify
+
+from .const import DEFAULT_TENANT, DOMAIN, LOGGER
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+    from homeassistant.core import HomeAssistant
+
+    from .data import UnisportLocation
+    from .history import UnisportHistory
+
+# Length of the statistics periods, in seconds. The recorder only takes whole
+# hours from integrations, and compiles the 5 minute statistics from states
+HOURLY_PERIOD = 60 * 60
+
+# Period start -> sample count, sum, min and max
+type _Periods = dict[int, list[int]]
+
+
+def statistic_id(location_id: int, tenant: str = DEFAULT_TENANT) -> str:
+    """
+    Get the id of the external statistic of a location.
+
+    Entries of the same tenant share the statistics of its locations.
+    """
+    if tenant == DEFAULT_TENANT:
+        return f"{DOMAIN}:location_{location_id}_visitors"
+    return f"{DOMAIN}:{slugify(tenant)}_location_{location_id}_visitors"
+
+
+def _aggregate(samples: Iterable[tuple[int, int]], period: int) -> _Periods:
+    """Aggregate (timestamp, visitors) samples per period."""
+    periods: _Periods = {}
+    for timestamp, visitors in samples:
+        start = timestamp - timestamp % period
+        aggregate = periods.get(start)
+        if aggregate is None:
+            periods[start] = [1, visitors, visitors, visitors]
+            continue
+        aggregate[0] += 1
+        aggregate[1] += visitors
+        aggregate[2] = min(aggregate[2], visitors)
+        aggregate[3] = max(aggregate[3], visitors)
+    return periods
+
+
+def _history_samples(
+    history: UnisportHistory,
+    location_id: int,
+    since: datetime.datetime | None = None,
+) -> list[tuple[int, int]]:
+    """Get the (timestamp, visitors) samples of a location from the history."""
+    return [
+        (int(moment.timestamp()), count)
+        for moment, count in history.samples(location_id, since)
+    ]
+
+
+def _statistics(periods: _Periods) -> list[StatisticData]:
+    return [
+        StatisticData(
+            start=datetime.datetime.fromtimestamp(start, tz=datetime.UTC),
+            mean=total / count,
+            min=minimum,
+            max=maximum,
+        )
+        for start, (count, total, minimum, maximum) in sorted(periods.items())
+    ]
+
+
+class UnisportStatisticsImporter:
+    """
+    Import the visitors of every location as external statistics.
+
+    Once an hour is over, its samples are read back from the visitor history
+    and imported as the hourly mean, min and max in one batch per location,
+    instead of the recorder compiling them from every state. Imports replace
+    existing statistics of the same hours, so the hour in progress can be
+    flushed early, on unload, and imported again once complete, including
+    the samples taken before a restart.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        history: UnisportHistory,
+        tenant: str = DEFAULT_TENANT,
+    ) -> None:
+        """Initialize."""
+        self._hass = hass
+        self._history = history
+        self._tenant = tenant
+        # Start of the hour of the last sample, in seconds
+        self._hour: int | None = None
+        # Last known locations, for the names of the statistics
+        self._locations: Mapping[int, UnisportLocation] = {}
+
+    @callback
+    def add(
+        self,
+        moment: datetime.datetime,
+        locations: Mapping[int, UnisportLocation],
+    ) -> None:
+        """Note a sample added to the history, importing the hour once over."""
+        timestamp = int(moment.timestamp())
+        hour = timestamp - timestamp % HOURLY_PERIOD
+        if self._hour is not None and hour != self._hour:
+            self.async_flush()
+        self._hour = hour
+        self._locations = locations
+
+    @callback
+    def async_flush(self) -> None:
+        """Import the samples of the hour of the last sample."""
+        if self._hour is None:
+            return
+        since = datetime.datetime.fromtimestamp(self._hour, tz=datetime.UTC)
+        end = self._hour + HOURLY_PERIOD
+        for location_id in self._history.location_ids:
+            self._import(
+                location_id,
+                [
+                    sample
+                    for sample in _history_samples(self._history, location_id, since)
+                    if sample[0] < end
+                ],
+            )
+
+    async def async_backfill(
+        self,
+        location_ids: Iterable[int],
+        locations: Mapping[int, UnisportLocation],
+    ) -> int:
+        """
+        Import the samples recorded in the visitor history.
+
+        Returns the number of samples imported.
+        """
+        imported = 0
+        for location_id in location_ids:
+            # Up to a year of samples, converted out of the event loop
+            samples = await self._hass.async_add_executor_job(
+                _history_samples, self._history, location_id
+            )
+            self._locations = locations
+            self._import(location_id, samples)
+            imported += len(samples)
+        return imported
+
+    def _import(
+        self,
+        location_id: int,
+        samples: list[tuple[int, int]],
+    ) -> None:
+        """Import samples of a location as hourly statistics."""
+        if not samples:
+            return
+        location = self._locations.get(location_id)
+        metadata = StatisticMetaData(
+            has_mean=True,
+            has_sum=False,
+            name=f"Unisport {location.name if location else location_id} Visitors",
+            source=DOMAIN,
+            statistic_id=statistic_id(location_id, self._tenant),
+            unit_of_measurement=None,
+        )
+        LOGGER.debug("Importing %s samples of location %s", len(samples), location_id)
+        async_add_external_statistics(
+            self._hass,
+            metadata,
+            _statistics(_aggregate(samples, HOURLY_PERIOD)),
+        )
@@ -0,0 +1,164 @@
+"""Fetch scheduler shared by every config entry."""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import itertools
+import math
+from collections import Counter
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+from homeassistant.util import dt as dt_util
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Hashable
+
+    from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+
+# Requests in flight at once, over every entry
+MAX_CONCURRENT_FETCHES = 4
+# Seconds between the poll phases of different urls, coprime with the window
+# so that the first 60 urls all get a different second
+PHASE_STEP = 7
+PHASE_WINDOW = 60
+# Whole minute poll intervals are also aligned to a grid of their greatest
+# common divisor with this period, so that entries polling a url at the same
+# interval poll at the same time, whenever they were set up. The grid is the
+# same for the multiples of the period, so that backing off from 5 to 10 and
+# 15 minutes does not add a realignment to the interval
+GRID_PERIOD = 5 * 60
+# Seconds a poll may come early to stay on its phase, to make up for the time
+# the refresh aligning it took
+ALIGN_SLACK = 15
+
+DATA_FETCHER: HassKey[UnisportFetchScheduler] = HassKey(f"{DOMAIN}_fetcher")
+
+
+@callback
+def async_get_fetcher(hass: HomeAssistant) -> UnisportFetchScheduler:
+    """Get the fetch scheduler, creating it for the first entry."""
+    if (fetcher := hass.data.get(DATA_FETCHER)) is None:
+        fetcher = hass.data[DATA_FETCHER] = UnisportFetchScheduler()
+    return fetcher
+
+
+class UnisportFetchScheduler:
+    """
+    Coalesce, cap and spread the requests of every entry.
+
+    Requests with the same key share one in-flight fetch, whose result every
+    caller gets. At most `MAX_CONCURRENT_FETCHES` fetches run at once. Each
+    url polled by the entries gets a phase, a second of the minute its polls
+    are aligned to, so that entries of the same tenant poll together and
+    coalesce, and different tenants do not poll in the same second. That is
+    the case with a single url too, for several entries of the same tenant.
+    """
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_FETCHES) -> None:
+        """Initialize."""
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        # Key -> fetch in flight
+        self._inflight: dict[Hashable, asyncio.Task[Any]] = {}
+        # Url -> phase slot, and entries polling it
+        self._slots: dict[str, int] = {}
+        self._users: Counter[str] = Counter()
+        self.fetches = 0
+        self.coalesced = 0
+
+    async def async_fetch(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Run a fetch, or wait for the one in flight with the same key."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._async_run(fetch))
+            self._inflight[key] = task
+            task.add_done_callback(_forget_when_done(self._inflight, key))
+        else:
+            self.coalesced += 1
+        # A caller giving up, such as an unloaded entry, does not cancel the
+        # fetch for the others
+        return await asyncio.shield(task)
+
+    @callback
+    def async_register(self, url: str) -> CALLBACK_TYPE:
+        """Register an entry polling a url, returns the callback to unregister."""
+        if url not in self._slots:
+            used = set(self._slots.values())
+            self._slots[url] = next(
+                slot for slot in itertools.count() if slot not in used
+            )
+        self._users[url] += 1
+
+        @callback
+        def unregister() -> None:
+            self._users[url] -= 1
+            if self._users[url] <= 0:
+                del self._users[url]
+                del self._slots[url]
+
+        return unregister
+
+    def phase(self, url: str) -> int | None:
+        """Get the second of the minute the polls of a url are aligned to."""
+        if (slot := self._slots.get(url)) is None:
+            return None
+        return slot * PHASE_STEP % PHASE_WINDOW
+
+    def align(
+        self,
+        url: str,
+        interval: datetime.timedelta,
+        now: datetime.datetime | None = None,
+    ) -> datetime.timedelta:
+        """Adjust a poll interval so that the poll is due at the url's phase."""
+        if (phase := self.phase(url)) is None:
+            return interval
+        if now is None:
+            now = dt_util.utcnow()
+        seconds = interval.total_seconds()
+        period = PHASE_WINDOW
+        if seconds % PHASE_WINDOW == 0:
+            period = math.gcd(int(seconds), GRID_PERIOD)
+        offset = (phase - (now.timestamp() + seconds)) % period
+        if offset > period - ALIGN_SLACK:
+            # Only just past the phase, rather than waiting for the next one
+            offset -= period
+        return interval + datetime.timedelta(seconds=offset)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the fetch counts and the phases of the urls."""
+        return {
+            "fetches": self.fetches,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+            "phases": {url: self.phase(url) for url in self._slots},
+        }
+
+    async def _async_run(self, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        async with self._semaphore:
+            self.fetches += 1
+            return await fetch()
+
+
+def _forget_when_done(
+    inflight: dict[Hashable, asyncio.Task[Any]],
+    key: Hashable,
+) -> Callable[[asyncio.Task[Any]], None]:
+    """Get the done callback of a fetch, forgetting it once over."""
+
+    def done(task: asyncio.Task[Any]) -> None:
+        if inflight.get(key) is task:
+            del inflight[key]
+        # Retrieved by the callers, if any are left
+        if not task.cancelled():
+            task.exception()
+
+    return done
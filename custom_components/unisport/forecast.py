@@ -0,0 +1,174 @@
+"""Visitor forecasts for unisport locations."""
+
+from __future__ import annotations
+
+import datetime
+import math
+import time
+from typing import TYPE_CHECKING
+
+from .const import LOGGER
+from .history import HOURS_PER_WEEK, weekday_hour
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+    import numpy as np
+    from homeassistant.core import CALLBACK_TYPE
+
+    from .history import UnisportHistory
+
+# Hours ahead to forecast
+FORECAST_HORIZONS = (1, 2, 3)
+
+# Weight of the latest sample in the smoothed deviation from the baseline
+DEVIATION_SMOOTHING = 0.3
+# How much of the current deviation is left after every hour ahead
+DEVIATION_DECAY = 0.5
+# Seconds a forecast update may take before it is reported
+UPDATE_BUDGET = 0.05
+
+
+class UnisportForecaster:
+    """
+    Forecast the visitors of all locations a few hours ahead.
+
+    The forecast is the mean visitors of the weekday and hour ahead (the
+    seasonal baseline), plus the current deviation from the baseline, fading
+    out the further ahead. All locations are kept in NumPy matrices and
+    computed at once; each sample only updates one weekday x hour column and
+    the forecast, instead of refitting over the history. NumPy is only
+    imported once there are locations to forecast.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        # Location id -> row in the matrices, allocated with the first row
+        self._rows: dict[int, int] = {}
+        self._sums: np.ndarray
+        self._counts: np.ndarray
+        self._deviations: np.ndarray
+        self._forecasts: np.ndarray
+        self._listeners: dict[int, list[CALLBACK_TYPE]] = {}
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+
+    def seed(self, history: UnisportHistory) -> None:
+        """Take the weekday x hour baselines from the collected history."""
+        import numpy as np  # noqa: PLC0415 Only imported when forecasting
+
+        self._add_rows(history.location_ids)
+        for location_id in history.location_ids:
+            if (aggregates := history.aggregates(location_id)) is None:
+                continue
+            row = self._rows[location_id]
+            self._sums[row] = np.frombuffer(aggregates.sums, dtype=np.uint64)
+            self._counts[row] = np.frombuffer(aggregates.counts, dtype=np.uint32)
+
+    def add(self, moment: datetime.datetime, visitors: Mapping[int, int]) -> None:
+        """Add a sample of the visitors of every location and forecast again."""
+        start = time.perf_counter()
+        self._add_rows(visitors)
+        if not self._rows:
+            return
+        import numpy as np  # noqa: PLC0415 Only imported when forecasting
+
+        values = np.full(len(self._rows), np.nan)
+        for location_id, count in visitors.items():
+            values[self._rows[location_id]] = count
+        sampled = ~np.isnan(values)
+
+        bucket = weekday_hour(moment)
+        baseline = self._baseline(bucket)
+        deviations = np.where(np.isnan(baseline), 0.0, values - baseline)
+        self._deviations = np.where(
+            sampled,
+            (1 - DEVIATION_SMOOTHING) * self._deviations
+            + DEVIATION_SMOOTHING * deviations,
+            self._deviations,
+        )
+        self._sums[sampled, bucket] += values[sampled]
+        self._counts[sampled, bucket] += 1
+
+        buckets = [
+            weekday_hour(moment + datetime.timedelta(hours=hours))
+            for hours in FORECAST_HORIZONS
+        ]
+        decay = DEVIATION_DECAY ** np.array(FORECAST_HORIZONS, dtype=float)
+        forecasts = self._baseline(buckets) + np.outer(self._deviations, decay)
+        forecasts = np.clip(np.round(forecasts), 0, None)
+        changed = ~np.all(
+            (forecasts == self._forecasts)
+            | (np.isnan(forecasts) & np.isnan(self._forecasts)),
+            axis=1,
+        )
+        self._forecasts = forecasts
+
+        self.last_duration = time.perf_counter() - start
+        self.max_duration = max(self.max_duration, self.last_duration)
+        if self.last_duration > UPDATE_BUDGET:
+            LOGGER.warning(
+                "Forecasting %s locations took %.3fs",
+                len(self._rows),
+                self.last_duration,
+            )
+
+        for location_id, row in self._rows.items():
+            if changed[row]:
+                for update_callback in list(self._listeners.get(location_id, ())):
+                    update_callback()
+
+    def forecast(self, location_id: int, hours: int) -> int | None:
+        """Get the forecast visitors of a location some hours ahead."""
+        row = self._rows.get(location_id)
+        if row is None:
+            return None
+        value = float(self._forecasts[row, FORECAST_HORIZONS.index(hours)])
+        return None if math.isnan(value) else int(value)
+
+    def async_add_listener(
+        self,
+        location_id: int,
+        update_callback: CALLBACK_TYPE,
+    ) -> CALLBACK_TYPE:
+        """Listen for forecast changes of a location."""
+        listeners = self._listeners.setdefault(location_id, [])
+        listeners.append(update_callback)
+
+        def remove_listener() -> None:
+            listeners.remove(update_callback)
+            if not listeners:
+                self._listeners.pop(location_id, None)
+
+        return remove_listener
+
+    def _baseline(self, buckets: int | list[int]) -> np.ndarray:
+        """Get the mean visitors of buckets, NaN without samples."""
+        import numpy as np  # noqa: PLC0415 Only imported when forecasting
+
+        counts = self._counts[:, buckets]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, self._sums[:, buckets] / counts, np.nan)
+
+    def _add_rows(self, location_ids: Iterable[int]) -> None:
+        """Add rows for the locations not seen before."""
+        new = [
+            location_id for location_id in location_ids if location_id not in self._rows
+        ]
+        if not new:
+            return
+        import numpy as np  # noqa: PLC0415 Only imported when forecasting
+
+        if not self._rows:
+            self._sums = np.zeros((0, HOURS_PER_WEEK))
+            self._counts = np.zeros((0, HOURS_PER_WEEK))
+            self._deviations = np.zeros(0)
+            self._forecasts = np.full((0, len(FORECAST_HORIZONS)), np.nan)
+        for location_id in new:
+            self._rows[location_id] = len(self._rows)
+        self._sums = np.vstack((self._sums, np.zeros((len(new), HOURS_PER_WEEK))))
+        self._counts = np.vstack((self._counts, np.zeros((len(new), HOURS_PER_WEEK))))
+        self._deviations = np.append(self._deviations, np.zeros(len(new)))
+        self._forecasts = np.vstack(
+            (self._forecasts, np.full((len(new), len(FORECAST_HORIZONS)), np.nan))
+        )
@@ -0,0 +1,310 @@
+"""Visitor history for unisport locations."""
+
+from __future__ import annotations
+
+import base64
+import datetime
+import sys
+from array import array
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, UNISPORT_TZ
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Mapping
+
+    from homeassistant.core import HomeAssistant
+
+STORAGE_VERSION = 1
+# Seconds to wait for more samples before writing the history to disk
+SAVE_DELAY = 15 * 60
+
+# Number of samples kept, a bit over a year of 5 minute refreshes
+HISTORY_CAPACITY = 2**17
+HOURS_PER_WEEK = 7 * 24
+
+# Marks a location without a sample at that time
+_MISSING = 0xFFFF
+_MAX_VISITORS = _MISSING - 1
+
+
+def _encode(values: array) -> str:
+    """Encode an array as little endian base64."""
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return base64.b64encode(values.tobytes()).decode()
+
+
+def _decode(typecode: str, data: str) -> array:
+    """Decode an array encoded with `_encode`."""
+    values = array(typecode)
+    values.frombytes(base64.b64decode(data))
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def _zeros(typecode: str, length: int) -> array:
+    """Get a zero filled array."""
+    return array(typecode, bytes(array(typecode).itemsize * length))
+
+
+def weekday_hour(moment: datetime.datetime) -> int:
+    """Get the weekday x hour bucket of a point in time, in local time."""
+    local = moment.astimezone(UNISPORT_TZ)
+    return local.weekday() * 24 + local.hour
+
+
+class UnisportLocationAggregates:
+    """Visitor count, sum and peak per weekday and hour of a location."""
+
+    __slots__ = ("counts", "peaks", "sums")
+
+    def __init__(
+        self,
+        counts: array | None = None,
+        sums: array | None = None,
+        peaks: array | None = None,
+    ) -> None:
+        """Initialize, empty by default."""
+        self.counts = counts if counts is not None else _zeros("I", HOURS_PER_WEEK)
+        self.sums = sums if sums is not None else _zeros("Q", HOURS_PER_WEEK)
+        self.peaks = peaks if peaks is not None else _zeros("H", HOURS_PER_WEEK)
+
+    def add(self, bucket: int, visitors: int) -> None:
+        """Add a sample to a bucket."""
+        self.counts[bucket] += 1
+        self.sums[bucket] += visitors
+        self.peaks[bucket] = max(visitors, self.peaks[bucket])
+
+    def mean(self, bucket: int) -> float | None:
+        """Get the mean visitors of a bucket, None without samples."""
+        count = self.counts[bucket]
+        return self.sums[bucket] / count if count else None
+
+    def means(self) -> list[list[float | None]]:
+        """Get the rounded mean visitors, per weekday (Monday first) and hour."""
+        return [
+            [
+                None if (mean := self.mean(day * 24 + hour)) is None else round(mean, 1)
+                for hour in range(24)
+            ]
+            for day in range(7)
+        ]
+
+    def as_dict(self) -> dict[str, list[list[dict[str, Any]]]]:
+        """Get count, mean and max per weekday (Monday first) and hour."""
+        return {
+            "weekdays": [
+                [
+                    {
+                        "count": self.counts[bucket],
+                        "mean": self.mean(bucket),
+                        "max": self.peaks[bucket],
+                    }
+                    for bucket in range(day * 24, day * 24 + 24)
+                ]
+                for day in range(7)
+            ],
+        }
+
+
+class UnisportHistory:
+    """
+    Visitor samples of all locations, persisted with the storage helper.
+
+    Samples are kept in fixed width arrays used as a ring buffer: one array
+    of timestamps shared by all locations, and one array of visitor counts
+    per location, so a sample costs 4 bytes plus 2 bytes per location. The
+    arrays grow with the samples up to `capacity`, then the oldest samples
+    are overwritten. The weekday x hour aggregates are updated along with
+    every sample and cover every sample ever added.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        capacity: int = HISTORY_CAPACITY,
+    ) -> None:
+        """Initialize."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass,
+            STORAGE_VERSION,
+            f"{DOMAIN}.{entry_id}.history",
+        )
+        self._capacity = capacity
+        self._times = array("I")
+        self._visitors: dict[int, array] = {}
+        self._aggregates: dict[int, UnisportLocationAggregates] = {}
+        # Index of the next sample to write, and number of samples stored
+        self._next = 0
+        self._size = 0
+
+    async def async_load(self) -> None:
+        """Load the history from disk."""
+        if not (stored := await self._store.async_load()):
+            return
+        # Samples only fit back into a ring buffer of the same size, otherwise
+        # start over keeping the aggregates
+        keep_samples = stored["capacity"] == self._capacity
+        if keep_samples:
+            self._next = stored["next"]
+            self._size = stored["size"]
+            self._times = _decode("I", stored["times"])
+        for location_id, location in stored["locations"].items():
+            self._visitors[int(location_id)] = (
+                _decode("H", location["visitors"])
+                if keep_samples
+                else self._empty_samples()
+            )
+            self._aggregates[int(location_id)] = UnisportLocationAggregates(
+                counts=_decode("I", location["counts"]),
+                sums=_decode("Q", location["sums"]),
+                peaks=_decode("H", location["peaks"]),
+            )
+
+    def add(
+        self,
+        timestamp: datetime.datetime,
+        visitors: Mapping[int, int],
+    ) -> None:
+        """Add a sample of the visitors of every location at a point in time."""
+        seconds = int(timestamp.timestamp())
+        bucket = weekday_hour(timestamp)
+        index = self._next
+        if index == len(self._times):
+            # Not full yet
+            self._times.append(0)
+            for location_visitors in self._visitors.values():
+                location_visitors.append(_MISSING)
+        self._times[index] = seconds
+        for location_id, location_visitors in self._visitors.items():
+            if location_id not in visitors:
+                location_visitors[index] = _MISSING
+        for location_id, count in visitors.items():
+            if location_id not in self._visitors:
+                self._visitors[location_id] = self._empty_samples()
+                self._aggregates[location_id] = UnisportLocationAggregates()
+            clamped = min(max(count, 0), _MAX_VISITORS)
+            self._visitors[location_id][index] = clamped
+            self._aggregates[location_id].add(bucket, clamped)
+        self._next = (index + 1) % self._capacity
+        self._size = min(self._size + 1, self._capacity)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def samples(
+        self,
+        location_id: int,
+        since: datetime.datetime | None = None,
+    ) -> Iterator[tuple[datetime.datetime, int]]:
+        """Iterate over the samples of a location, oldest first, or from `since`."""
+        location_visitors = self._visitors.get(location_id)
+        if location_visitors is None:
+            return
+        size = self._size
+        if since is not None:
+            # Only the samples in range are read, newest first
+            seconds = since.timestamp()
+            size = 0
+            while (
+                size < self._size
+                and self._times[(self._next - size - 1) % self._capacity] >= seconds
+            ):
+                size += 1
+        start = (self._next - size) % self._capacity
+        for offset in range(size):
+            index = (start + offset) % self._capacity
+            if (count := location_visitors[index]) != _MISSING:
+                yield (
+                    datetime.datetime.fromtimestamp(self._times[index], tz=UNISPORT_TZ),
+                    count,
+                )
+
+    def series(
+        self,
+        location_ids: Iterable[int],
+        start: int,
+        step: int,
+    ) -> tuple[int, dict[int, list[int | None]]]:
+        """
+        Get the mean visitors per step of some locations since a timestamp.
+
+        Returns the start of the first step with samples, from `start` on in
+        multiples of `step`, and the means of every step from there to the
+        one of the last sample. Only the samples in range are read, newest
+        first, so the cost does not depend on the history length.
+        """
+        columns = {
+            location_id: self._visitors[location_id]
+            for location_id in location_ids
+            if location_id in self._visitors
+        }
+        # Location id -> step -> sum and count
+        sums: dict[int, dict[int, list[int]]] = {
+            location_id: {} for location_id in columns
+        }
+        first_step, last_step = 0, -1
+        for offset in range(1, self._size + 1):
+            index = (self._next - offset) % self._capacity
+            if (seconds := self._times[index]) < start:
+                break
+            bucket = (seconds - start) // step
+            if last_step < 0:
+                last_step = bucket
+            first_step = bucket
+            for location_id, location_visitors in columns.items():
+                if (count := location_visitors[index]) == _MISSING:
+                    continue
+                aggregate = sums[location_id].setdefault(bucket, [0, 0])
+                aggregate[0] += count
+                aggregate[1] += 1
+        return start + first_step * step, {
+            location_id: [
+                round(aggregate[0] / aggregate[1])
+                if (aggregate := steps.get(bucket))
+                else None
+                for bucket in range(first_step, last_step + 1)
+            ]
+            for location_id, steps in sums.items()
+        }
+
+    def aggregates(self, location_id: int) -> UnisportLocationAggregates | None:
+        """Get the weekday x hour aggregates of a location."""
+        return self._aggregates.get(location_id)
+
+    @property
+    def location_ids(self) -> list[int]:
+        """Ids of the locations with samples."""
+        return list(self._aggregates)
+
+    async def async_save(self) -> None:
+        """Write the history to disk now."""
+        await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        """Remove the history from disk."""
+        await self._store.async_remove()
+
+    def _empty_samples(self) -> array:
+        return array("H", [_MISSING]) * len(self._times)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "capacity": self._capacity,
+            "next": self._next,
+            "size": self._size,
+            "times": _encode(self._times),
+            "locations": {
+                str(location_id): {
+                    "visitors": _encode(self._visitors[location_id]),
+                    "counts": _encode(aggregates.counts),
+                    "sums": _encode(aggregates.sums),
+                    "peaks": _encode(aggregates.peaks),
+                }
+                for location_id, aggregates in self._aggregates.items()
+            },
+        }
@@ -0,0 +1,144 @@
+"""Timing and size figures of the fetch, parse and update pipeline."""
+
+from __future__ import annotations
+
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from homeassistant.core import CALLBACK_TYPE
+
+# Number of samples kept per figure, a day of 5 minute refreshes
+ROLLING_WINDOW = 288
+
+# Time to get the response headers, including DNS and connecting if needed
+STAGE_RESPONSE = "response"
+# Resolving the host, only when not in the DNS cache
+STAGE_DNS = "dns"
+# TCP and TLS handshakes of a request, 0 when a kept alive connection is reused
+STAGE_HANDSHAKE = "handshake"
+# Time to read the body, until both assignments were seen
+STAGE_DOWNLOAD = "download"
+# Time spent extracting the assignments while reading
+STAGE_EXTRACT = "extract"
+# Whole request, from sending it to the end of the download
+STAGE_FETCH = "fetch"
+STAGE_JSON = "json"
+STAGE_DECODE = "decode"
+# JSON and decoding together
+STAGE_PARSE = "parse"
+# Writing the states of the updated entities
+STAGE_WRITE = "write"
+# Bytes read from the page
+SIZE_PAGE = "page"
+# Bytes of the page received, before decompression
+SIZE_WIRE = "wire"
+# Bytes of the extracted payloads
+SIZE_PAYLOAD = "payload"
+# Entities notified by a refresh, before any filtering of their own
+COUNT_WRITES = "writes"
+
+UNIT_MS = "ms"
+UNIT_BYTES = "B"
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    """Get a nearest rank percentile of sorted values."""
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+class UnisportRollingStats:
+    """The last samples of a figure, summarized as percentiles."""
+
+    __slots__ = ("_samples", "total", "unit")
+
+    def __init__(self, unit: str | None, window: int = ROLLING_WINDOW) -> None:
+        """Initialize."""
+        self.unit = unit
+        self._samples: deque[float] = deque(maxlen=window)
+        # Samples ever added
+        self.total = 0
+
+    def add(self, value: float) -> None:
+        """Add a sample, dropping the oldest one once the window is full."""
+        self._samples.append(value)
+        self.total += 1
+
+    @property
+    def last(self) -> float | None:
+        """Get the last sample."""
+        return self._samples[-1] if self._samples else None
+
+    def percentile(self, fraction: float) -> float | None:
+        """Get a percentile of the samples in the window."""
+        if not self._samples:
+            return None
+        return _percentile(sorted(self._samples), fraction)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the last value, p50, p95 and max of the window."""
+        ordered = sorted(self._samples)
+        return {
+            "unit": self.unit,
+            "count": self.total,
+            "last": self.last,
+            "p50": _percentile(ordered, 0.5) if ordered else None,
+            "p95": _percentile(ordered, 0.95) if ordered else None,
+            "max": ordered[-1] if ordered else None,
+        }
+
+
+class UnisportMetrics:
+    """
+    Rolling statistics per stage of the pipeline.
+
+    Recording a sample only appends to a bounded deque; percentiles are only
+    computed when read, by the diagnostics and the diagnostic sensors.
+    """
+
+    def __init__(self, window: int = ROLLING_WINDOW) -> None:
+        """Initialize."""
+        self._window = window
+        self._stats: dict[str, UnisportRollingStats] = {}
+        self._listeners: list[CALLBACK_TYPE] = []
+
+    def add(self, name: str, value: float, unit: str | None = None) -> None:
+        """Add a sample to a figure."""
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = UnisportRollingStats(unit, self._window)
+        stats.add(value)
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """Time a stage, in milliseconds, only if it completes."""
+        start = time.perf_counter()
+        yield
+        self.add(stage, (time.perf_counter() - start) * 1000, UNIT_MS)
+
+    def get(self, name: str) -> UnisportRollingStats | None:
+        """Get the statistics of a figure."""
+        return self._stats.get(name)
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Get the summary of every figure."""
+        return {name: stats.as_dict() for name, stats in self._stats.items()}
+
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for the end of each refresh."""
+        self._listeners.append(update_callback)
+
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    def async_notify(self) -> None:
+        """Notify the listeners that a refresh was recorded."""
+        for update_callback in list(self._listeners):
+            update_callback()
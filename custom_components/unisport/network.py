@@ -0,0 +1,146 @@
+"""Network wide occupancy, maintained incrementally."""
+
+from __future__ import annotations
+
+import heapq
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from homeassistant.core import CALLBACK_TYPE
+
+    from .data import UnisportLocation
+
+
+class UnisportNetwork:
+    """
+    Totals over every location, updated one location at a time.
+
+    Each update subtracts what a location contributed before and adds what
+    it contributes now, so a refresh costs O(changed locations). The least
+    crowded open location is kept in a heap of (occupancy, location id,
+    version) entries: outdated entries are only dropped once they reach the
+    top, and the heap is rebuilt when they pile up.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        # Location id -> visitors, capacity and name
+        self._visitors: dict[int, int] = {}
+        self._capacities: dict[int, int] = {}
+        self._names: dict[int, str] = {}
+        self._open: set[int] = set()
+        self.total_visitors = 0
+        self.open_visitors = 0
+        self.open_capacity = 0
+        self._heap: list[tuple[float, int, int]] = []
+        # Location id -> version of its current heap entry
+        self._versions: dict[int, int] = {}
+        self._listeners: list[CALLBACK_TYPE] = []
+
+    @property
+    def location_ids(self) -> set[int]:
+        """Ids of the locations counted in."""
+        return set(self._visitors)
+
+    @property
+    def utilization(self) -> float | None:
+        """Visitors of the open locations, in percent of their capacity."""
+        if not self.open_capacity:
+            return None
+        return self.open_visitors / self.open_capacity * 100
+
+    @property
+    def least_crowded(self) -> int | None:
+        """Id of the open location with the lowest occupancy."""
+        heap = self._heap
+        while heap:
+            _, location_id, version = heap[0]
+            if location_id in self._open and self._versions[location_id] == version:
+                return location_id
+            heapq.heappop(heap)
+        return None
+
+    def name(self, location_id: int) -> str | None:
+        """Get the name of a location."""
+        return self._names.get(location_id)
+
+    def visitors(self, location_id: int) -> int | None:
+        """Get the visitors of a location."""
+        return self._visitors.get(location_id)
+
+    def update(
+        self,
+        location_id: int,
+        location: UnisportLocation | None,
+        visitors: int,
+        *,
+        is_open: bool,
+    ) -> bool:
+        """
+        Update the contribution of a location, None to remove it.
+
+        Returns if anything changed.
+        """
+        was_open = location_id in self._open
+        old_visitors = self._visitors.get(location_id, 0)
+        old_capacity = self._capacities.get(location_id, 0)
+        if location is None:
+            if location_id not in self._visitors:
+                return False
+            visitors, capacity, is_open = 0, 0, False
+            del self._visitors[location_id]
+            del self._capacities[location_id]
+            self._names.pop(location_id, None)
+            self._versions.pop(location_id, None)
+        else:
+            capacity = location.max_capacity
+            if (
+                location_id in self._visitors
+                and (visitors, capacity, is_open)
+                == (old_visitors, old_capacity, was_open)
+                and self._names[location_id] == location.name
+            ):
+                return False
+            self._visitors[location_id] = visitors
+            self._capacities[location_id] = capacity
+            self._names[location_id] = location.name
+
+        self.total_visitors += visitors - old_visitors
+        if was_open:
+            self.open_visitors -= old_visitors
+            self.open_capacity -= old_capacity
+            self._open.discard(location_id)
+        if is_open:
+            self.open_visitors += visitors
+            self.open_capacity += capacity
+            self._open.add(location_id)
+            version = self._versions.get(location_id, 0) + 1
+            self._versions[location_id] = version
+            occupancy = visitors / capacity if capacity > 0 else float(visitors)
+            heapq.heappush(self._heap, (occupancy, location_id, version))
+            if len(self._heap) > 2 * len(self._open) + 16:
+                self._compact()
+        return True
+
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for changes of the totals."""
+        self._listeners.append(update_callback)
+
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    def async_notify(self) -> None:
+        """Notify the listeners that the totals changed."""
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def _compact(self) -> None:
+        """Drop the outdated heap entries."""
+        self._heap = [
+            entry
+            for entry in self._heap
+            if entry[1] in self._open and self._versions[entry[1]] == entry[2]
+        ]
+        heapq.heapify(self._heap)
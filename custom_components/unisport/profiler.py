@@ -0,0 +1,147 @@
+"""On demand profiling of the coordinator update cycles."""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+from .const import LOGGER
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from homeassistant.core import HomeAssistant
+
+# Functions listed in the report, by cumulative and by own time
+TOP_FUNCTIONS = 40
+# Frames kept per allocation site
+ALLOCATION_FRAMES = 5
+
+
+class UnisportProfiler:
+    """
+    Profile the next update cycles of a coordinator.
+
+    Each cycle, from the start of the refresh to the end of the state writes,
+    runs under cProfile and tracemalloc, which are stopped in between so that
+    nothing is traced while idle. The coordinator only checks for a profiler
+    at the start of a refresh. Everything else running on the event loop
+    during a cycle is profiled too.
+
+    Once `cycles` cycles are over, the stats are dumped to `<path>.prof`, and
+    a report with the top functions and the allocation sites still alive at
+    the end of each cycle, summed over the cycles, to `<path>.txt`.
+    """
+
+    def __init__(self, path: Path, cycles: int, top: int) -> None:
+        """Initialize."""
+        self.path = path
+        self.cycles = cycles
+        self._top = top
+        self._profile = cProfile.Profile()
+        self.durations: list[float] = []
+        self._peaks: list[int] = []
+        # Allocation site -> size and count, summed over the cycles
+        self._allocations: dict[tuple[str, ...], list[int]] = {}
+        # Set once written, or once writing failed with `error`
+        self.done = asyncio.Event()
+        self.error: OSError | None = None
+
+    @contextmanager
+    def cycle(self) -> Iterator[None]:
+        """Profile an update cycle."""
+        # Left alone if already started, by someone else
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start(ALLOCATION_FRAMES)
+        tracemalloc.reset_peak()
+        profiling = True
+        try:
+            self._profile.enable()
+        except ValueError as exception:
+            # Another profiler is active, only time the cycle
+            LOGGER.warning("Could not profile the update cycle: %s", exception)
+            profiling = False
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if profiling:
+                self._profile.disable()
+            self.durations.append(time.perf_counter() - start)
+            self._peaks.append(tracemalloc.get_traced_memory()[1])
+            snapshot = tracemalloc.take_snapshot()
+            if not tracing:
+                tracemalloc.stop()
+            self._add_allocations(snapshot)
+
+    @property
+    def finished(self) -> bool:
+        """Return true once every cycle has been profiled."""
+        return len(self.durations) >= self.cycles
+
+    async def async_write(self, hass: HomeAssistant) -> None:
+        """Write the stats and the report, then mark the profile done."""
+        try:
+            await hass.async_add_executor_job(self.write)
+        except OSError as exception:
+            LOGGER.warning("Could not write the profile: %s", exception)
+            self.error = exception
+        else:
+            LOGGER.info(
+                "Profile of %s update cycles written to %s",
+                len(self.durations),
+                self.path.with_suffix(".txt"),
+            )
+        self.done.set()
+
+    def _add_allocations(self, snapshot: tracemalloc.Snapshot) -> None:
+        snapshot = snapshot.filter_traces(
+            (
+                tracemalloc.Filter(
+                    inclusive=False, filename_pattern=tracemalloc.__file__
+                ),
+            )
+        )
+        for statistic in snapshot.statistics("traceback"):
+            site = tuple(statistic.traceback.format())
+            totals = self._allocations.setdefault(site, [0, 0])
+            totals[0] += statistic.size
+            totals[1] += statistic.count
+
+    def write(self) -> None:
+        """Write the stats and the report. Blocking, to run in an executor."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._profile.create_stats()
+        self._profile.dump_stats(self.path.with_suffix(".prof"))
+        report = io.StringIO()
+        report.write(
+            f"{len(self.durations)} update cycles, "
+            + ", ".join(f"{duration * 1000:.1f} ms" for duration in self.durations)
+            + "\nPeak traced memory: "
+            + ", ".join(f"{peak / 1024:.1f} KiB" for peak in self._peaks)
+            + "\n\n"
+        )
+        # Empty if another profiler was active during every cycle
+        if self._profile.stats:  # type: ignore[attr-defined]
+            stats = pstats.Stats(self._profile, stream=report)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_FUNCTIONS)
+            stats.sort_stats(pstats.SortKey.TIME).print_stats(TOP_FUNCTIONS)
+        report.write(
+            f"Top {self._top} allocation sites alive at the end of the cycles\n\n"
+        )
+        sites = sorted(
+            self._allocations.items(), key=lambda item: item[1][0], reverse=True
+        )
+        for site, (size, count) in sites[: self._top]:
+            report.write(f"{size / 1024:.1f} KiB in {count} blocks\n")
+            report.writelines(f"{line}\n" for line in site)
+            report.write("\n")
+        self.path.with_suffix(".txt").write_text(report.getvalue())
@@ -0,0 +1,183 @@
+"""Recordings of the populartimes payloads, and their replay."""
+
+from __future__ import annotations
+
+import bisect
+import datetime
+import gzip
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from .const import LOGGER
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Mapping, Sequence
+    from pathlib import Path
+
+RECORDING_SUFFIX = ".jsonl.gz"
+# Compressed size of a file before starting the next one
+MAX_FILE_BYTES = 8 * 1024 * 1024
+# Files kept, the oldest ones are removed
+KEEP_FILES = 16
+
+
+@dataclass(frozen=True, slots=True)
+class UnisportRecord:
+    """Payloads of a populartimes response, and when it was received."""
+
+    time: datetime.datetime
+    locations: bytes
+    live_validations: bytes
+
+    def values(self) -> dict[str, bytes]:
+        """Get the payloads as extracted from the page."""
+        return {
+            "locations": self.locations,
+            "live_validations": self.live_validations,
+        }
+
+
+class UnisportRecorder:
+    """
+    Append the payloads of every response to rolling recording files.
+
+    Files hold one JSON object per line, with the time and the payloads as
+    strings, and are gzip compressed one line at a time. The locations are
+    only written when they change, and in the first line of every file. A
+    file is closed once it reaches `max_bytes`, and only the last `keep`
+    files are kept. Blocking, to be run in an executor.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        max_bytes: int = MAX_FILE_BYTES,
+        keep: int = KEEP_FILES,
+    ) -> None:
+        """Initialize."""
+        self.directory = directory
+        self._max_bytes = max_bytes
+        self._keep = keep
+        self._path: Path | None = None
+        self._locations_digest: bytes | None = None
+
+    def append(self, moment: datetime.datetime, values: Mapping[str, bytes]) -> None:
+        """Append the payloads of a response."""
+        path = self._path
+        if path is None or path.stat().st_size >= self._max_bytes:
+            path = self._roll(moment)
+        record = {
+            "time": moment.isoformat(),
+            "live_validations": values["live_validations"].decode(),
+        }
+        digest = hashlib.blake2b(values["locations"], digest_size=16).digest()
+        if digest != self._locations_digest:
+            record["locations"] = values["locations"].decode()
+            self._locations_digest = digest
+        with gzip.open(path, "ab") as file:
+            file.write(json.dumps(record, separators=(",", ":")).encode() + b"\n")
+
+    def _roll(self, moment: datetime.datetime) -> Path:
+        """Start a new file, and remove the oldest ones."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        paths = recording_paths([self.directory])
+        for old in paths[: max(len(paths) - self._keep + 1, 0)]:
+            LOGGER.debug("Removing recording %s", old)
+            old.unlink(missing_ok=True)
+        name = moment.astimezone(datetime.UTC).strftime("%Y%m%dT%H%M%S%f")
+        self._path = self.directory / f"populartimes-{name}{RECORDING_SUFFIX}"
+        self._locations_digest = None
+        return self._path
+
+
+def recording_paths(paths: Iterable[Path]) -> list[Path]:
+    """Get the recording files of files and directories, oldest first."""
+    found = []
+    for path in paths:
+        if path.is_dir():
+            found.extend(path.glob(f"*{RECORDING_SUFFIX}"))
+        else:
+            found.append(path)
+    # Named after their first record
+    return sorted(found, key=lambda path: path.name)
+
+
+def read_recordings(paths: Iterable[Path]) -> Iterator[UnisportRecord]:
+    """Read the records of recording files, in order."""
+    for path in recording_paths(paths):
+        locations: bytes | None = None
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            for line in file:
+                record = json.loads(line)
+                if "locations" in record:
+                    locations = record["locations"].encode()
+                if locations is None:
+                    LOGGER.warning("Skipping a record without locations in %s", path)
+                    continue
+                yield UnisportRecord(
+                    time=datetime.datetime.fromisoformat(record["time"]),
+                    locations=locations,
+                    live_validations=record["live_validations"].encode(),
+                )
+
+
+class UnisportReplay:
+    """
+    Serve recorded payloads in place of the populartimes page.
+
+    The current record is moved forward with `advance`, or with `speed`,
+    follows the recorded times sped up that many times from the first call.
+    `now` is the time of the current record, for a simulated clock.
+    """
+
+    def __init__(
+        self,
+        records: Sequence[UnisportRecord],
+        *,
+        speed: float | None = None,
+    ) -> None:
+        """Initialize."""
+        if not records:
+            msg = "Nothing to replay"
+            raise ValueError(msg)
+        self._records = records
+        self._times = [record.time for record in records]
+        self._speed = speed
+        self._started: float | None = None
+        self.index = 0
+
+    def __len__(self) -> int:
+        """Get the number of records."""
+        return len(self._records)
+
+    @property
+    def now(self) -> datetime.datetime:
+        """Get the time of the current record."""
+        return self._current().time
+
+    def advance(self) -> bool:
+        """Move to the next record, returns False once past the last one."""
+        if self.index + 1 >= len(self._records):
+            return False
+        self.index += 1
+        return True
+
+    def values(self) -> dict[str, bytes]:
+        """Get the payloads of the current record."""
+        return self._current().values()
+
+    def _current(self) -> UnisportRecord:
+        if self._speed is not None:
+            if self._started is None:
+                self._started = time.monotonic()
+            elapsed = datetime.timedelta(
+                seconds=(time.monotonic() - self._started) * self._speed
+            )
+            self.index = max(
+                bisect.bisect_right(self._times, self._times[0] + elapsed) - 1, 0
+            )
+        return self._records[self.index]
@@ -0,0 +1,273 @@
+"""Weekly opening hour index for unisport locations, and for all of them."""
+
+from __future__ import annotations
+
+import bisect
+import datetime
+from typing import TYPE_CHECKING
+
+from .const import UNISPORT_TZ
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from homeassistant.core import CALLBACK_TYPE
+
+    from .data import UnisportLocation, UnisportLocationOpeningHour
+
+# (opening time, closing time, days to add to the date for the closing time)
+type _Interval = tuple[datetime.time, datetime.time, int]
+
+# Days to look ahead for the next transition, a full week plus today
+_LOOKAHEAD_DAYS = 8
+# Most local days the opening index keeps materialized
+_MAX_INDEX_DAYS = 400
+
+
+def _compile_opening_hour(
+    opening_hour: UnisportLocationOpeningHour | None,
+) -> _Interval | None:
+    """Parse an opening hour entry once."""
+    if not opening_hour:
+        return None
+    # 24:00:00 is not a valid time
+    # so we need to convert it to 00:00 the next day
+    if opening_hour.time_end.startswith("24:"):
+        closing, closing_days = datetime.time(0, 0), 1
+    else:
+        closing, closing_days = datetime.time.fromisoformat(opening_hour.time_end), 0
+    return (
+        datetime.time.fromisoformat(opening_hour.time_start),
+        closing,
+        closing_days,
+    )
+
+
+def next_local_midnight(after: datetime.datetime) -> datetime.datetime:
+    """Get the next local midnight after a point in time."""
+    day = after.astimezone(UNISPORT_TZ).date() + datetime.timedelta(days=1)
+    return UNISPORT_TZ.localize(datetime.datetime.combine(day, datetime.time(0, 0)))
+
+
+class UnisportSchedule:
+    """
+    Opening hours of a location, compiled into a weekly interval table.
+
+    The boundaries of the current day are cached until local midnight, so
+    repeated lookups for today do not parse or localize anything. Two
+    schedules are equal if their weekly tables are, regardless of the cache.
+    """
+
+    __slots__ = ("_day", "_day_hours", "_week")
+
+    def __init__(
+        self,
+        opening_hours: Mapping[int, UnisportLocationOpeningHour],
+    ) -> None:
+        """Compile the opening hours, keyed by 1-based weekday."""
+        self._week: tuple[_Interval | None, ...] = tuple(
+            _compile_opening_hour(opening_hours.get(weekday + 1))
+            for weekday in range(7)
+        )
+        self._day: datetime.date | None = None
+        self._day_hours: tuple[datetime.datetime, datetime.datetime] | None = None
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the weekly tables."""
+        if not isinstance(other, UnisportSchedule):
+            return NotImplemented
+        return self._week == other._week
+
+    def __hash__(self) -> int:
+        """Hash the weekly table."""
+        return hash(self._week)
+
+    def __repr__(self) -> str:
+        """Return the weekly table."""
+        return f"UnisportSchedule({self._week!r})"
+
+    def get_opening_hours(
+        self,
+        day: datetime.date,
+    ) -> tuple[datetime.datetime, datetime.datetime] | None:
+        """Get the opening and closing time for a day."""
+        interval = self._week[day.weekday()]
+        if interval is None:
+            return None
+        opening, closing, closing_days = interval
+        return (
+            UNISPORT_TZ.localize(datetime.datetime.combine(day, opening)),
+            UNISPORT_TZ.localize(
+                datetime.datetime.combine(
+                    day + datetime.timedelta(days=closing_days),
+                    closing,
+                ),
+            ),
+        )
+
+    def get_opening_hours_today(
+        self,
+        now: datetime.datetime | None = None,
+    ) -> tuple[datetime.datetime, datetime.datetime] | None:
+        """Get the opening and closing time for today, cached until midnight."""
+        if now is None:
+            now = datetime.datetime.now(tz=UNISPORT_TZ)
+        today = now.astimezone(UNISPORT_TZ).date()
+        if today != self._day:
+            self._day_hours = self.get_opening_hours(today)
+            self._day = today
+        return self._day_hours
+
+    def is_open(self, now: datetime.datetime | None = None) -> bool | None:
+        """Return if the location is open, None if it has no hours today."""
+        if now is None:
+            now = datetime.datetime.now(tz=UNISPORT_TZ)
+        opening_hours = self.get_opening_hours_today(now)
+        if not opening_hours:
+            return None
+        # Closed at the closing time itself, so that a transition scheduled at
+        # the closing time sees the location as closed
+        return opening_hours[0] <= now < opening_hours[1]
+
+    def next_transition(
+        self,
+        after: datetime.datetime,
+    ) -> tuple[datetime.datetime, bool] | None:
+        """
+        Get the next opening or closing after a point in time.
+
+        Returns the time of the transition and whether the location opens
+        (True) or closes (False) then, None if there are no opening hours.
+        """
+        day = after.astimezone(UNISPORT_TZ).date() - datetime.timedelta(days=1)
+        for _ in range(_LOOKAHEAD_DAYS + 1):
+            opening_hours = self.get_opening_hours(day)
+            day += datetime.timedelta(days=1)
+            if opening_hours is None:
+                continue
+            if opening_hours[0] > after:
+                return opening_hours[0], True
+            if opening_hours[1] > after:
+                return opening_hours[1], False
+        return None
+
+
+class UnisportOpeningIndex:
+    """
+    Opening hours of every location, as a sorted list of intervals.
+
+    Intervals are materialized from the weekly tables for a range of local
+    days, extended on demand, and sorted by opening time, so that a range
+    query is two bisections plus a scan of the matching intervals. Each day
+    is localized on its own, so closing times of 24:00 and DST changes are
+    handled as in `UnisportSchedule.get_opening_hours`. The index is rebuilt
+    only when the name or schedule of a location changes.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        # Location id -> name and schedule
+        self._locations: dict[int, tuple[str, UnisportSchedule]] = {}
+        # Local days covered, inclusive
+        self._first: datetime.date | None = None
+        self._last: datetime.date | None = None
+        # (opening time, closing time, location id), sorted
+        self._intervals: list[tuple[datetime.datetime, datetime.datetime, int]] = []
+        self._starts: list[datetime.datetime] = []
+        self._longest = datetime.timedelta(0)
+        self._listeners: list[CALLBACK_TYPE] = []
+
+    def name(self, location_id: int) -> str | None:
+        """Get the name of a location."""
+        location = self._locations.get(location_id)
+        return location[0] if location else None
+
+    def update(self, locations: Mapping[int, UnisportLocation]) -> bool:
+        """Replace the locations, returns if any name or schedule changed."""
+        new = {
+            location_id: (location.name, location.schedule)
+            for location_id, location in locations.items()
+        }
+        if new == self._locations:
+            return False
+        self._locations = new
+        self._first = self._last = None
+        self._intervals = []
+        self._starts = []
+        self._longest = datetime.timedelta(0)
+        return True
+
+    def between(
+        self,
+        start: datetime.datetime,
+        end: datetime.datetime,
+    ) -> list[tuple[datetime.datetime, datetime.datetime, int]]:
+        """Get the (opening, closing, location id) intervals overlapping a range."""
+        if start >= end:
+            return []
+        # The previous day may close after midnight
+        self._cover(
+            start.astimezone(UNISPORT_TZ).date() - datetime.timedelta(days=1),
+            end.astimezone(UNISPORT_TZ).date(),
+        )
+        low = bisect.bisect_right(self._starts, start - self._longest)
+        high = bisect.bisect_left(self._starts, end)
+        return [
+            interval for interval in self._intervals[low:high] if interval[1] > start
+        ]
+
+    def next_interval(
+        self,
+        after: datetime.datetime,
+    ) -> tuple[datetime.datetime, datetime.datetime, int] | None:
+        """Get the interval in progress, or the next one, after a point in time."""
+        intervals = self.between(
+            after, after + datetime.timedelta(days=_LOOKAHEAD_DAYS)
+        )
+        return intervals[0] if intervals else None
+
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for changes of the opening hours."""
+        self._listeners.append(update_callback)
+
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    def async_notify(self) -> None:
+        """Notify the listeners that the opening hours changed."""
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def _cover(self, first: datetime.date, last: datetime.date) -> None:
+        """Materialize the intervals of a range of days, if not already."""
+        if (
+            self._first is not None
+            and self._last is not None
+            and self._first <= first
+            and last <= self._last
+        ):
+            return
+        if self._first is not None and self._last is not None:
+            # Extend the covered days instead of replacing them, unless that
+            # would keep too many of them around
+            extended = (min(first, self._first), max(last, self._last))
+            if (extended[1] - extended[0]).days < _MAX_INDEX_DAYS:
+                first, last = extended
+        intervals = []
+        for location_id, (_, schedule) in self._locations.items():
+            day = first
+            while day <= last:
+                opening_hours = schedule.get_opening_hours(day)
+                day += datetime.timedelta(days=1)
+                if opening_hours is not None and opening_hours[0] < opening_hours[1]:
+                    intervals.append((*opening_hours, location_id))
+        intervals.sort()
+        self._first, self._last = first, last
+        self._intervals = intervals
+        self._starts = [interval[0] for interval in intervals]
+        self._longest = max(
+            (closing - opening for opening, closing, _ in intervals),
+            default=datetime.timedelta(0),
+        )
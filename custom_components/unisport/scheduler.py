@@ -0,0 +1,74 @@
+"""Adaptive refresh interval for unisport."""
+
+from __future__ import annotations
+
+import datetime
+from typing import TYPE_CHECKING
+
+from .const import UNISPORT_TZ
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from .data import UnisportLocation
+
+# Poll a bit after the opening time, so the location is already seen as open
+_OPENING_MARGIN = datetime.timedelta(seconds=30)
+
+
+class UnisportPollScheduler:
+    """
+    Derive the refresh interval from the schedules of all locations.
+
+    While any location is open, poll at `open_interval`, doubling it up to
+    `max_interval` for every refresh in a row that brought no new data. When
+    every location is closed, wait for the next opening, but refresh at least
+    every `schedule_interval` to pick up schedule changes.
+    """
+
+    def __init__(
+        self,
+        open_interval: datetime.timedelta,
+        max_interval: datetime.timedelta,
+        schedule_interval: datetime.timedelta,
+    ) -> None:
+        """Initialize."""
+        self.open_interval = open_interval
+        self.max_interval = max(max_interval, open_interval)
+        self.schedule_interval = schedule_interval
+        self._unchanged = 0
+
+    def next_interval(
+        self,
+        locations: Iterable[UnisportLocation],
+        *,
+        changed: bool,
+        now: datetime.datetime | None = None,
+    ) -> datetime.timedelta:
+        """Get the interval until the next refresh."""
+        if now is None:
+            now = datetime.datetime.now(tz=UNISPORT_TZ)
+        self._unchanged = 0 if changed else self._unchanged + 1
+
+        next_opening = None
+        for location in locations:
+            if location.schedule.is_open(now):
+                return self._open_interval()
+            transition = location.next_transition(now)
+            if transition is not None and transition[1]:
+                opening = transition[0]
+                if next_opening is None or opening < next_opening:
+                    next_opening = opening
+
+        if next_opening is None:
+            return self.schedule_interval
+        return min(next_opening - now + _OPENING_MARGIN, self.schedule_interval)
+
+    def _open_interval(self) -> datetime.timedelta:
+        """Back off exponentially while nothing changes."""
+        interval = self.open_interval
+        for _ in range(self._unchanged):
+            if interval >= self.max_interval:
+                break
+            interval *= 2
+        return min(interval, self.max_interval)
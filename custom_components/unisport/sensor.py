@@ -2,21 +2,37 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
 
 from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
 from homeassistant.components.sensor.const import SensorDeviceClass, SensorStateClass
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfInformation,
+    UnitOfTime,
+)
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
 
-from .entity import UnisportEntity
+from .const import ATTR_LOCATION_ID, ATTR_POPULAR_TIMES, ATTR_VISITORS, ATTRIBUTION
+from .entity import UnisportEntity, async_add_location_entities, entry_device_info
+from .forecast import FORECAST_HORIZONS
+from .metrics import SIZE_PAGE, STAGE_FETCH, STAGE_PARSE, STAGE_WRITE
 
 if TYPE_CHECKING:
     import datetime
+    from collections.abc import Callable
 
-    from homeassistant.core import HomeAssistant
+    from homeassistant.core import CALLBACK_TYPE, HomeAssistant
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
+    from homeassistant.helpers.typing import StateType
 
     from .coordinator import UnisportDataUpdateCoordinator
     from .data import UnisportConfigEntry, UnisportLocation
+    from .network import UnisportNetwork
 
 
 async def async_setup_entry(
@@ -26,24 +42,46 @@ async def async_setup_entry(
 ) -> None:
     """Set up the sensor platform."""
     coordinator = entry.runtime_data.coordinator
-    async_add_entities(
-        Sensor(
-            coordinator=coordinator,
-            location=location,
-        )
-        for Sensor in [
-            UnisportVisitorsSensor,
-            UnisportCapacitySensor,
-            UnisportTodayOpenSensor,
-            UnisportTodayCloseSensor,
+
+    def location_sensors(location: UnisportLocation) -> list[SensorEntity]:
+        return [
+            *(
+                Sensor(
+                    coordinator=coordinator,
+                    location=location,
+                )
+                for Sensor in [
+                    UnisportVisitorsSensor,
+                    UnisportCapacitySensor,
+                    UnisportTodayOpenSensor,
+                    UnisportTodayCloseSensor,
+                ]
+            ),
+            *(
+                UnisportVisitorsForecastSensor(
+                    coordinator=coordinator,
+                    location=location,
+                    hours=hours,
+                )
+                for hours in FORECAST_HORIZONS
+            ),
         ]
-        for location in coordinator.data.get("locations", {}).values()
+
+    async_add_location_entities(entry, async_add_entities, location_sensors)
+    async_add_entities(
+        UnisportNetworkSensor(entry, description) for description in NETWORK_SENSORS
+    )
+    async_add_entities(
+        UnisportMetricSensor(entry, description) for description in METRIC_SENSORS
     )
 
 
 class UnisportVisitorsSensor(UnisportEntity, SensorEntity):
     """Unisport num of location validations Sensor class."""
 
+    # Changes with every sample, and large: do not record it with every state
+    _unrecorded_attributes = frozenset({ATTR_POPULAR_TIMES})
+
     def __init__(
         self,
         coordinator: UnisportDataUpdateCoordinator,
@@ -55,9 +93,60 @@ class UnisportVisitorsSensor(UnisportEntity, SensorEntity):
             key=f"unisport-visitors-{location.location_id}",
             name=f"Unisport {location.name} Visitors",
             icon="mdi:account",
-            state_class=SensorStateClass.MEASUREMENT,
+            # The statistics are imported instead, see `external_statistics`,
+            # and the states only written on the heartbeat
+            state_class=None
+            if coordinator.config_entry.runtime_data.statistics is not None
+            else SensorStateClass.MEASUREMENT,
             suggested_display_precision=0,
         )
+        # Availability and staleness of the last written state
+        self._written_flags: tuple[bool, ...] | None = None
+        # Cancels the write of a suppressed count on the heartbeat
+        self._unsub_heartbeat: CALLBACK_TYPE | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Start the deadband from the first state, written once added."""
+        await super().async_added_to_hass()
+        self._written_flags = self._state_flags()
+        self.coordinator.config_entry.runtime_data.deadband.record(
+            self._location_id, self.native_value, dt_util.utcnow()
+        )
+        self.async_on_remove(self._async_cancel_heartbeat)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Only write significant changes, see `UnisportDeadband`."""
+        deadband = self.coordinator.config_entry.runtime_data.deadband
+        flags = self._state_flags()
+        now = dt_util.utcnow()
+        if flags != self._written_flags or flags[2]:
+            # Always write these, for the availability and attributes
+            deadband.record(self._location_id, self.native_value, now)
+        elif not deadband.should_write(self._location_id, self.native_value, now):
+            # The location is only updated again when it changes, which may
+            # not happen for a while
+            if self._unsub_heartbeat is None and (
+                due := deadband.heartbeat_due(self._location_id)
+            ):
+                self._unsub_heartbeat = async_track_point_in_utc_time(
+                    self.hass, self._async_handle_heartbeat, due
+                )
+            return
+        self._async_cancel_heartbeat()
+        self._written_flags = flags
+        self.async_write_ha_state()
+
+    @callback
+    def _async_handle_heartbeat(self, _: datetime.datetime) -> None:
+        self._unsub_heartbeat = None
+        self._handle_coordinator_update()
+
+    @callback
+    def _async_cancel_heartbeat(self) -> None:
+        if self._unsub_heartbeat is not None:
+            self._unsub_heartbeat()
+            self._unsub_heartbeat = None
 
     @property
     def native_value(self) -> int | None:
@@ -66,6 +155,75 @@ class UnisportVisitorsSensor(UnisportEntity, SensorEntity):
             self._location_id, 0
         )
 
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the mean visitors per weekday and hour."""
+        attributes = super().extra_state_attributes
+        history = self.coordinator.config_entry.runtime_data.history
+        aggregates = history.aggregates(self._location_id)
+        if aggregates is None:
+            return attributes
+        return {**(attributes or {}), ATTR_POPULAR_TIMES: aggregates.means()}
+
+
+class UnisportVisitorsForecastSensor(UnisportEntity, SensorEntity):
+    """Unisport forecast num of location validations Sensor class."""
+
+    def __init__(
+        self,
+        coordinator: UnisportDataUpdateCoordinator,
+        location: UnisportLocation,
+        hours: int,
+    ) -> None:
+        """Initialize the sensor class."""
+        super().__init__(coordinator, location, f"visitors_forecast_{hours}h")
+        self.entity_description = SensorEntityDescription(
+            key=f"unisport-visitors-forecast-{hours}h-{location.location_id}",
+            name=f"Unisport {location.name} Visitors in {hours}h",
+            icon="mdi:account-clock",
+            state_class=SensorStateClass.MEASUREMENT,
+            suggested_display_precision=0,
+            entity_registry_enabled_default=False,
+        )
+        self._hours = hours
+        # Availability and staleness of the last written state
+        self._written_flags: tuple[bool, ...] | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Listen for new forecasts."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.config_entry.runtime_data.forecaster.async_add_listener(
+                self._location_id,
+                self._async_write_forecast,
+            ),
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """
+        Only write availability and staleness changes.
+
+        The forecasts changing are written by the forecaster listener, during
+        the same refresh.
+        """
+        flags = self._state_flags()
+        # Always written while serving stale data, for the `age` attribute
+        if flags != self._written_flags or flags[2]:
+            self._async_write_forecast()
+
+    @callback
+    def _async_write_forecast(self) -> None:
+        self._written_flags = self._state_flags()
+        self.async_write_ha_state()
+
+    @property
+    def native_value(self) -> int | None:
+        """Return the native value of the sensor."""
+        return self.coordinator.config_entry.runtime_data.forecaster.forecast(
+            self._location_id, self._hours
+        )
+
 
 class UnisportCapacitySensor(UnisportEntity, SensorEntity):
     """Unisport location capacity Sensor class."""
@@ -95,6 +253,8 @@ class UnisportCapacitySensor(UnisportEntity, SensorEntity):
 class UnisportTodayOpenSensor(UnisportEntity, SensorEntity):
     """Unisport Opening Time Sensor class."""
 
+    _schedule_dependent = True
+
     def __init__(
         self,
         coordinator: UnisportDataUpdateCoordinator,
@@ -125,6 +285,8 @@ class UnisportTodayOpenSensor(UnisportEntity, SensorEntity):
 class UnisportTodayCloseSensor(UnisportEntity, SensorEntity):
     """Unisport Closing Time Sensor class."""
 
+    _schedule_dependent = True
+
     def __init__(
         self,
         coordinator: UnisportDataUpdateCoordinator,
@@ -150,3 +312,185 @@ class UnisportTodayCloseSensor(UnisportEntity, SensorEntity):
         if not opening_hours:
             return None
         return opening_hours[1]
+
+
+@dataclass(frozen=True, kw_only=True)
+class UnisportMetricSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor of a pipeline figure."""
+
+    # Name of the figure in `UnisportMetrics`
+    figure: str
+    # Percentile of the rolling window, None for the last sample
+    percentile: float | None = None
+
+
+METRIC_SENSORS = (
+    UnisportMetricSensorEntityDescription(
+        key="fetch_time",
+        name="Unisport Fetch Time p95",
+        icon="mdi:timer-outline",
+        figure=STAGE_FETCH,
+        percentile=0.95,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+    ),
+    UnisportMetricSensorEntityDescription(
+        key="parse_time",
+        name="Unisport Parse Time p95",
+        icon="mdi:timer-cog-outline",
+        figure=STAGE_PARSE,
+        percentile=0.95,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+    ),
+    UnisportMetricSensorEntityDescription(
+        key="write_time",
+        name="Unisport State Write Time p95",
+        icon="mdi:timer-edit-outline",
+        figure=STAGE_WRITE,
+        percentile=0.95,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+    ),
+    UnisportMetricSensorEntityDescription(
+        key="page_size",
+        name="Unisport Page Size",
+        icon="mdi:file-download-outline",
+        figure=SIZE_PAGE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+    ),
+)
+
+
+class UnisportMetricSensor(SensorEntity):
+    """Unisport fetch and parse figure Sensor class."""
+
+    _attr_attribution = ATTRIBUTION
+    _attr_should_poll = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 0
+    entity_description: UnisportMetricSensorEntityDescription
+
+    def __init__(
+        self,
+        entry: UnisportConfigEntry,
+        description: UnisportMetricSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor class."""
+        self.entity_description = description
+        self._metrics = entry.runtime_data.metrics
+        self._attr_unique_id = f"{entry.entry_id}-{description.key}"
+        self._attr_device_info = entry_device_info(entry)
+
+    async def async_added_to_hass(self) -> None:
+        """Update after every refresh."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._metrics.async_add_listener(self.async_write_ha_state),
+        )
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the native value of the sensor."""
+        stats = self._metrics.get(self.entity_description.figure)
+        if stats is None:
+            return None
+        if self.entity_description.percentile is None:
+            return stats.last
+        return stats.percentile(self.entity_description.percentile)
+
+
+@dataclass(frozen=True, kw_only=True)
+class UnisportNetworkSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor of the totals over every location."""
+
+    value_fn: Callable[[UnisportNetwork], StateType]
+    attributes_fn: Callable[[UnisportNetwork], dict[str, Any] | None] = lambda _: None
+
+
+def _least_crowded_attributes(network: UnisportNetwork) -> dict[str, Any] | None:
+    if (location_id := network.least_crowded) is None:
+        return None
+    return {
+        ATTR_LOCATION_ID: location_id,
+        ATTR_VISITORS: network.visitors(location_id),
+    }
+
+
+NETWORK_SENSORS = (
+    UnisportNetworkSensorEntityDescription(
+        key="total_visitors",
+        name="Unisport Total Visitors",
+        icon="mdi:account-group",
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        value_fn=lambda network: network.total_visitors,
+    ),
+    UnisportNetworkSensorEntityDescription(
+        key="open_capacity",
+        name="Unisport Open Capacity",
+        icon="mdi:account-multiple-check",
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        value_fn=lambda network: network.open_capacity,
+    ),
+    UnisportNetworkSensorEntityDescription(
+        key="utilization",
+        name="Unisport Utilization",
+        icon="mdi:gauge",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        value_fn=lambda network: network.utilization,
+    ),
+    UnisportNetworkSensorEntityDescription(
+        key="least_crowded",
+        name="Unisport Least Crowded Open Gym",
+        icon="mdi:account-arrow-down",
+        value_fn=lambda network: (
+            None
+            if (location_id := network.least_crowded) is None
+            else network.name(location_id)
+        ),
+        attributes_fn=_least_crowded_attributes,
+    ),
+)
+
+
+class UnisportNetworkSensor(SensorEntity):
+    """Unisport totals over every location Sensor class."""
+
+    _attr_attribution = ATTRIBUTION
+    _attr_should_poll = False
+    entity_description: UnisportNetworkSensorEntityDescription
+
+    def __init__(
+        self,
+        entry: UnisportConfigEntry,
+        description: UnisportNetworkSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor class."""
+        self.entity_description = description
+        self._network = entry.runtime_data.coordinator.network
+        self._attr_unique_id = f"{entry.entry_id}-{description.key}"
+        self._attr_device_info = entry_device_info(entry)
+
+    async def async_added_to_hass(self) -> None:
+        """Update when the totals change."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._network.async_add_listener(self.async_write_ha_state),
+        )
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the native value of the sensor."""
+        return self.entity_description.value_fn(self._network)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the attributes of the sensor."""
+        return self.entity_description.attributes_fn(self._network)
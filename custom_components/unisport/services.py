@@ -0,0 +1,174 @@
+"""Services for unisport."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import SupportsResponse, callback
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse
+
+    from .data import UnisportConfigEntry
+
+SERVICE_GET_POPULAR_TIMES = "get_popular_times"
+SERVICE_BACKFILL_STATISTICS = "backfill_statistics"
+SERVICE_PROFILE = "profile"
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_LOCATION_ID = "location_id"
+ATTR_CYCLES = "cycles"
+ATTR_TOP = "top"
+ATTR_REFRESH = "refresh"
+
+GET_POPULAR_TIMES_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_LOCATION_ID): vol.Coerce(int),
+    }
+)
+BACKFILL_STATISTICS_SCHEMA = GET_POPULAR_TIMES_SCHEMA
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_CYCLES, default=3): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=100)
+        ),
+        vol.Optional(ATTR_TOP, default=25): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=500)
+        ),
+        vol.Optional(ATTR_REFRESH, default=False): cv.boolean,
+    }
+)
+
+
+def _get_entries(hass: HomeAssistant, call: ServiceCall) -> list[UnisportConfigEntry]:
+    """Get the loaded entries a service call applies to."""
+    entries = [
+        entry
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.state is ConfigEntryState.LOADED
+        and call.data.get(ATTR_CONFIG_ENTRY_ID, entry.entry_id) == entry.entry_id
+    ]
+    if not entries:
+        msg = "No loaded unisport entry found"
+        raise ServiceValidationError(msg)
+    return entries
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Set up the services for unisport."""
+
+    async def async_get_popular_times(call: ServiceCall) -> ServiceResponse:
+        """Get the visitors per weekday and hour of the locations."""
+        locations = []
+        for entry in _get_entries(hass, call):
+            history = entry.runtime_data.history
+            names = {
+                location_id: location.name
+                for location_id, location in entry.runtime_data.coordinator.data.get(
+                    "locations", {}
+                ).items()
+            }
+            location_ids = (
+                [call.data[ATTR_LOCATION_ID]]
+                if ATTR_LOCATION_ID in call.data
+                else history.location_ids
+            )
+            for location_id in location_ids:
+                if (aggregates := history.aggregates(location_id)) is None:
+                    continue
+                locations.append(
+                    {
+                        "config_entry_id": entry.entry_id,
+                        "location_id": location_id,
+                        "name": names.get(location_id),
+                        **aggregates.as_dict(),
+                    }
+                )
+        return {"locations": locations}
+
+    async def async_backfill_statistics(call: ServiceCall) -> ServiceResponse:
+        """Import the visitor history as statistics."""
+        imported = 0
+        for entry in _get_entries(hass, call):
+            runtime_data = entry.runtime_data
+            if runtime_data.statistics is None:
+                msg = f"Statistics import is not enabled for {entry.title}"
+                raise ServiceValidationError(msg)
+            imported += await runtime_data.statistics.async_backfill(
+                [call.data[ATTR_LOCATION_ID]]
+                if ATTR_LOCATION_ID in call.data
+                else runtime_data.history.location_ids,
+                runtime_data.coordinator.data.get("locations", {}),
+            )
+        return {"samples": imported}
+
+    async def async_profile(call: ServiceCall) -> ServiceResponse:
+        """Profile the next update cycles of an entry."""
+        entries = _get_entries(hass, call)
+        if len(entries) > 1:
+            msg = "Several unisport entries are loaded, pick one to profile"
+            raise ServiceValidationError(msg)
+        entry = entries[0]
+        coordinator = entry.runtime_data.coordinator
+        if coordinator.profiler is not None:
+            msg = f"{entry.title} is already being profiled"
+            raise ServiceValidationError(msg)
+        # Only load the profilers when needed
+        from .profiler import UnisportProfiler  # noqa: PLC0415
+
+        name = f"{DOMAIN}_profile_{dt_util.now().strftime('%Y%m%d_%H%M%S')}"
+        profiler = coordinator.profiler = UnisportProfiler(
+            Path(hass.config.path(name)),
+            call.data[ATTR_CYCLES],
+            call.data[ATTR_TOP],
+        )
+        response: dict[str, Any] = {
+            "report": str(profiler.path.with_suffix(".txt")),
+            "stats": str(profiler.path.with_suffix(".prof")),
+        }
+        if not call.data[ATTR_REFRESH]:
+            # Written once the next scheduled refreshes are over
+            return response
+        while coordinator.profiler is profiler:
+            await coordinator.async_refresh()
+        await profiler.done.wait()
+        if profiler.error is not None:
+            msg = f"Could not write the profile: {profiler.error}"
+            raise HomeAssistantError(msg)
+        response["durations_ms"] = [
+            round(duration * 1000, 1) for duration in profiler.durations
+        ]
+        return response
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BACKFILL_STATISTICS,
+        async_backfill_statistics,
+        schema=BACKFILL_STATISTICS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_POPULAR_TIMES,
+        async_get_popular_times,
+        schema=GET_POPULAR_TIMES_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
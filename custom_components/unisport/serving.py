@@ -0,0 +1,144 @@
+"""Serve the last good data through upstream outages."""
+
+from __future__ import annotations
+
+import random
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.util import dt as dt_util
+
+from .api import (
+    UnisportApiClientAuthenticationError,
+    UnisportApiClientCommunicationError,
+    UnisportApiClientError,
+)
+from .const import LOGGER
+
+if TYPE_CHECKING:
+    import datetime
+
+    from .api import UnisportApiClient
+
+# Delay before the first retry, doubled with every failure in a row
+RETRY_INITIAL_DELAY = timedelta(seconds=30)
+RETRY_MAX_DELAY = timedelta(minutes=15)
+# Fraction of the delay that is randomized, so that retries spread out
+RETRY_JITTER = 0.5
+
+# Failures in a row after which no requests are made for a while
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = timedelta(minutes=15)
+
+
+class UnisportCircuitOpenError(UnisportApiClientCommunicationError):
+    """Exception to indicate that requests are held back after failures."""
+
+
+class UnisportServingClient:
+    """
+    Stale-while-revalidate layer in front of `UnisportApiClient`.
+
+    When a request fails, `async_get_data` answers None, as if nothing had
+    changed, for as long as the last good data is younger than `max_age`;
+    only then is the error raised. Retries should be made after
+    `retry_delay`, an exponential backoff with jitter. After
+    `BREAKER_THRESHOLD` failures in a row, the circuit opens: no requests
+    are made for `BREAKER_COOLDOWN`, then a single one is let through and
+    closes the circuit again if it succeeds.
+    """
+
+    def __init__(
+        self,
+        client: UnisportApiClient,
+        *,
+        max_age: timedelta,
+    ) -> None:
+        """Initialize."""
+        self.client = client
+        self.max_age = max_age
+        # Time of the last good data
+        self.last_success: datetime.datetime | None = None
+        # Failed requests in a row
+        self.failures = 0
+        self.last_error: UnisportApiClientError | None = None
+        # Until when requests are held back
+        self.open_until: datetime.datetime | None = None
+
+    @property
+    def serving_stale(self) -> bool:
+        """Whether the last request failed and the last good data is served."""
+        return self.failures > 0
+
+    def age(self, now: datetime.datetime | None = None) -> timedelta | None:
+        """Get the age of the last good data."""
+        if self.last_success is None:
+            return None
+        return (now or dt_util.utcnow()) - self.last_success
+
+    async def async_get_data(
+        self,
+        *,
+        force: bool = False,
+        now: datetime.datetime | None = None,
+    ) -> Any:
+        """
+        Get data from the API, see `UnisportApiClient.async_get_data`.
+
+        Also returns None while serving the last good data.
+        """
+        if now is None:
+            now = dt_util.utcnow()
+        if self.open_until is not None and now < self.open_until:
+            msg = f"Not requesting after {self.failures} failures in a row"
+            return self._serve_stale(now, UnisportCircuitOpenError(msg))
+        try:
+            data = await self.client.async_get_data(force=force)
+        except UnisportApiClientAuthenticationError:
+            raise
+        except UnisportApiClientError as exception:
+            self.failures += 1
+            self.last_error = exception
+            if self.failures >= BREAKER_THRESHOLD:
+                if self.open_until is None:
+                    LOGGER.warning(
+                        "Pausing requests for %s after %s failures in a row: %s",
+                        BREAKER_COOLDOWN,
+                        self.failures,
+                        exception,
+                    )
+                self.open_until = now + BREAKER_COOLDOWN
+            return self._serve_stale(now, exception)
+
+        if self.failures:
+            LOGGER.info("Recovered after %s failures in a row", self.failures)
+        self.failures = 0
+        self.last_error = None
+        self.open_until = None
+        self.last_success = now
+        return data
+
+    def retry_delay(self, now: datetime.datetime | None = None) -> timedelta | None:
+        """Get the delay before the next try, None if the last one succeeded."""
+        if not self.failures:
+            return None
+        delay = min(
+            RETRY_INITIAL_DELAY * 2 ** min(self.failures - 1, 16),
+            RETRY_MAX_DELAY,
+        )
+        # Not cryptographic, only spreading retries out
+        delay *= 1 - RETRY_JITTER * random.random()  # noqa: S311
+        if self.open_until is not None:
+            delay = max(delay, self.open_until - (now or dt_util.utcnow()))
+        return delay
+
+    def _serve_stale(
+        self,
+        now: datetime.datetime,
+        exception: UnisportApiClientError,
+    ) -> None:
+        """Serve the last good data if recent enough, raise otherwise."""
+        age = self.age(now)
+        if age is None or age > self.max_age:
+            raise exception
+        LOGGER.debug("Serving data from %s ago: %s", age, exception)
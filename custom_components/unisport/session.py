@@ -0,0 +1,140 @@
+"""HTTP session shared by every config entry, tuned for polling one host."""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+from aiohttp import hdrs
+from aiohttp.compression_utils import HAS_BROTLI
+from aiohttp.resolver import AsyncResolver
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import callback
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.util import ssl as ssl_util
+from homeassistant.util.hass_dict import HassKey
+
+from .api import REQUEST_TIMEOUT
+from .const import DOMAIN
+from .fetcher import MAX_CONCURRENT_FETCHES
+from .metrics import STAGE_DNS, STAGE_HANDSHAKE, UNIT_MS, UnisportMetrics
+
+if TYPE_CHECKING:
+    from types import SimpleNamespace
+
+    from homeassistant.core import Event, HomeAssistant
+
+# Seconds the resolved addresses of oma.enkora.fi are reused
+DNS_CACHE_TTL = 10 * 60
+# Seconds an idle connection is kept, longer than the 5 minute polls while
+# open. Connections the server closed in the meantime are not reused
+KEEPALIVE_TIMEOUT = 6 * 60
+# Compressions the populartimes reader can decode, brotli only when installed
+ACCEPT_ENCODING = "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate"
+
+DATA_SESSION: HassKey[aiohttp.ClientSession] = HassKey(f"{DOMAIN}_session")
+
+
+@callback
+def async_get_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Get the session, creating it for the first entry."""
+    session = hass.data.get(DATA_SESSION)
+    if session is None or session.closed:
+        session = hass.data[DATA_SESSION] = create_session()
+
+        async def _async_close(_event: Event) -> None:
+            await session.close()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close)
+    return session
+
+
+def create_session() -> aiohttp.ClientSession:
+    """
+    Create a session with its own connection pool.
+
+    Unlike the shared Home Assistant session, connections to the host are
+    kept alive between polls, resolved addresses are cached, and the DNS
+    and handshake times are recorded into the metrics of the client making
+    the request, see `UnisportApiClient`.
+    """
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            ssl=ssl_util.client_context(),
+            resolver=AsyncResolver(),
+            ttl_dns_cache=DNS_CACHE_TTL,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            limit_per_host=MAX_CONCURRENT_FETCHES,
+        ),
+        headers={
+            hdrs.USER_AGENT: SERVER_SOFTWARE,
+            hdrs.ACCEPT_ENCODING: ACCEPT_ENCODING,
+        },
+        timeout=REQUEST_TIMEOUT,
+        trace_configs=[trace_config()],
+    )
+
+
+def trace_config() -> aiohttp.TraceConfig:
+    """Record the DNS and handshake times of the requests."""
+    config = aiohttp.TraceConfig()
+
+    async def on_request_start(
+        _session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        _params: Any,
+    ) -> None:
+        context.dns = 0.0
+        context.connect = 0.0
+
+    async def on_dns_resolvehost_start(
+        _session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        _params: Any,
+    ) -> None:
+        context.dns_start = time.perf_counter()
+
+    async def on_dns_resolvehost_end(
+        _session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        _params: Any,
+    ) -> None:
+        context.dns = time.perf_counter() - context.dns_start
+        if isinstance(metrics := context.trace_request_ctx, UnisportMetrics):
+            metrics.add(STAGE_DNS, context.dns * 1000, UNIT_MS)
+
+    async def on_connection_create_start(
+        _session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        _params: Any,
+    ) -> None:
+        context.connect_start = time.perf_counter()
+
+    async def on_connection_create_end(
+        _session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        _params: Any,
+    ) -> None:
+        context.connect = time.perf_counter() - context.connect_start
+
+    async def on_request_end(
+        _session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        _params: Any,
+    ) -> None:
+        # Connecting includes resolving the host, when not cached
+        if isinstance(metrics := context.trace_request_ctx, UnisportMetrics):
+            metrics.add(
+                STAGE_HANDSHAKE,
+                max(context.connect - context.dns, 0.0) * 1000,
+                UNIT_MS,
+            )
+
+    config.on_request_start.append(on_request_start)
+    config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+    config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+    config.on_connection_create_start.append(on_connection_create_start)
+    config.on_connection_create_end.append(on_connection_create_end)
+    config.on_request_end.append(on_request_end)
+    return config
@@ -0,0 +1,101 @@
+"""Last known populartimes snapshot, persisted across restarts."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    import datetime
+
+    from homeassistant.core import HomeAssistant
+
+    from .data import UnisportLocation
+
+STORAGE_VERSION = 1
+# Seconds to wait for more changes before writing the snapshot to disk, the
+# pending write is flushed when Home Assistant stops
+SAVE_DELAY = 10 * 60
+
+
+def _encode_location(location: UnisportLocation) -> dict[str, Any]:
+    """Encode a location the way the `populartimes` page does."""
+    return {
+        "location_id": location.location_id,
+        "name": location.name,
+        "max_capacity": location.max_capacity,
+        "opening_hours": {
+            str(weekday): {
+                "time_start": opening_hour.time_start,
+                "time_end": opening_hour.time_end,
+            }
+            for weekday, opening_hour in location.opening_hours.items()
+        },
+    }
+
+
+class UnisportSnapshotStore:
+    """
+    Persist the last good snapshot of an entry with the storage helper.
+
+    The snapshot is stored in the format of the `populartimes` payloads, so
+    it is loaded back with the same decoder as a fresh response.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass,
+            STORAGE_VERSION,
+            f"{DOMAIN}.{entry_id}.snapshot",
+        )
+        self._data: dict[str, Any] | None = None
+        self._updated: datetime.datetime | None = None
+
+    async def async_load(self) -> tuple[Any, Any, datetime.datetime | None] | None:
+        """
+        Load the snapshot, None if not saved.
+
+        Returns the locations and live validations payloads, and the time the
+        snapshot was fetched.
+        """
+        if not (stored := await self._store.async_load()):
+            return None
+        return (
+            stored["locations"],
+            stored["live_validations"],
+            dt_util.parse_datetime(stored.get("updated") or ""),
+        )
+
+    def async_save(self, data: dict[str, Any], updated: datetime.datetime) -> None:
+        """Save a decoded snapshot fetched at a point in time, delayed."""
+        self._data = data
+        self._updated = updated
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    async def async_flush(self) -> None:
+        """Write the last saved snapshot to disk now."""
+        if self._data is not None:
+            await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        """Remove the snapshot from disk."""
+        await self._store.async_remove()
+
+    def _data_to_save(self) -> dict[str, Any]:
+        data = self._data or {}
+        return {
+            "updated": self._updated.isoformat() if self._updated else None,
+            "locations": {
+                str(location_id): _encode_location(location)
+                for location_id, location in data.get("locations", {}).items()
+            },
+            "live_validations": {
+                str(location_id): visitors
+                for location_id, visitors in data.get("live_validations", {}).items()
+            },
+        }
@@ -0,0 +1,276 @@
+"""Occupancy thresholds of the locations, firing events when crossed."""
+
+from __future__ import annotations
+
+import datetime
+from dataclasses import dataclass
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, EVENT_OCCUPANCY_THRESHOLD, LOGGER
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+    from homeassistant.core import HomeAssistant
+
+    from .data import UnisportLocation
+
+STORAGE_VERSION = 1
+# Seconds to wait for more changes before writing the states to disk
+SAVE_DELAY = 60
+
+METRIC_VISITORS = "visitors"
+METRIC_UTILIZATION = "utilization"
+
+STATE_ABOVE = "above"
+STATE_BELOW = "below"
+
+THRESHOLD_SCHEMA = vol.Schema(
+    {
+        vol.Required("location_id"): vol.Coerce(int),
+        vol.Optional("metric", default=METRIC_UTILIZATION): vol.In(
+            [METRIC_VISITORS, METRIC_UTILIZATION]
+        ),
+        vol.Required("value"): vol.Coerce(float),
+        vol.Optional("hysteresis", default=0): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+        # Minutes
+        vol.Optional("dwell", default=0): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional("name"): cv.string,
+    }
+)
+THRESHOLDS_SCHEMA = vol.All(cv.ensure_list, [THRESHOLD_SCHEMA])
+
+
+@dataclass(frozen=True, slots=True)
+class UnisportThreshold:
+    """A threshold on the visitors or utilization of a location."""
+
+    location_id: int
+    metric: str
+    value: float
+    # Distance the measure must go past the value, either way, to cross it
+    hysteresis: float
+    # Time the measure must stay crossed before the threshold is
+    dwell: datetime.timedelta
+    name: str | None = None
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> UnisportThreshold:
+        """Create a threshold from an item of the `thresholds` option."""
+        config = THRESHOLD_SCHEMA(dict(config))
+        return cls(
+            location_id=config["location_id"],
+            metric=config["metric"],
+            value=config["value"],
+            hysteresis=config["hysteresis"],
+            dwell=datetime.timedelta(minutes=config["dwell"]),
+            name=config.get("name"),
+        )
+
+    @property
+    def key(self) -> str:
+        """Identify the threshold in the stored states."""
+        return self.name or f"{self.location_id}-{self.metric}-{self.value:g}"
+
+    def side(self, measure: float, current: str | None) -> str:
+        """Get the side of the threshold a measure is on, given the current one."""
+        if measure >= self.value + self.hysteresis:
+            return STATE_ABOVE
+        if measure < self.value - self.hysteresis:
+            return STATE_BELOW
+        if current is not None:
+            return current
+        return STATE_ABOVE if measure >= self.value else STATE_BELOW
+
+
+class UnisportThresholdEngine:
+    """
+    Evaluate the thresholds of the changed locations after every refresh.
+
+    A threshold is crossed once the measure goes past the value plus or
+    minus the hysteresis and stays there for the dwell time, which fires one
+    `unisport_occupancy_threshold` event. The first evaluation of a threshold
+    only sets its side. Sides and pending crossings are persisted, so a
+    restart neither fires again nor misses a crossing.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        thresholds: Iterable[UnisportThreshold],
+    ) -> None:
+        """Initialize."""
+        self._hass = hass
+        self._entry_id = entry_id
+        self._store: Store[dict[str, Any]] = Store(
+            hass,
+            STORAGE_VERSION,
+            f"{DOMAIN}.{entry_id}.thresholds",
+        )
+        # Location id -> its thresholds
+        self._thresholds: dict[int, list[UnisportThreshold]] = {}
+        for threshold in thresholds:
+            self._thresholds.setdefault(threshold.location_id, []).append(threshold)
+        # Threshold key -> side
+        self._sides: dict[str, str] = {}
+        # Threshold key -> side being crossed to and since when
+        self._pending: dict[str, tuple[str, datetime.datetime]] = {}
+        # Threshold key -> cancel callback of the end of its dwell time
+        self._timers: dict[str, CALLBACK_TYPE] = {}
+        # Last seen measures, to evaluate again at the end of a dwell time
+        self._locations: Mapping[int, UnisportLocation] = {}
+        self._live_validations: Mapping[int, int] = {}
+
+    @property
+    def location_ids(self) -> set[int]:
+        """Ids of the locations with thresholds."""
+        return set(self._thresholds)
+
+    async def async_load(self) -> None:
+        """Load the sides and pending crossings from disk."""
+        if not (stored := await self._store.async_load()):
+            return
+        keys = {
+            threshold.key
+            for thresholds in self._thresholds.values()
+            for threshold in thresholds
+        }
+        self._sides = {
+            key: side for key, side in stored.get("sides", {}).items() if key in keys
+        }
+        for key, (side, since) in stored.get("pending", {}).items():
+            if key in keys and (moment := dt_util.parse_datetime(since)) is not None:
+                self._pending[key] = (side, moment)
+
+    @callback
+    def async_evaluate(
+        self,
+        location_ids: Iterable[int],
+        locations: Mapping[int, UnisportLocation],
+        live_validations: Mapping[int, int],
+    ) -> None:
+        """Evaluate the thresholds of some locations."""
+        self._locations = locations
+        self._live_validations = live_validations
+        now = dt_util.utcnow()
+        changed = False
+        for location_id in location_ids:
+            for threshold in self._thresholds.get(location_id, ()):
+                changed |= self._evaluate(threshold, now)
+        if changed:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel the dwell timers."""
+        for cancel in self._timers.values():
+            cancel()
+        self._timers.clear()
+
+    async def async_save(self) -> None:
+        """Write the sides and pending crossings to disk now."""
+        if self._thresholds:
+            await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        """Remove the sides and pending crossings from disk."""
+        await self._store.async_remove()
+
+    def _measure(self, threshold: UnisportThreshold) -> float | None:
+        location = self._locations.get(threshold.location_id)
+        if location is None:
+            return None
+        visitors = self._live_validations.get(threshold.location_id, 0)
+        if threshold.metric == METRIC_VISITORS:
+            return visitors
+        if location.max_capacity <= 0:
+            return None
+        return visitors / location.max_capacity * 100
+
+    def _evaluate(self, threshold: UnisportThreshold, now: datetime.datetime) -> bool:
+        """Evaluate a threshold, return if its state changed."""
+        key = threshold.key
+        if (measure := self._measure(threshold)) is None:
+            return False
+        current = self._sides.get(key)
+        side = threshold.side(measure, current)
+        if current is None:
+            self._sides[key] = side
+            return True
+        pending = self._pending.get(key)
+        if side == current:
+            if pending is None:
+                return False
+            # Went back before the dwell time was over
+            self._cancel_timer(key)
+            del self._pending[key]
+            return True
+        if pending is None or pending[0] != side:
+            pending = self._pending[key] = (side, now)
+        if now - pending[1] < threshold.dwell:
+            if key not in self._timers:
+                self._timers[key] = async_track_point_in_utc_time(
+                    self._hass,
+                    partial(self._async_handle_dwell, threshold),
+                    pending[1] + threshold.dwell,
+                )
+            return True
+        self._cancel_timer(key)
+        del self._pending[key]
+        self._sides[key] = side
+        self._fire(threshold, side, measure)
+        return True
+
+    @callback
+    def _async_handle_dwell(
+        self,
+        threshold: UnisportThreshold,
+        now: datetime.datetime,
+    ) -> None:
+        """Evaluate a threshold again at the end of its dwell time."""
+        self._timers.pop(threshold.key, None)
+        if self._evaluate(threshold, now):
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _cancel_timer(self, key: str) -> None:
+        if cancel := self._timers.pop(key, None):
+            cancel()
+
+    def _fire(self, threshold: UnisportThreshold, side: str, measure: float) -> None:
+        location = self._locations[threshold.location_id]
+        LOGGER.debug("%s went %s %s", location.name, side, threshold.value)
+        self._hass.bus.async_fire(
+            EVENT_OCCUPANCY_THRESHOLD,
+            {
+                "config_entry_id": self._entry_id,
+                "location_id": threshold.location_id,
+                "name": location.name,
+                "threshold": threshold.key,
+                "metric": threshold.metric,
+                "value": threshold.value,
+                "direction": side,
+                "measure": measure,
+                "visitors": self._live_validations.get(threshold.location_id, 0),
+                "max_capacity": location.max_capacity,
+            },
+        )
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "sides": self._sides,
+            "pending": {
+                key: [side, since.isoformat()]
+                for key, (side, since) in self._pending.items()
+            },
+        }
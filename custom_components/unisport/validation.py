@@ -0,0 +1,44 @@
+"""
+Strict validation of the `populartimes` payloads for unisport.
+
+Only imported when strict validation is enabled, so that pydantic is not
+loaded otherwise.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class UnisportLocationOpeningHourModel(BaseModel):
+    """Opening hours for a location."""
+
+    time_start: str
+    time_end: str
+
+
+class UnisportLocationModel(BaseModel):
+    """Locations field of the response of the `populartimes` endpoint."""
+
+    location_id: int
+    name: str
+    max_capacity: int
+    opening_hours: dict[int, UnisportLocationOpeningHourModel]
+
+
+class UnisportResponseModel(BaseModel):
+    """Response of the `populartimes` endpoint."""
+
+    # Key for these fields: location id
+    live_validations: dict[int, int]
+    locations: dict[int, UnisportLocationModel]
+
+
+def validate(locations: Any, live_validations: Any) -> None:
+    """Validate the payloads, raise `pydantic.ValidationError` if invalid."""
+    UnisportResponseModel(
+        locations=locations,
+        live_validations=live_validations or {},
+    )
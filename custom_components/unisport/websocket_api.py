@@ -0,0 +1,291 @@
+"""Websocket commands serving the dashboard data of every location at once."""
+
+from __future__ import annotations
+
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Collection, Iterable
+
+    from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+
+    from .data import UnisportConfigEntry, UnisportLocation
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_LOCATION_IDS = "location_ids"
+# Length of the recent occupancy series, in hours, and of its steps, in minutes
+ATTR_HOURS = "hours"
+ATTR_STEP = "step"
+
+DEFAULT_HOURS = 24
+DEFAULT_STEP = 15
+
+SNAPSHOT_PARAMS = {
+    vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    vol.Optional(ATTR_LOCATION_IDS): [vol.Coerce(int)],
+    vol.Optional(ATTR_HOURS, default=DEFAULT_HOURS): vol.All(
+        vol.Coerce(int), vol.Range(min=0, max=7 * 24)
+    ),
+    vol.Optional(ATTR_STEP, default=DEFAULT_STEP): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=24 * 60)
+    ),
+}
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register the websocket commands."""
+    websocket_api.async_register_command(hass, websocket_snapshot)
+    websocket_api.async_register_command(hass, websocket_subscribe)
+
+
+def _get_entries(
+    hass: HomeAssistant,
+    msg: dict[str, Any],
+) -> list[UnisportConfigEntry]:
+    """Get the loaded entries a command applies to."""
+    return [
+        entry
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.state is ConfigEntryState.LOADED
+        and msg.get(ATTR_CONFIG_ENTRY_ID, entry.entry_id) == entry.entry_id
+    ]
+
+
+def _location_ids(
+    entry: UnisportConfigEntry,
+    selected: Collection[int] | None,
+) -> list[int]:
+    """Get the ids of the locations of an entry a command applies to."""
+    locations = entry.runtime_data.coordinator.data.get("locations", {})
+    if selected is None:
+        return list(locations)
+    return [location_id for location_id in selected if location_id in locations]
+
+
+def _location_state(location: UnisportLocation, visitors: int | None) -> dict[str, Any]:
+    """Get the current state of a location, with times as timestamps."""
+    hours = location.get_opening_hour_today()
+    return {
+        "name": location.name,
+        "visitors": visitors,
+        "capacity": location.max_capacity,
+        "open": location.is_open_now(),
+        "hours": [int(hours[0].timestamp()), int(hours[1].timestamp())]
+        if hours
+        else None,
+    }
+
+
+def _entry_states(
+    entry: UnisportConfigEntry,
+    location_ids: Iterable[int],
+) -> dict[str, dict[str, Any] | None]:
+    """Get the states of some locations of an entry, None for removed ones."""
+    data = entry.runtime_data.coordinator.data
+    locations = data.get("locations", {})
+    live_validations = data.get("live_validations", {})
+    return {
+        str(location_id): _location_state(location, live_validations.get(location_id))
+        if (location := locations.get(location_id)) is not None
+        else None
+        for location_id in location_ids
+    }
+
+
+def _entry_snapshot(
+    entry: UnisportConfigEntry,
+    selected: Collection[int] | None,
+    hours: int,
+    step: int,
+) -> dict[str, Any]:
+    """Get the states and recent occupancy of the locations of an entry."""
+    location_ids = _location_ids(entry, selected)
+    states = _entry_states(entry, location_ids)
+    step_seconds = step * 60
+    start = int(dt_util.utcnow().timestamp()) - hours * 3600
+    start -= start % step_seconds
+    start, series = entry.runtime_data.history.series(location_ids, start, step_seconds)
+    for location_id in location_ids:
+        if (state := states[str(location_id)]) is not None:
+            state["series"] = series.get(location_id, [])
+    return {
+        "config_entry_id": entry.entry_id,
+        "title": entry.title,
+        "stale": entry.runtime_data.coordinator.stale,
+        "series": {"start": start, "step": step_seconds},
+        "locations": states,
+    }
+
+
+@websocket_api.websocket_command(
+    {vol.Required("type"): f"{DOMAIN}/snapshot", **SNAPSHOT_PARAMS}
+)
+@callback
+def websocket_snapshot(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """
+    Get the current state and recent occupancy of every location at once.
+
+    The recent occupancy is the mean visitors per `step` minutes over the
+    last `hours` hours, from the visitor history of the entry, starting at
+    the first step with samples.
+    """
+    if not (entries := _get_entries(hass, msg)):
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "No loaded unisport entry found"
+        )
+        return
+    selected = msg.get(ATTR_LOCATION_IDS)
+    connection.send_result(
+        msg["id"],
+        {
+            "entries": [
+                _entry_snapshot(entry, selected, msg[ATTR_HOURS], msg[ATTR_STEP])
+                for entry in entries
+            ]
+        },
+    )
+
+
+class _Subscription:
+    """Changes of the locations of an entry, pushed as they happen."""
+
+    def __init__(
+        self,
+        entry: UnisportConfigEntry,
+        selected: Collection[int] | None,
+        send: Callable[[dict[str, Any]], None],
+        states: dict[str, dict[str, Any] | None],
+    ) -> None:
+        """Initialize, with the states already sent."""
+        self._entry = entry
+        self._selected = None if selected is None else set(selected)
+        self._send = send
+        # Without the series, which the client extends from the deltas
+        self._states = {
+            location_id: None
+            if state is None
+            else {key: value for key, value in state.items() if key != "series"}
+            for location_id, state in states.items()
+        }
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Listen for refreshes and schedule transitions, returns the stop."""
+        coordinator = self._entry.runtime_data.coordinator
+        removers = [coordinator.async_add_listener(self._async_handle_update)]
+        removers.extend(
+            coordinator.async_add_schedule_listener(
+                location_id, partial(self._async_push, (location_id,))
+            )
+            for location_id in _location_ids(self._entry, self._selected)
+        )
+
+        @callback
+        def stop() -> None:
+            for remove in removers:
+                remove()
+
+        return stop
+
+    @callback
+    def _async_handle_update(self) -> None:
+        """Push the changes of a refresh."""
+        coordinator = self._entry.runtime_data.coordinator
+        if coordinator.changed_locations is None:
+            location_ids: Iterable[int] = {
+                *coordinator.data.get("locations", {}),
+                *map(int, self._states),
+            }
+        else:
+            location_ids = coordinator.changed_locations
+        if self._selected is not None:
+            location_ids = self._selected.intersection(location_ids)
+        self._async_push(location_ids)
+
+    @callback
+    def _async_push(self, location_ids: Iterable[int]) -> None:
+        """Push the fields of some locations that differ from the last sent."""
+        deltas: dict[str, dict[str, Any] | None] = {}
+        for location_id, state in _entry_states(self._entry, location_ids).items():
+            previous = self._states.get(location_id)
+            if state == previous:
+                continue
+            self._states[location_id] = state
+            if state is None or previous is None:
+                deltas[location_id] = state
+            else:
+                deltas[location_id] = {
+                    key: value
+                    for key, value in state.items()
+                    if previous.get(key) != value
+                }
+        if deltas:
+            self._send(
+                {
+                    "config_entry_id": self._entry.entry_id,
+                    "time": int(dt_util.utcnow().timestamp()),
+                    "locations": deltas,
+                }
+            )
+
+
+@websocket_api.websocket_command(
+    {vol.Required("type"): f"{DOMAIN}/subscribe", **SNAPSHOT_PARAMS}
+)
+@callback
+def websocket_subscribe(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """
+    Subscribe to the state of every location.
+
+    The first event has the same `entries` as `unisport/snapshot`, the next
+    ones only the fields of the locations that changed since, with the time
+    of the change, and None for removed locations. Entries loaded after
+    subscribing are not followed, nor entries once unloaded.
+    """
+    if not (entries := _get_entries(hass, msg)):
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "No loaded unisport entry found"
+        )
+        return
+    selected = msg.get(ATTR_LOCATION_IDS)
+
+    @callback
+    def send(event: dict[str, Any]) -> None:
+        connection.send_message(websocket_api.event_message(msg["id"], event))
+
+    snapshots = [
+        _entry_snapshot(entry, selected, msg[ATTR_HOURS], msg[ATTR_STEP])
+        for entry in entries
+    ]
+    stops = [
+        _Subscription(entry, selected, send, snapshot["locations"]).async_start()
+        for entry, snapshot in zip(entries, snapshots, strict=True)
+    ]
+
+    @callback
+    def unsubscribe() -> None:
+        for stop in stops:
+            stop()
+
+    connection.subscriptions[msg["id"]] = unsubscribe
+    connection.send_result(msg["id"])
+    send({"entries": snapshots})
@@ -0,0 +1,432 @@
+"""
+Benchmark the fetch / parse / update path of the unisport integration.
+
+Serves synthetic (or recorded) populartimes pages from a local aiohttp stub
+server, and measures for each page size:
+
+- end to end `UnisportApiClient.async_get_data` latency, for changed pages
+  and for unchanged ones (answered with 304 Not Modified)
+- bytes read from the server, and peak memory while fetching
+- parse time of the streaming scanner versus the regexes it replaced, and
+  `json.loads` time
+- model build time and allocations per poll, for the pydantic models used
+  for strict validation and the dataclasses decoded by default
+- with `--imports`, import time of the integration and of pydantic on top of
+  the Home Assistant modules it needs
+- bytes received and handshake time per poll, with a default aiohttp session
+  closing the connection once the assignments are read, as before, and with
+  the tuned session of the integration keeping it alive (with `--gzip`, the
+  stub server compresses the pages it serves)
+
+With `--hass`, it also sets the integration up in a test Home Assistant
+instance (needs `pytest-homeassistant-custom-component`) and measures the
+time from a coordinator refresh to the last state write.
+
+Usage:
+    python scripts/benchmark.py
+    python scripts/benchmark.py --sizes 5 500 5000 --runs 20 --json out.json
+    python scripts/benchmark.py --page recorded.html --hass
+    python scripts/benchmark.py --sizes 500 --gzip
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import gzip
+import hashlib
+import json
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from unittest.mock import patch
+
+import aiohttp
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.unisport import api  # noqa: E402
+from custom_components.unisport.data import UnisportDecoder  # noqa: E402
+from custom_components.unisport.metrics import (  # noqa: E402
+    SIZE_WIRE,
+    STAGE_HANDSHAKE,
+)
+from custom_components.unisport.session import (  # noqa: E402
+    create_session,
+    trace_config,
+)
+
+PATH = "/unisport/populartimes"
+
+
+def make_page(locations: int, *, padding: int = 64 * 1024, seed: int = 0) -> bytes:
+    """Build a populartimes page with a number of locations."""
+    rnd = random.Random(seed)
+    payload = {
+        str(location_id): {
+            "location_id": location_id,
+            "name": f"Location {location_id}",
+            "max_capacity": rnd.randint(20, 300),
+            "opening_hours": {
+                str(weekday): {
+                    "time_start": f"{rnd.randint(6, 9):02}:00:00",
+                    "time_end": "24:00:00" if weekday == 5 else "21:00:00",
+                }
+                for weekday in range(1, 8)
+            },
+        }
+        for location_id in range(1, locations + 1)
+    }
+    validations = {str(location_id): rnd.randint(0, 200) for location_id in payload}
+    filler = "<div class='filler'>" + "x" * 80 + "</div>\n"
+    markup = filler * (padding // len(filler))
+    return (
+        "<!DOCTYPE html>\n<html>\n<head>\n"
+        f"{markup}"
+        "</head>\n<body>\n<script>\n"
+        f"    const locations = {json.dumps(payload)};\n"
+        f"    const live_validations = {json.dumps(validations)};\n"
+        "</script>\n"
+        f"{markup}"
+        "</body>\n</html>\n"
+    ).encode()
+
+
+def touch_page(page: bytes, seed: int) -> bytes:
+    """Change the visitors of a page, so it is not answered with a 304."""
+    match = re.search(rb"const live_validations = (.*);", page)
+    validations = json.loads(match.group(1))
+    rnd = random.Random(seed)
+    for location_id in validations:
+        validations[location_id] = rnd.randint(0, 200)
+    return (
+        page[: match.start(1)] + json.dumps(validations).encode() + page[match.end(1) :]
+    )
+
+
+class StubServer:
+    """Local populartimes server, honoring If-None-Match and gzip."""
+
+    def __init__(self) -> None:
+        self.page = b""
+        self.gzip = False
+        self._compressed = (b"", b"")
+        self.chunk_size = 16 * 1024
+        self._runner: web.AppRunner | None = None
+        self.url = ""
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        etag = f'"{hashlib.blake2b(self.page, digest_size=8).hexdigest()}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        body = self.page
+        response = web.StreamResponse(headers={"ETag": etag})
+        if self.gzip and "gzip" in request.headers.get("Accept-Encoding", ""):
+            if self._compressed[0] is not self.page:
+                self._compressed = (self.page, gzip.compress(self.page))
+            body = self._compressed[1]
+            response.headers["Content-Encoding"] = "gzip"
+        response.content_type = "text/html"
+        response.content_length = len(body)
+        await response.prepare(request)
+        try:
+            for start in range(0, len(body), self.chunk_size):
+                await response.write(body[start : start + self.chunk_size])
+        except (ConnectionResetError, aiohttp.ClientConnectionResetError):
+            # The client stopped reading once it had what it needed
+            pass
+        return response
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get(PATH, self.handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # noqa: SLF001
+        self.url = f"http://127.0.0.1:{port}{PATH}"
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+def _timed(func, runs: int) -> float:
+    """Get the median duration of a function, in milliseconds."""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations) * 1000
+
+
+def bench_parse(page: bytes, runs: int) -> dict[str, float]:
+    """Measure the parse backends on a page in memory."""
+    reg_locations = re.compile(r"const locations = (.*);")
+    reg_validations = re.compile(r"const live_validations = (.*);")
+
+    def regex() -> None:
+        text = page.decode()
+        reg_locations.search(text).group(1)
+        reg_validations.search(text).group(1)
+
+    def stream() -> None:
+        scanner = api._AssignmentScanner("locations", "live_validations")  # noqa: SLF001
+        for start in range(0, len(page), api.READ_CHUNK_SIZE):
+            if scanner.feed(page[start : start + api.READ_CHUNK_SIZE]):
+                break
+        else:
+            scanner.close()
+
+    scanner = api._AssignmentScanner("locations", "live_validations")  # noqa: SLF001
+    scanner.feed(page)
+    scanner.close()
+    locations = scanner.values["locations"]
+    decoded = json.loads(locations)
+
+    from custom_components.unisport.validation import UnisportLocationModel
+
+    def pydantic_models() -> dict:
+        return {int(k): UnisportLocationModel(**v) for k, v in decoded.items()}
+
+    decoder = UnisportDecoder()
+
+    def dataclasses() -> dict:
+        return decoder.decode(decoded, {})
+
+    return {
+        "parse_regex_ms": _timed(regex, runs),
+        "parse_stream_ms": _timed(stream, runs),
+        "json_ms": _timed(lambda: json.loads(locations), runs),
+        "models_pydantic_ms": _timed(pydantic_models, runs),
+        "models_dataclass_cold_ms": _timed(
+            lambda: UnisportDecoder().decode(decoded, {}), runs
+        ),
+        "models_dataclass_ms": _timed(dataclasses, runs),
+        "alloc_pydantic_kib": _allocated(pydantic_models),
+        "alloc_dataclass_kib": _allocated(dataclasses),
+    }
+
+
+def _allocated(func) -> float:
+    """Get the memory allocated by a function and still held, in KiB."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = func()
+    after = tracemalloc.take_snapshot()
+    del result
+    tracemalloc.stop()
+    return sum(stat.size_diff for stat in after.compare_to(before, "filename")) / 1024
+
+
+def bench_imports() -> dict[str, float]:
+    """Measure import times in fresh interpreters, in milliseconds."""
+    setup = (
+        "import homeassistant.helpers.update_coordinator, "
+        "homeassistant.components.sensor, homeassistant.components.binary_sensor"
+    )
+
+    def import_time(module: str) -> float:
+        code = (
+            f"import sys, time; sys.path.insert(0, {str(Path(__file__).parent.parent)!r})\n"
+            f"{setup}\n"
+            f"start = time.perf_counter(); import {module}\n"
+            "print(time.perf_counter() - start)"
+        )
+        durations = [
+            float(subprocess.check_output([sys.executable, "-c", code], text=True))
+            for _ in range(5)
+        ]
+        return statistics.median(durations) * 1000
+
+    return {
+        "import_integration_ms": import_time("custom_components.unisport"),
+        "import_pydantic_ms": import_time("pydantic"),
+    }
+
+
+async def bench_fetch(server: StubServer, page: bytes, runs: int) -> dict[str, float]:
+    """Measure `async_get_data` against the stub server."""
+    received = 0
+    feed = api._AssignmentScanner.feed  # noqa: SLF001
+
+    def counting_feed(scanner, chunk: bytes) -> bool:
+        nonlocal received
+        received += len(chunk)
+        return feed(scanner, chunk)
+
+    changed, unchanged, peaks, sizes = [], [], [], []
+    with patch.object(api._AssignmentScanner, "feed", counting_feed):  # noqa: SLF001
+        async with aiohttp.ClientSession() as session:
+            client = api.UnisportApiClient(session=session, url=server.url)
+            for run in range(runs):
+                server.page = touch_page(page, run)
+                received = 0
+                start = time.perf_counter()
+                await client.async_get_data()
+                changed.append(time.perf_counter() - start)
+                sizes.append(received)
+
+                start = time.perf_counter()
+                result = await client.async_get_data()
+                unchanged.append(time.perf_counter() - start)
+                assert result is None, "unchanged page was parsed again"
+
+                # Measured apart, tracing allocations slows everything down
+                server.page = touch_page(page, runs + run)
+                gc.collect()
+                tracemalloc.start()
+                await client.async_get_data()
+                peaks.append(tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+    return {
+        "fetch_ms": statistics.median(changed) * 1000,
+        "fetch_unchanged_ms": statistics.median(unchanged) * 1000,
+        "bytes_read": statistics.median(sizes),
+        "page_bytes": len(server.page),
+        "peak_memory_kib": statistics.median(peaks) / 1024,
+    }
+
+
+async def bench_session(
+    server: StubServer, page: bytes, runs: int
+) -> dict[str, float]:
+    """Measure the bytes received and handshakes with both sessions."""
+    results = {}
+    sessions = {
+        # Closing the connection as soon as the assignments are read
+        "default": (lambda: aiohttp.ClientSession(trace_configs=[trace_config()]), -1),
+        "tuned": (create_session, api.DRAIN_LIMIT),
+    }
+    for name, (make_session, drain_limit) in sessions.items():
+        with patch.object(api, "DRAIN_LIMIT", drain_limit):
+            async with make_session() as session:
+                client = api.UnisportApiClient(session=session, url=server.url)
+                for run in range(runs):
+                    server.page = touch_page(page, run)
+                    await client.async_get_data()
+        wire = client.metrics.get(SIZE_WIRE)
+        handshake = client.metrics.get(STAGE_HANDSHAKE)
+        results[f"{name}_wire_bytes"] = wire.percentile(0.5)
+        results[f"{name}_handshake_ms"] = handshake.percentile(0.5)
+        # Polls after the first one that had to connect again
+        results[f"{name}_reconnects"] = sum(
+            1 for value in list(handshake._samples)[1:] if value > 0  # noqa: SLF001
+        )
+    return results
+
+
+async def bench_hass(server: StubServer, page: bytes, runs: int) -> dict[str, float]:
+    """Measure coordinator refresh to state writes in a test Home Assistant."""
+    from homeassistant import loader
+    from homeassistant.const import EVENT_STATE_CHANGED
+    from pytest_homeassistant_custom_component.common import (
+        MockConfigEntry,
+        async_test_home_assistant,
+    )
+
+    from custom_components.unisport.const import DOMAIN
+
+    server.page = page
+    with patch(
+        "custom_components.unisport.populartimes_url",
+        lambda _tenant: server.url,
+    ):
+        async with async_test_home_assistant() as hass:
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS)
+            entry = MockConfigEntry(domain=DOMAIN)
+            entry.add_to_hass(hass)
+            start = time.perf_counter()
+            await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done()
+            setup = time.perf_counter() - start
+            coordinator = entry.runtime_data.coordinator
+
+            writes, last_write = 0, None
+
+            def on_state_changed(_event) -> None:
+                nonlocal writes, last_write
+                writes += 1
+                last_write = time.perf_counter()
+
+            hass.bus.async_listen(EVENT_STATE_CHANGED, on_state_changed)
+            durations, counts = [], []
+            for run in range(runs):
+                server.page = touch_page(page, run)
+                writes, last_write = 0, None
+                start = time.perf_counter()
+                await coordinator.async_refresh()
+                await hass.async_block_till_done()
+                durations.append((last_write or time.perf_counter()) - start)
+                counts.append(writes)
+            await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_stop(force=True)
+    return {
+        "hass_setup_ms": setup * 1000,
+        "refresh_to_write_ms": statistics.median(durations) * 1000,
+        "state_writes": statistics.median(counts),
+    }
+
+
+def _print(name: str, result: dict[str, float]) -> None:
+    print(name)
+    for key, value in result.items():
+        print(f"  {key:<26} {value:>12.2f}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 50, 500, 5000])
+    parser.add_argument("--page", type=Path, action="append", default=[])
+    parser.add_argument("--padding", type=int, default=64 * 1024)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--hass", action="store_true")
+    parser.add_argument("--imports", action="store_true")
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--json", type=Path)
+    args = parser.parse_args()
+
+    pages = {path.name: path.read_bytes() for path in args.page}
+    pages.update(
+        {
+            f"{size} locations": make_page(size, padding=args.padding)
+            for size in args.sizes
+        }
+    )
+
+    results = {}
+    if args.imports:
+        results["imports"] = bench_imports()
+        _print("imports", results["imports"])
+
+    server = StubServer()
+    server.gzip = args.gzip
+    await server.start()
+    try:
+        for name, page in pages.items():
+            result = bench_parse(page, args.runs)
+            result.update(await bench_fetch(server, page, args.runs))
+            result.update(await bench_session(server, page, args.runs))
+            if args.hass:
+                result.update(await bench_hass(server, page, args.runs))
+            results[name] = result
+            _print(name, result)
+    finally:
+        await server.stop()
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,17 +1,59 @@
-import re
-import json
-import requests
-
-
-_reg_locations = re.compile(r"const locations = (.*);")
-_reg_validations = re.compile(r"const live_validations = (.*);")
-_url = "https://oma.enkora.fi/unisport/populartimes"
-
-resp = requests.get(_url)
-locations = json.loads(_reg_locations.search(resp.text).group(1))
-validations = json.loads(_reg_validations.search(resp.text).group(1))
-print(validations)
-for loc_id in locations:
-    print(locations[loc_id])
-    print(validations.get(loc_id))
-    print()
+"""
+Print the live locations and visitors, optionally recording them.
+
+With `--record`, the payloads of every response are appended to recording
+files in a directory, and fetched again every `--interval` seconds until
+interrupted. The recordings can be replayed with `scripts/soak.py`.
+
+Usage:
+    python scripts/live.py
+    python scripts/live.py --tenant unisport --record recordings --interval 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.unisport.api import (  # noqa: E402
+    UnisportApiClient,
+    populartimes_url,
+)
+from custom_components.unisport.const import DEFAULT_TENANT  # noqa: E402
+from custom_components.unisport.recording import UnisportRecorder  # noqa: E402
+
+
+def _print(data: dict) -> None:
+    for location_id, location in data["locations"].items():
+        print(location)
+        print(data["live_validations"].get(location_id))
+        print()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tenant", default=DEFAULT_TENANT)
+    parser.add_argument("--record", type=Path)
+    parser.add_argument("--interval", type=float, default=300)
+    args = parser.parse_args()
+
+    recorder = UnisportRecorder(args.record) if args.record else None
+    async with aiohttp.ClientSession() as session:
+        client = UnisportApiClient(
+            session, populartimes_url(args.tenant), recorder=recorder
+        )
+        _print(await client.async_get_data(force=True))
+        while recorder is not None:
+            await asyncio.sleep(args.interval)
+            if await client.async_get_data() is not None:
+                print("Visitors changed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
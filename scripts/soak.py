@@ -0,0 +1,218 @@
+"""
+Replay recorded or synthetic populartimes responses through the integration.
+
+Sets the integration up in a test Home Assistant instance (needs
+`pytest-homeassistant-custom-component`), with its API client serving the
+records of a `UnisportReplay` and the clock following their times, then
+refreshes every entry once per record and reports:
+
+- refresh to last state write latency, median and 99th percentile
+- state writes per refresh
+- RSS growth over the run, and with `--tracemalloc` the biggest allocation
+  growths by line
+
+Recordings are made with the "Record the responses" option or with
+`scripts/live.py --record`. Without `--recordings`, days of synthetic
+responses are generated from a seed, so runs are reproducible.
+
+Usage:
+    python scripts/soak.py
+    python scripts/soak.py --days 7 --locations 500 --entries 3 --json out.json
+    python scripts/soak.py --recordings config/unisport_recordings --tracemalloc
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import json
+import random
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from functools import partial
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.unisport import api  # noqa: E402
+from custom_components.unisport.recording import (  # noqa: E402
+    UnisportRecord,
+    UnisportReplay,
+    read_recordings,
+)
+from scripts.benchmark import make_page  # noqa: E402
+
+START = datetime.datetime(2026, 1, 5, tzinfo=datetime.UTC)
+
+
+def synthetic_records(
+    days: float,
+    locations: int,
+    interval: float,
+    seed: int,
+) -> list[UnisportRecord]:
+    """Generate responses with visitors following the time of day."""
+    scanner = api._AssignmentScanner("locations", "live_validations")  # noqa: SLF001
+    scanner.feed(make_page(locations, padding=0, seed=seed))
+    scanner.close()
+    payload = scanner.values["locations"]
+    capacities = {
+        location_id: location["max_capacity"]
+        for location_id, location in json.loads(payload).items()
+    }
+    rnd = random.Random(seed)
+    visitors = dict.fromkeys(capacities, 0)
+    records = []
+    for step in range(int(days * 86400 / interval)):
+        moment = START + datetime.timedelta(seconds=step * interval)
+        hour = moment.hour + moment.minute / 60
+        # Busiest in the evening, empty at night
+        busy = max(0.0, 1 - abs(hour - 17) / 9)
+        for location_id, capacity in capacities.items():
+            # Some locations do not change in every response
+            if rnd.random() < 0.3:  # noqa: PLR2004
+                continue
+            target = capacity * busy * rnd.uniform(0.2, 0.9)
+            visitors[location_id] = max(
+                0, round(visitors[location_id] + (target - visitors[location_id]) / 3)
+            )
+        records.append(
+            UnisportRecord(
+                time=moment,
+                locations=payload,
+                live_validations=json.dumps(visitors).encode(),
+            )
+        )
+    return records
+
+
+def _rss_kib() -> float:
+    """Get the current resident set size, or the peak where not available."""
+    try:
+        pages = int(Path("/proc/self/statm").read_text().split()[1])
+    except (OSError, IndexError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pages * resource.getpagesize() / 1024
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * percent / 100), len(ordered) - 1)]
+
+
+async def soak(
+    replay: UnisportReplay,
+    entries: int,
+    *,
+    trace: bool,
+) -> dict[str, object]:
+    """Refresh every entry once per record, and measure."""
+    from homeassistant import loader
+    from homeassistant.const import EVENT_STATE_CHANGED
+    from homeassistant.util import dt as dt_util
+    from pytest_homeassistant_custom_component.common import (
+        MockConfigEntry,
+        async_test_home_assistant,
+    )
+
+    from custom_components.unisport.const import DOMAIN
+
+    def now(time_zone: datetime.tzinfo | None = None) -> datetime.datetime:
+        return replay.now.astimezone(time_zone or dt_util.get_default_time_zone())
+
+    with (
+        patch(
+            "custom_components.unisport.UnisportApiClient",
+            partial(api.UnisportApiClient, replay=replay),
+        ),
+        patch.object(dt_util, "utcnow", lambda: replay.now),
+        patch.object(dt_util, "now", now),
+    ):
+        async with async_test_home_assistant() as hass:
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS)
+            config_entries = []
+            for index in range(entries):
+                entry = MockConfigEntry(domain=DOMAIN, title=f"Soak {index}")
+                entry.add_to_hass(hass)
+                await hass.config_entries.async_setup(entry.entry_id)
+                await hass.async_block_till_done()
+                config_entries.append(entry)
+            coordinators = [entry.runtime_data.coordinator for entry in config_entries]
+
+            writes, last_write = 0, None
+
+            def on_state_changed(_event: object) -> None:
+                nonlocal writes, last_write
+                writes += 1
+                last_write = time.perf_counter()
+
+            hass.bus.async_listen(EVENT_STATE_CHANGED, on_state_changed)
+            rss_start = _rss_kib()
+            if trace:
+                tracemalloc.start()
+                snapshot = tracemalloc.take_snapshot()
+            durations, counts = [], []
+            while replay.advance():
+                for coordinator in coordinators:
+                    writes, last_write = 0, None
+                    start = time.perf_counter()
+                    await coordinator.async_refresh()
+                    await hass.async_block_till_done()
+                    durations.append((last_write or time.perf_counter()) - start)
+                    counts.append(writes)
+            rss_end = _rss_kib()
+            growth = []
+            if trace:
+                stats = tracemalloc.take_snapshot().compare_to(snapshot, "lineno")
+                tracemalloc.stop()
+                growth = [str(stat) for stat in stats[:10]]
+            for entry in config_entries:
+                await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_stop(force=True)
+    return {
+        "records": len(replay),
+        "refreshes": len(durations),
+        "refresh_to_write_p50_ms": statistics.median(durations) * 1000,
+        "refresh_to_write_p99_ms": _percentile(durations, 99) * 1000,
+        "state_writes_per_refresh": statistics.mean(counts),
+        "rss_start_kib": rss_start,
+        "rss_growth_kib": rss_end - rss_start,
+        "allocation_growth": growth,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--recordings", type=Path, nargs="+", default=[])
+    parser.add_argument("--days", type=float, default=1)
+    parser.add_argument("--locations", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--entries", type=int, default=1)
+    parser.add_argument("--tracemalloc", action="store_true")
+    parser.add_argument("--json", type=Path)
+    args = parser.parse_args()
+
+    if args.recordings:
+        records = list(read_recordings(args.recordings))
+    else:
+        records = synthetic_records(args.days, args.locations, args.interval, args.seed)
+    result = await soak(UnisportReplay(records), args.entries, trace=args.tracemalloc)
+    for key, value in result.items():
+        if key == "allocation_growth":
+            for line in value:
+                print(f"  {line}")
+        else:
+            print(f"{key:<28} {value:>12.2f}")
+
+    if args.json:
+        args.json.write_text(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,44 @@
+"""Tests for the unisport integration."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+LOCATIONS = {
+    "1": {
+        "location_id": 1,
+        "name": "Kluuvi",
+        "max_capacity": 100,
+        "opening_hours": {
+            str(weekday): {"time_start": "06:00:00", "time_end": "21:00:00"}
+            for weekday in range(1, 8)
+        },
+    },
+    "2": {
+        "location_id": 2,
+        "name": "Otaniemi",
+        "max_capacity": 50,
+        "opening_hours": {
+            str(weekday): {"time_start": "07:00:00", "time_end": "24:00:00"}
+            for weekday in range(1, 6)
+        },
+    },
+}
+
+
+def make_page(
+    locations: dict[str, Any] | None = None,
+    live_validations: dict[str, int] | None = None,
+) -> bytes:
+    """Build a populartimes page."""
+    if locations is None:
+        locations = LOCATIONS
+    if live_validations is None:
+        live_validations = {"1": 10, "2": 20}
+    return (
+        "<!DOCTYPE html>\n<html>\n<body>\n<script>\n"
+        f"    const locations = {json.dumps(locations)};\n"
+        f"    const live_validations = {json.dumps(live_validations)};\n"
+        "</script>\n</body>\n</html>\n"
+    ).encode()
@@ -0,0 +1,65 @@
+"""Fixtures for the unisport tests."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+import pytest
+from aiohttp import web
+from aiohttp.resolver import ThreadedResolver
+
+from . import make_page
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+
+    from aiohttp.test_utils import TestServer
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(
+    enable_custom_integrations: None,
+) -> None:
+    """Enable the custom integrations in every test."""
+
+
+@pytest.fixture(autouse=True)
+def threaded_resolver() -> Iterator[None]:
+    """Resolve without aiodns, which leaves a thread behind for the cleanup check."""
+    with patch("custom_components.unisport.session.AsyncResolver", ThreadedResolver):
+        yield
+
+
+class PopulartimesServer:
+    """Local populartimes page, counting the requests."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.page = make_page()
+        self.status = 200
+        self.requests = 0
+
+    async def handle(self, _request: web.Request) -> web.Response:
+        """Serve the page, or an error with another status."""
+        self.requests += 1
+        if self.status != 200:
+            return web.Response(status=self.status)
+        return web.Response(body=self.page, content_type="text/html")
+
+
+@pytest.fixture
+async def populartimes(
+    socket_enabled: None,  # noqa: ARG001 Unused function argument
+    aiohttp_server: Callable[[web.Application], Awaitable[TestServer]],
+) -> AsyncIterator[PopulartimesServer]:
+    """Serve a populartimes page, used for every tenant."""
+    server = PopulartimesServer()
+    app = web.Application()
+    app.router.add_get("/unisport/populartimes", server.handle)
+    test_server = await aiohttp_server(app)
+    url = str(test_server.make_url("/unisport/populartimes"))
+    with patch("custom_components.unisport.populartimes_url", return_value=url):
+        yield server
@@ -0,0 +1,90 @@
+"""Tests for the populartimes page scanner."""
+
+from __future__ import annotations
+
+import random
+import re
+
+import pytest
+
+from custom_components.unisport.api import _AssignmentScanner
+
+from . import make_page
+
+# The regexes the scanner replaced
+REGEXES = {
+    "locations": re.compile(rb"const locations = (.*);"),
+    "live_validations": re.compile(rb"const live_validations = (.*);"),
+}
+
+PAGES = [
+    make_page(),
+    # Several statements, and a stray `;`, on the same line
+    b"const locations = {};const live_validations = {}; // ;\n",
+    # First occurrence without a `;` on its line
+    b"const locations = {\n};\nconst locations = [1];\nconst live_validations = 2;",
+    # Missing assignment, and one without a trailing newline
+    b'<html>const live_validations = {"1": 3};',
+    b"const locations = {}\nconst live_validations = {};\r\n",
+    b"",
+]
+
+
+def _scan(page: bytes, chunk_sizes: list[int]) -> dict[str, bytes]:
+    scanner = _AssignmentScanner(*REGEXES)
+    position = 0
+    for size in chunk_sizes:
+        if scanner.feed(page[position : position + size]):
+            break
+        position += size
+    else:
+        scanner.close()
+    return scanner.values
+
+
+def _expected(page: bytes) -> dict[str, bytes]:
+    return {
+        name: match.group(1)
+        for name, regex in REGEXES.items()
+        if (match := regex.search(page)) is not None
+    }
+
+
+@pytest.mark.parametrize("page", PAGES)
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, 1 << 20])
+def test_scanner_matches_regexes(page: bytes, chunk_size: int) -> None:
+    """Test that the scanner finds what the regexes found, in any chunking."""
+    sizes = [chunk_size] * (len(page) // chunk_size + 1)
+
+    assert _scan(page, sizes) == _expected(page)
+
+
+def test_scanner_random_pages() -> None:
+    """Test random pages fed in random chunks against the regexes."""
+    rnd = random.Random(0)  # noqa: S311 Not for cryptographic purposes
+    parts = [
+        b"const locations = ",
+        b"const live_validations = ",
+        b'{"1": 2}',
+        b";",
+        b"\n",
+        b" ",
+        b"x",
+        b"const ",
+    ]
+    for _ in range(2000):
+        page = b"".join(rnd.choices(parts, k=rnd.randint(0, 30)))
+        sizes = [rnd.randint(1, 16) for _ in range(len(page) + 1)]
+
+        assert _scan(page, sizes) == _expected(page), page
+
+
+def test_scanner_stops_once_found() -> None:
+    """Test that feeding reports completion as soon as both values are read."""
+    scanner = _AssignmentScanner(*REGEXES)
+    page = make_page()
+    end = page.index(b"</script>")
+
+    assert not scanner.feed(page[: end - 2])
+    assert scanner.feed(page[end - 2 : end])
+    assert scanner.values == _expected(page)
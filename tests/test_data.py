@@ -0,0 +1,148 @@
+"""Tests for the decoding of the populartimes payloads."""
+
+from __future__ import annotations
+
+import copy
+
+import pytest
+
+from custom_components.unisport.data import (
+    UnisportDecoder,
+    UnisportLocation,
+    UnisportLocationOpeningHour,
+    UnisportVisitors,
+)
+
+from . import LOCATIONS
+
+
+def test_decode() -> None:
+    """Test decoding the locations and their opening hours."""
+    decoded = UnisportDecoder().decode(LOCATIONS, {"1": 10, "2": "20"})
+
+    kluuvi = decoded["locations"][1]
+    assert isinstance(kluuvi, UnisportLocation)
+    assert kluuvi.name == "Kluuvi"
+    assert kluuvi.max_capacity == 100
+    assert kluuvi.opening_hours[7] == UnisportLocationOpeningHour(
+        time_start="06:00:00", time_end="21:00:00"
+    )
+    assert 6 not in decoded["locations"][2].opening_hours
+    # Strings of integers are coerced, as by pydantic
+    assert dict(decoded["live_validations"]) == {1: 10, 2: 20}
+
+
+def test_shared_schedules() -> None:
+    """Test that locations with the same opening hours share their schedule."""
+    locations = copy.deepcopy(LOCATIONS)
+    locations["3"] = {**locations["1"], "location_id": 3, "name": "Töölö"}
+
+    decoded = UnisportDecoder().decode(locations, {})["locations"]
+
+    assert decoded[3].schedule is decoded[1].schedule
+    assert decoded[3].opening_hours is decoded[1].opening_hours
+    assert decoded[2].schedule is not decoded[1].schedule
+
+
+@pytest.mark.parametrize(
+    ("field", "value", "exception"),
+    [
+        ("max_capacity", None, TypeError),
+        ("max_capacity", True, TypeError),
+        ("max_capacity", "many", ValueError),
+        ("name", 1, TypeError),
+        ("opening_hours", None, AttributeError),
+    ],
+)
+def test_invalid_location(field: str, value: object, exception: type) -> None:
+    """Test that invalid fields raise."""
+    locations = copy.deepcopy(LOCATIONS)
+    locations["1"][field] = value
+
+    with pytest.raises(exception):
+        UnisportDecoder().decode(locations, {})
+
+
+def test_missing_field() -> None:
+    """Test that missing fields raise."""
+    locations = copy.deepcopy(LOCATIONS)
+    del locations["1"]["max_capacity"]
+
+    with pytest.raises(KeyError):
+        UnisportDecoder().decode(locations, {})
+
+
+def test_strict() -> None:
+    """Test that strict decoding validates the payloads first."""
+    pydantic = pytest.importorskip("pydantic")
+    locations = copy.deepcopy(LOCATIONS)
+    locations["1"]["extra"] = 1
+    assert UnisportDecoder(strict=True).decode(locations, {"1": 1})["locations"]
+
+    with pytest.raises(pydantic.ValidationError):
+        UnisportDecoder(strict=True).decode(LOCATIONS, {"1": "many"})
+
+
+def test_selected_locations() -> None:
+    """Test that only the selected locations are decoded, but all are named."""
+    decoder = UnisportDecoder(location_ids=[2])
+
+    decoded = decoder.decode(LOCATIONS, {"1": 10, "2": 20})
+
+    assert list(decoded["locations"]) == [2]
+    assert dict(decoded["live_validations"]) == {2: 20}
+    assert decoder.available == {1: "Kluuvi", 2: "Otaniemi"}
+
+
+def test_reuse_unchanged_locations() -> None:
+    """Test that unchanged locations are reused, and changed ones decoded again."""
+    decoder = UnisportDecoder()
+    first = decoder.decode(LOCATIONS, {})["locations"]
+    locations = copy.deepcopy(LOCATIONS)
+    locations["2"]["max_capacity"] = 60
+
+    second = decoder.decode(locations, {})["locations"]
+
+    assert second[1] is first[1]
+    assert second[2] is not first[2]
+    assert second[2].max_capacity == 60
+    # Same opening hours, still compiled once
+    assert second[2].schedule is first[2].schedule
+
+
+def test_visitors() -> None:
+    """Test the visitor counts, sharing their slots across polls."""
+    decoder = UnisportDecoder()
+    first = decoder.decode(LOCATIONS, {"1": 10, "2": 20})["live_validations"]
+    second = decoder.decode(LOCATIONS, {"1": 10})["live_validations"]
+    third = decoder.decode(LOCATIONS, {"1": 10, "2": 20})["live_validations"]
+
+    assert isinstance(first, UnisportVisitors)
+    assert dict(second) == {1: 10}
+    assert len(second) == 1
+    assert 2 not in second
+    with pytest.raises(KeyError):
+        second[2]
+    assert second.get(2, 0) == 0
+    assert first != second
+    assert first == third
+    assert first == {1: 10, 2: 20}
+    assert first._slots is third._slots
+
+
+def test_visitors_of_unknown_locations() -> None:
+    """Test counts of locations missing from the locations, and new locations."""
+    decoder = UnisportDecoder()
+    first = decoder.decode(LOCATIONS, {"1": 10})["live_validations"]
+    second = decoder.decode(LOCATIONS, {"1": 10, "5": 50})["live_validations"]
+
+    assert dict(second) == {1: 10, 5: 50}
+    # The previous counts keep the slots they were made with
+    assert dict(first) == {1: 10}
+    assert first != second
+
+    locations = copy.deepcopy(LOCATIONS)
+    locations["3"] = {**locations["1"], "location_id": 3, "name": "Töölö"}
+    third = decoder.decode(locations, {"3": 30})["live_validations"]
+    assert dict(third) == {3: 30}
+    assert third._slots is not second._slots
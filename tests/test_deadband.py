@@ -0,0 +1,144 @@
+"""Tests for the significant change filter of the visitor counts."""
+
+from __future__ import annotations
+
+import datetime
+from typing import TYPE_CHECKING
+
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.unisport.const import DOMAIN
+from custom_components.unisport.deadband import (
+    DEADBAND_ABSOLUTE,
+    DEADBAND_RELATIVE,
+    UnisportDeadband,
+)
+
+from . import make_page
+
+if TYPE_CHECKING:
+    from freezegun.api import FrozenDateTimeFactory
+    from homeassistant.core import HomeAssistant
+
+    from .conftest import PopulartimesServer
+
+START = datetime.datetime(2026, 1, 5, 10, tzinfo=datetime.UTC)
+HEARTBEAT = datetime.timedelta(hours=1)
+
+
+def _writes(deadband: UnisportDeadband, values: list[int | None]) -> list[bool]:
+    return [
+        deadband.should_write(1, value, START + index * datetime.timedelta(minutes=5))
+        for index, value in enumerate(values)
+    ]
+
+
+def test_absolute() -> None:
+    """Test that counts are written once they move by the deadband."""
+    deadband = UnisportDeadband(deadband=3, mode=DEADBAND_ABSOLUTE, heartbeat=HEARTBEAT)
+
+    # Compared with the last written count, not the last seen one
+    assert _writes(deadband, [10, 11, 12, 13, 11, 10, None, None, 0]) == [
+        True,
+        False,
+        False,
+        True,
+        False,
+        True,
+        True,
+        False,
+        True,
+    ]
+    assert deadband.written[1] == 5
+    assert deadband.suppressed[1] == 4
+
+
+def test_relative() -> None:
+    """Test that counts are written once they move by a percentage."""
+    deadband = UnisportDeadband(
+        deadband=10, mode=DEADBAND_RELATIVE, heartbeat=HEARTBEAT
+    )
+
+    assert _writes(deadband, [100, 109, 110, 100, 0, 0, 1]) == [
+        True,
+        False,
+        True,
+        False,
+        True,
+        False,
+        True,
+    ]
+
+
+def test_zero_writes_every_change() -> None:
+    """Test that a deadband of 0 writes every change, and only changes."""
+    deadband = UnisportDeadband(deadband=0, mode=DEADBAND_ABSOLUTE, heartbeat=HEARTBEAT)
+
+    assert _writes(deadband, [5, 5, 6, 6, 5]) == [True, False, True, False, True]
+
+
+def test_heartbeat() -> None:
+    """Test that a count is written once the heartbeat passed, changed or not."""
+    deadband = UnisportDeadband(
+        deadband=100, mode=DEADBAND_ABSOLUTE, heartbeat=HEARTBEAT
+    )
+
+    # Every 5 minutes, the 13th is an hour after the first
+    writes = _writes(deadband, [10] * 25)
+    assert [index for index, write in enumerate(writes) if write] == [0, 12, 24]
+
+
+def test_heartbeat_only() -> None:
+    """Test that only the heartbeat writes with `heartbeat_only`."""
+    deadband = UnisportDeadband(
+        deadband=0,
+        mode=DEADBAND_ABSOLUTE,
+        heartbeat=HEARTBEAT,
+        heartbeat_only=True,
+    )
+
+    writes = _writes(deadband, list(range(13)))
+    assert [index for index, write in enumerate(writes) if write] == [0, 12]
+    # Forced writes, such as availability changes, restart the heartbeat
+    deadband.record(1, 50, START + datetime.timedelta(minutes=65))
+    assert not deadband.should_write(1, 0, START + datetime.timedelta(minutes=120))
+    assert deadband.should_write(1, 0, START + datetime.timedelta(minutes=125))
+    assert deadband.as_dict()["heartbeat_only"]
+
+
+async def test_suppressed_written_on_heartbeat(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    populartimes: PopulartimesServer,
+) -> None:
+    """Test that a suppressed count is written on the heartbeat, without a refresh."""
+    freezer.move_to(START)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Unisport",
+        options={"deadband": 5, "heartbeat": 60},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = entry.runtime_data.coordinator
+    entity_id = "sensor.unisport_kluuvi_visitors"
+    assert hass.states.get(entity_id).state == "10"
+
+    for visitors in (12, 14):
+        populartimes.page = make_page(live_validations={"1": visitors, "2": 20})
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+    # 12 is suppressed, 14 is 4 away from the written 10, suppressed as well
+    assert hass.states.get(entity_id).state == "10"
+
+    # No more changes upstream
+    freezer.tick(HEARTBEAT)
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).state == "14"
+    assert hass.states.get(entity_id).last_changed == dt_util.utcnow()
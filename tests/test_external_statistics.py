@@ -0,0 +1,140 @@
+"""Tests for the visitor statistics imported in batches."""
+
+from __future__ import annotations
+
+import datetime
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+import pytest
+from homeassistant.components import recorder
+from homeassistant.components.recorder.statistics import statistics_during_period
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+)
+
+from custom_components.unisport.external_statistics import (
+    HOURLY_PERIOD,
+    UnisportStatisticsImporter,
+    _aggregate,
+    statistic_id,
+)
+from custom_components.unisport.history import UnisportHistory
+
+if TYPE_CHECKING:
+    from homeassistant.components.recorder import Recorder
+    from homeassistant.core import HomeAssistant
+
+HOUR = 1_767_607_200  # 2026-01-05 10:00 UTC
+START = datetime.datetime.fromtimestamp(HOUR, tz=datetime.UTC)
+STEP = datetime.timedelta(minutes=5)
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(
+    recorder_mock: Recorder,
+    enable_custom_integrations: None,
+) -> None:
+    """Set the recorder up before Home Assistant, and enable the integrations."""
+
+
+def test_aggregate_period_boundaries() -> None:
+    """Test that samples on a boundary start the next period."""
+    samples = [
+        (HOUR - 1, 9),
+        (HOUR, 1),
+        (HOUR + 300, 3),
+        (HOUR + HOURLY_PERIOD - 1, 2),
+        (HOUR + HOURLY_PERIOD, 7),
+    ]
+
+    assert _aggregate(samples, HOURLY_PERIOD) == {
+        HOUR - HOURLY_PERIOD: [1, 9, 9, 9],
+        HOUR: [3, 6, 1, 3],
+        HOUR + HOURLY_PERIOD: [1, 7, 7, 7],
+    }
+    assert _aggregate(samples, 300) == {
+        HOUR - 300: [1, 9, 9, 9],
+        HOUR: [1, 1, 1, 1],
+        HOUR + 300: [1, 3, 3, 3],
+        HOUR + HOURLY_PERIOD - 300: [1, 2, 2, 2],
+        HOUR + HOURLY_PERIOD: [1, 7, 7, 7],
+    }
+    assert _aggregate([], HOURLY_PERIOD) == {}
+
+
+def test_statistic_id() -> None:
+    """Test that other tenants get statistics of their own."""
+    assert statistic_id(3) == "unisport:location_3_visitors"
+    assert statistic_id(3, "Other Tenant") == (
+        "unisport:other_tenant_location_3_visitors"
+    )
+
+
+async def test_flush_reads_the_history(hass: HomeAssistant) -> None:
+    """Test that a restart within an hour still imports all of its samples."""
+    history = UnisportHistory(hass, "entry")
+    imported: list[tuple[int, list[tuple[int, int]]]] = []
+
+    def _import(
+        _importer: UnisportStatisticsImporter,
+        location_id: int,
+        samples: list[tuple[int, int]],
+        *_args: Any,
+    ) -> None:
+        imported.append((location_id, samples))
+
+    with patch.object(UnisportStatisticsImporter, "_import", _import):
+        importer = UnisportStatisticsImporter(hass, history)
+        for index in range(-1, 4):
+            history.add(START + index * STEP, {1: index + 1})
+            importer.add(START + index * STEP, {})
+        # The previous hour once the first sample of this one is added
+        assert imported == [(1, [(HOUR - 300, 0)])]
+        # Unloaded within the hour, which is imported so far
+        importer.async_flush()
+        assert imported[-1] == (
+            1,
+            [(HOUR + index * 300, index + 1) for index in range(4)],
+        )
+
+        importer = UnisportStatisticsImporter(hass, history)
+        for index in range(4, 13):
+            history.add(START + index * STEP, {1: index + 1})
+            importer.add(START + index * STEP, {})
+
+    # The next hour started with the last sample, the whole hour is imported
+    assert imported[-1] == (
+        1,
+        [(HOUR + index * 300, index + 1) for index in range(12)],
+    )
+    assert len(imported) == 3
+
+
+async def test_import_hourly_statistics(hass: HomeAssistant) -> None:
+    """Test that whole hours are imported through the public recorder helper."""
+    history = UnisportHistory(hass, "entry")
+    for index in range(14):
+        history.add(START + index * STEP, {1: index})
+    importer = UnisportStatisticsImporter(hass, history)
+
+    assert await importer.async_backfill([1], {}) == 14
+    await async_wait_recording_done(hass)
+
+    statistics = await recorder.get_instance(hass).async_add_executor_job(
+        statistics_during_period,
+        hass,
+        START - datetime.timedelta(hours=1),
+        None,
+        {statistic_id(1)},
+        "hour",
+        None,
+        {"mean", "min", "max"},
+    )
+    assert [
+        (row["start"], row["mean"], row["min"], row["max"])
+        for row in statistics[statistic_id(1)]
+    ] == [
+        (HOUR, 5.5, 0, 11),
+        (HOUR + HOURLY_PERIOD, 12.5, 12, 13),
+    ]
@@ -0,0 +1,142 @@
+"""Tests for the fetch scheduler shared by every entry."""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+
+import pytest
+
+from custom_components.unisport.fetcher import (
+    PHASE_STEP,
+    PHASE_WINDOW,
+    UnisportFetchScheduler,
+)
+
+URL = "https://example.com/unisport/populartimes"
+OTHER_URL = "https://example.com/other/populartimes"
+HOUR = datetime.datetime(2026, 1, 5, 10, tzinfo=datetime.UTC)
+MINUTE = datetime.timedelta(minutes=1)
+
+
+async def test_coalesce() -> None:
+    """Test that fetches with the same key share the one in flight."""
+    fetcher = UnisportFetchScheduler()
+    release = asyncio.Event()
+    calls = 0
+
+    async def fetch() -> int:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return calls
+
+    first = asyncio.create_task(fetcher.async_fetch(URL, fetch))
+    second = asyncio.create_task(fetcher.async_fetch(URL, fetch))
+    other = asyncio.create_task(fetcher.async_fetch(OTHER_URL, fetch))
+    await asyncio.sleep(0)
+    # A caller giving up does not cancel the fetch of the others
+    first.cancel()
+    release.set()
+
+    assert await second == 1
+    assert await other == 2
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert (fetcher.fetches, fetcher.coalesced) == (2, 1)
+    assert fetcher.as_dict()["in_flight"] == 0
+    # Not coalesced once over
+    assert await fetcher.async_fetch(URL, fetch) == 3
+
+
+async def test_errors_reach_every_caller() -> None:
+    """Test that the error of a shared fetch is raised to every caller."""
+    fetcher = UnisportFetchScheduler()
+
+    async def fetch() -> None:
+        await asyncio.sleep(0)
+        msg = "down"
+        raise RuntimeError(msg)
+
+    results = await asyncio.gather(
+        fetcher.async_fetch(URL, fetch),
+        fetcher.async_fetch(URL, fetch),
+        return_exceptions=True,
+    )
+    assert [str(result) for result in results] == ["down", "down"]
+
+
+async def test_max_concurrent() -> None:
+    """Test that at most `max_concurrent` fetches run at once."""
+    fetcher = UnisportFetchScheduler(max_concurrent=2)
+    running = peak = 0
+
+    async def fetch() -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0)
+        running -= 1
+
+    await asyncio.gather(*(fetcher.async_fetch(key, fetch) for key in range(6)))
+    assert peak == 2
+
+
+def test_phases() -> None:
+    """Test that each url gets its own phase, freed once unregistered."""
+    fetcher = UnisportFetchScheduler()
+    unregister = fetcher.async_register(URL)
+    unregister_again = fetcher.async_register(URL)
+    fetcher.async_register(OTHER_URL)
+
+    assert fetcher.phase(URL) == 0
+    assert fetcher.phase(OTHER_URL) == PHASE_STEP
+    unregister()
+    assert fetcher.phase(URL) == 0
+    unregister_again()
+    assert fetcher.phase(URL) is None
+    assert fetcher.align(URL, 5 * MINUTE, HOUR) == 5 * MINUTE
+    # The slot is free again
+    fetcher.async_register("https://example.com/third/populartimes")
+    assert fetcher.phase("https://example.com/third/populartimes") == 0
+
+
+def test_align_to_the_phase() -> None:
+    """Test that polls are due on the phase of their url."""
+    fetcher = UnisportFetchScheduler()
+    fetcher.async_register(URL)
+    fetcher.async_register(OTHER_URL)
+    now = HOUR + datetime.timedelta(seconds=30)
+
+    # On the 5 minute grid, then on the phase of the url
+    assert now + fetcher.align(URL, 5 * MINUTE, now) == HOUR + 10 * MINUTE
+    assert now + fetcher.align(OTHER_URL, 5 * MINUTE, now) == (
+        HOUR + 10 * MINUTE + datetime.timedelta(seconds=PHASE_STEP)
+    )
+    # Only on the phase when not a whole minute
+    interval = datetime.timedelta(minutes=90, seconds=30)
+    due = now + fetcher.align(URL, interval, now)
+    assert due.second == 0
+    assert (
+        now + interval
+        <= due
+        < now + interval + datetime.timedelta(seconds=PHASE_WINDOW)
+    )
+    # Only just past the phase, a bit early rather than a whole period late
+    late = HOUR + datetime.timedelta(seconds=5)
+    assert late + fetcher.align(URL, 5 * MINUTE, late) == HOUR + 5 * MINUTE
+
+
+def test_align_backing_off() -> None:
+    """Test that backing off from 5 to 10 and 15 minutes stays on the grid."""
+    fetcher = UnisportFetchScheduler()
+    fetcher.async_register(URL)
+    due = HOUR + 5 * MINUTE
+    for minutes in (5, 10, 15, 15, 10, 5, 20):
+        interval = minutes * MINUTE
+        aligned = fetcher.align(URL, interval, due)
+        assert aligned == interval
+        due += aligned
+    # Entering the grid adds less than a grid period
+    now = HOUR + datetime.timedelta(minutes=2, seconds=30)
+    assert fetcher.align(URL, 15 * MINUTE, now) < 20 * MINUTE
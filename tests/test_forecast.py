@@ -0,0 +1,51 @@
+"""Tests for the visitor forecasts."""
+
+from __future__ import annotations
+
+import datetime
+
+from custom_components.unisport.forecast import UnisportForecaster
+
+MONDAY = datetime.datetime(2026, 1, 5, 10, tzinfo=datetime.UTC)
+HOUR = datetime.timedelta(hours=1)
+WEEK = datetime.timedelta(weeks=1)
+
+
+def test_forecast() -> None:
+    """Test the baseline of the hour ahead, plus the fading deviation."""
+    forecaster = UnisportForecaster()
+    assert forecaster.forecast(1, 1) is None
+    forecaster.add(MONDAY, {})
+    assert forecaster.forecast(1, 1) is None
+
+    forecaster.add(MONDAY, {1: 10})
+    forecaster.add(MONDAY + HOUR, {1: 30})
+    # 10 over the baseline of 10, smoothed to 3, halved for the hour ahead
+    forecaster.add(MONDAY + WEEK, {1: 20})
+
+    assert forecaster.forecast(1, 1) == 32
+    # No samples of the hours further ahead yet
+    assert forecaster.forecast(1, 2) is None
+    assert forecaster.forecast(2, 1) is None
+
+
+def test_listeners_on_changes_only() -> None:
+    """Test that the listeners of a location are called when its forecast changed."""
+    forecaster = UnisportForecaster()
+    calls: list[int] = []
+    remove = forecaster.async_add_listener(1, lambda: calls.append(1))
+    forecaster.async_add_listener(2, lambda: calls.append(2))
+    forecaster.add(MONDAY, {1: 10, 2: 10})
+    forecaster.add(MONDAY + HOUR, {1: 10, 2: 10})
+    forecaster.add(MONDAY + WEEK, {1: 10, 2: 10})
+    calls.clear()
+
+    # On the baseline, the forecasts stay the same
+    forecaster.add(MONDAY + WEEK, {1: 10, 2: 10})
+    assert calls == []
+    forecaster.add(MONDAY + WEEK, {1: 10, 2: 20})
+    assert calls == [2]
+
+    remove()
+    forecaster.add(MONDAY + WEEK, {1: 40})
+    assert calls == [2]
@@ -0,0 +1,94 @@
+"""Tests for the visitor history ring buffer."""
+
+from __future__ import annotations
+
+import datetime
+from typing import TYPE_CHECKING
+
+from custom_components.unisport.history import UnisportHistory
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+START = datetime.datetime(2026, 1, 5, 10, tzinfo=datetime.UTC)
+STEP = datetime.timedelta(minutes=5)
+
+
+def _counts(history: UnisportHistory, location_id: int) -> list[int]:
+    return [count for _, count in history.samples(location_id)]
+
+
+async def test_wraparound(hass: HomeAssistant) -> None:
+    """Test that the oldest samples are overwritten once full."""
+    history = UnisportHistory(hass, "entry", capacity=4)
+    for index in range(10):
+        visitors = {1: index}
+        if index % 3 == 0:
+            visitors[2] = 100 + index
+        history.add(START + index * STEP, visitors)
+
+    assert _counts(history, 1) == [6, 7, 8, 9]
+    # Missing from the samples without it
+    assert _counts(history, 2) == [106, 109]
+    assert next(history.samples(1))[0] == START + 6 * STEP
+    # Since a point in time, oldest first
+    assert [count for _, count in history.samples(1, since=START + 8 * STEP)] == [8, 9]
+    assert not list(history.samples(3))
+    # The aggregates cover every sample
+    assert history.aggregates(1).counts.tolist().count(0) == 167
+    assert max(history.aggregates(1).counts) == 10
+
+
+async def test_save_filled_samples_only(hass: HomeAssistant) -> None:
+    """Test that only the filled part of the arrays is saved, and loaded back."""
+    history = UnisportHistory(hass, "entry", capacity=1000)
+    history.add(START, {1: 5})
+    history.add(START + STEP, {1: 6, 2: 1})
+
+    data = history._data_to_save()
+    assert data["size"] == 2
+    # Two timestamps of 4 bytes, in base64
+    assert len(data["times"]) == 12
+
+    await history.async_save()
+    loaded = UnisportHistory(hass, "entry", capacity=1000)
+    await loaded.async_load()
+    loaded.add(START + 2 * STEP, {2: 2})
+
+    assert _counts(loaded, 1) == [5, 6]
+    assert _counts(loaded, 2) == [1, 2]
+
+
+async def test_load_other_capacity(hass: HomeAssistant) -> None:
+    """Test that another capacity starts the samples over, keeping the aggregates."""
+    history = UnisportHistory(hass, "entry", capacity=6)
+    history.add(START, {1: 5})
+    await history.async_save()
+
+    resized = UnisportHistory(hass, "entry", capacity=10)
+    await resized.async_load()
+    resized.add(START + STEP, {1: 6})
+
+    assert _counts(resized, 1) == [6]
+    assert sum(resized.aggregates(1).counts) == 2
+
+
+async def test_series(hass: HomeAssistant) -> None:
+    """Test the mean visitors per step, from the first step with samples."""
+    history = UnisportHistory(hass, "entry", capacity=8)
+    for index in range(12):
+        history.add(START + index * STEP, {1: index, 2: 7} if index < 10 else {1: 0})
+    start = int(START.timestamp())
+
+    # Samples 4 to 11 are left, in steps of 15 minutes from START: 3-5, 6-8,
+    # 9-11
+    first, series = history.series([1, 2, 3], start, 15 * 60)
+
+    assert first == start + 15 * 60
+    assert series == {1: [4, 7, 3], 2: [7, 7, 7]}
+    # Steps without samples of a location
+    first, series = history.series([2], start + 50 * 60, 5 * 60)
+    assert first == start + 50 * 60
+    assert series == {2: [None, None]}
+    # Nothing in range
+    assert history.series([1], start + 3600, 60) == (start + 3600, {1: []})
@@ -0,0 +1,144 @@
+"""Tests for the setup, reload and unload of the unisport entries."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.config_entries import ConfigEntryState
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.unisport.const import DOMAIN
+from custom_components.unisport.fetcher import DATA_FETCHER
+
+from . import LOCATIONS, make_page
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .conftest import PopulartimesServer
+
+
+async def _async_setup_entry(hass: HomeAssistant) -> MockConfigEntry:
+    entry = MockConfigEntry(domain=DOMAIN, title="Unisport")
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+async def test_setup_entry(
+    hass: HomeAssistant,
+    populartimes: PopulartimesServer,
+) -> None:
+    """Test that an entry sets up the entities of every location."""
+    entry = await _async_setup_entry(hass)
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert populartimes.requests == 1
+    assert hass.states.get("sensor.unisport_kluuvi_visitors").state == "10"
+    assert hass.states.get("sensor.unisport_otaniemi_visitors").state == "20"
+    assert hass.states.get("sensor.unisport_kluuvi_capacity").state == "100"
+
+
+async def test_options_reload(
+    hass: HomeAssistant,
+    populartimes: PopulartimesServer,
+) -> None:
+    """Test that changing the options reloads the entry, releasing the old one."""
+    entry = await _async_setup_entry(hass)
+    coordinator = entry.runtime_data.coordinator
+    entities = hass.states.async_entity_ids()
+
+    for interval in (10, 20):
+        hass.config_entries.async_update_entry(
+            entry, options={**entry.options, "open_interval": interval}
+        )
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert entry.runtime_data.coordinator is not coordinator
+    assert entry.runtime_data.coordinator.config_entry is entry
+    assert entry.runtime_data.coordinator.last_update_success
+    assert sorted(hass.states.async_entity_ids()) == sorted(entities)
+    assert populartimes.requests == 3
+    # The old coordinators are shut down, and unregistered from the fetcher
+    assert not coordinator._transitions
+    assert hass.data[DATA_FETCHER]._users == {
+        entry.runtime_data.client.url: 1,
+    }
+
+
+async def test_unload_entry(
+    hass: HomeAssistant,
+    populartimes: PopulartimesServer,  # noqa: ARG001 Unused function argument
+) -> None:
+    """Test that unloading an entry cancels its timers and saves its history."""
+    entry = await _async_setup_entry(hass)
+    coordinator = entry.runtime_data.coordinator
+    assert coordinator._transitions
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert entry.state is ConfigEntryState.NOT_LOADED
+    assert not coordinator._transitions
+    assert not hass.data[DATA_FETCHER]._users
+    assert hass.states.get("sensor.unisport_kluuvi_visitors").state == "unavailable"
+
+
+async def test_remove_entry(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    populartimes: PopulartimesServer,  # noqa: ARG001 Unused function argument
+) -> None:
+    """Test that removing an entry removes its stored data."""
+    entry = await _async_setup_entry(hass)
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+    keys = {f"{DOMAIN}.{entry.entry_id}.{name}" for name in ("history", "snapshot")}
+    assert keys <= hass_storage.keys()
+
+    await hass.config_entries.async_remove(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert not any(key.startswith(f"{DOMAIN}.") for key in hass_storage)
+
+
+async def test_select_more_locations(
+    hass: HomeAssistant,
+    populartimes: PopulartimesServer,  # noqa: ARG001 Unused function argument
+) -> None:
+    """Test that locations selected since the snapshot was saved are set up."""
+    entry = MockConfigEntry(
+        domain=DOMAIN, title="Unisport", options={"locations": ["1"]}
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.unisport_otaniemi_visitors") is None
+
+    hass.config_entries.async_update_entry(entry, options={"locations": ["1", "2"]})
+    await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.unisport_otaniemi_visitors").state == "20"
+    assert hass.states.get("binary_sensor.unisport_otaniemi_status") is not None
+
+
+async def test_locations_added_upstream(
+    hass: HomeAssistant,
+    populartimes: PopulartimesServer,
+) -> None:
+    """Test that the entities of a location appearing after the setup are added."""
+    entry = await _async_setup_entry(hass)
+    locations = {
+        **LOCATIONS,
+        "3": {**LOCATIONS["1"], "location_id": 3, "name": "Töölö"},
+    }
+    populartimes.page = make_page(locations, {"1": 10, "2": 20, "3": 30})
+
+    await entry.runtime_data.coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.unisport_toolo_visitors").state == "30"
+    assert hass.states.get("binary_sensor.unisport_toolo_status") is not None
+    assert hass.states.get("sensor.unisport_kluuvi_visitors").state == "10"
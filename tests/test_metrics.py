@@ -0,0 +1,41 @@
+"""Tests for the pipeline metrics."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.unisport.const import DOMAIN
+
+from . import make_page
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .conftest import PopulartimesServer
+
+
+async def test_metric_sensors_show_the_last_refresh(
+    hass: HomeAssistant,
+    populartimes: PopulartimesServer,
+) -> None:
+    """Test that the metric sensors are written once the refresh is over."""
+    entry = MockConfigEntry(domain=DOMAIN, title="Unisport")
+    entry.add_to_hass(hass)
+    entity_id = (
+        er.async_get(hass)
+        .async_get_or_create(
+            "sensor", DOMAIN, f"{entry.entry_id}-page_size", config_entry=entry
+        )
+        .entity_id
+    )
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).state == str(len(populartimes.page))
+
+    populartimes.page = make_page(live_validations={"1": 11, "2": 21, "3": 31})
+    await entry.runtime_data.coordinator.async_refresh()
+
+    assert hass.states.get(entity_id).state == str(len(populartimes.page))
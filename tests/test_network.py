@@ -0,0 +1,85 @@
+"""Tests for the network wide occupancy totals."""
+
+from __future__ import annotations
+
+import random
+from types import SimpleNamespace
+from typing import Any
+
+from custom_components.unisport.network import UnisportNetwork
+
+
+def _location(capacity: int, name: str = "Gym") -> Any:
+    return SimpleNamespace(max_capacity=capacity, name=name)
+
+
+def test_totals() -> None:
+    """Test the totals over the open locations, and the least crowded one."""
+    network = UnisportNetwork()
+    assert network.utilization is None
+    assert network.least_crowded is None
+
+    assert network.update(1, _location(100), 50, is_open=True)
+    assert network.update(2, _location(50), 10, is_open=True)
+    assert network.update(3, _location(10), 0, is_open=False)
+    assert not network.update(2, _location(50), 10, is_open=True)
+
+    assert network.total_visitors == 60
+    assert network.utilization == 40
+    assert network.least_crowded == 2
+    # Closed locations are never the least crowded
+    assert network.update(2, _location(50), 10, is_open=False)
+    assert network.least_crowded == 1
+    assert network.utilization == 50
+
+    assert network.update(1, None, 0, is_open=True)
+    assert not network.update(1, None, 0, is_open=True)
+    assert network.location_ids == {2, 3}
+    assert network.total_visitors == 10
+    assert network.least_crowded is None
+
+
+def test_random_updates() -> None:
+    """Test the incremental totals against totals computed from scratch."""
+    rng = random.Random(7)  # noqa: S311 Not for cryptographic purposes
+    network = UnisportNetwork()
+    locations: dict[int, tuple[int, int, bool]] = {}
+    for _ in range(2000):
+        location_id = rng.randrange(20)
+        if rng.random() < 0.1:
+            network.update(location_id, None, 0, is_open=False)
+            locations.pop(location_id, None)
+        else:
+            capacity = rng.randrange(0, 200)
+            visitors = rng.randrange(0, 150)
+            is_open = rng.random() < 0.7
+            network.update(location_id, _location(capacity), visitors, is_open=is_open)
+            locations[location_id] = (capacity, visitors, is_open)
+
+        open_locations = {
+            location_id: (capacity, visitors)
+            for location_id, (capacity, visitors, is_open) in locations.items()
+            if is_open
+        }
+        assert network.total_visitors == sum(
+            visitors for _, visitors, _ in locations.values()
+        )
+        assert network.open_visitors == sum(
+            visitors for _, visitors in open_locations.values()
+        )
+        assert network.open_capacity == sum(
+            capacity for capacity, _ in open_locations.values()
+        )
+        expected = min(
+            open_locations,
+            key=lambda location_id: (
+                open_locations[location_id][1] / open_locations[location_id][0]
+                if open_locations[location_id][0] > 0
+                else float(open_locations[location_id][1]),
+                location_id,
+            ),
+            default=None,
+        )
+        assert network.least_crowded == expected
+    # Outdated heap entries are dropped along the way
+    assert len(network._heap) <= 2 * len(network._open) + 16
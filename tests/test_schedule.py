@@ -0,0 +1,172 @@
+"""Tests for the weekly opening hour schedules."""
+
+from __future__ import annotations
+
+import datetime
+import random
+from typing import TYPE_CHECKING
+
+from custom_components.unisport.const import UNISPORT_TZ
+from custom_components.unisport.data import UnisportDecoder, UnisportLocationOpeningHour
+from custom_components.unisport.schedule import (
+    UnisportOpeningIndex,
+    UnisportSchedule,
+    next_local_midnight,
+)
+
+from . import LOCATIONS
+
+if TYPE_CHECKING:
+    from custom_components.unisport.data import UnisportLocation
+
+UTC = datetime.UTC
+
+
+def _schedule(start: str, end: str, weekdays: range = range(1, 8)) -> UnisportSchedule:
+    return UnisportSchedule(
+        {weekday: UnisportLocationOpeningHour(start, end) for weekday in weekdays}
+    )
+
+
+def _local(*args: int) -> datetime.datetime:
+    return UNISPORT_TZ.localize(datetime.datetime(*args))  # noqa: DTZ001
+
+
+def test_closing_at_midnight() -> None:
+    """Test that a closing time of 24:00 is midnight of the next day."""
+    schedule = _schedule("06:00:00", "24:00:00")
+    # Monday
+    day = datetime.date(2026, 1, 5)
+
+    assert schedule.get_opening_hours(day) == (
+        _local(2026, 1, 5, 6),
+        _local(2026, 1, 6, 0),
+    )
+    assert schedule.is_open(_local(2026, 1, 5, 23, 59))
+    # Closed at the closing time itself
+    assert not schedule.is_open(_local(2026, 1, 6, 0))
+    assert schedule.next_transition(_local(2026, 1, 5, 23, 59)) == (
+        _local(2026, 1, 6, 0),
+        False,
+    )
+    assert schedule.next_transition(_local(2026, 1, 6, 0)) == (
+        _local(2026, 1, 6, 6),
+        True,
+    )
+
+
+def test_today_is_the_local_day() -> None:
+    """Test that the hours of today follow the local day, not the UTC one."""
+    schedule = _schedule("06:00:00", "21:00:00", range(1, 2))
+    monday = _local(2026, 1, 5, 23, 30)
+    # Tuesday 00:30 in Helsinki, still Monday in UTC
+    tuesday = _local(2026, 1, 6, 0, 30)
+
+    assert schedule.get_opening_hours_today(monday) is not None
+    assert tuesday.astimezone(UTC).weekday() == 0
+    assert schedule.get_opening_hours_today(tuesday) is None
+    assert schedule.is_open(tuesday) is None
+
+
+def test_next_transition_skips_closed_days() -> None:
+    """Test that the next opening is found over days without hours."""
+    schedule = _schedule("07:00:00", "20:00:00", range(1, 6))
+    # Friday evening, next opening on Monday
+    friday = _local(2026, 1, 9, 20, 30)
+
+    assert schedule.next_transition(friday) == (_local(2026, 1, 12, 7), True)
+    assert _schedule("07:00:00", "20:00:00", range(0)).next_transition(friday) is None
+
+
+def test_dst_start() -> None:
+    """Test a day with a missing hour, at the start of summer time."""
+    schedule = _schedule("00:00:00", "24:00:00")
+    # Clocks go from 03:00 to 04:00 on Sunday 29 March 2026
+    opening, closing = schedule.get_opening_hours(datetime.date(2026, 3, 29))
+
+    assert closing - opening == datetime.timedelta(hours=23)
+    assert opening.utcoffset() == datetime.timedelta(hours=2)
+    assert closing.utcoffset() == datetime.timedelta(hours=3)
+
+    schedule = _schedule("06:00:00", "21:00:00")
+    saturday = _local(2026, 3, 28, 22)
+    # 06:00 summer time
+    assert schedule.next_transition(saturday) == (
+        datetime.datetime(2026, 3, 29, 3, tzinfo=UTC),
+        True,
+    )
+
+
+def test_dst_end() -> None:
+    """Test a day with an extra hour, at the end of summer time."""
+    schedule = _schedule("00:00:00", "24:00:00")
+    # Clocks go from 04:00 back to 03:00 on Sunday 25 October 2026
+    opening, closing = schedule.get_opening_hours(datetime.date(2026, 10, 25))
+
+    assert closing - opening == datetime.timedelta(hours=25)
+    assert schedule.is_open(datetime.datetime(2026, 10, 25, 0, 30, tzinfo=UTC))
+    assert schedule.is_open(datetime.datetime(2026, 10, 25, 1, 30, tzinfo=UTC))
+
+
+def test_next_local_midnight() -> None:
+    """Test the next local midnight across the DST changes."""
+    assert next_local_midnight(_local(2026, 3, 28, 12)) == datetime.datetime(
+        2026, 3, 28, 22, tzinfo=UTC
+    )
+    assert next_local_midnight(_local(2026, 3, 29, 12)) == datetime.datetime(
+        2026, 3, 29, 21, tzinfo=UTC
+    )
+    # Exactly at midnight, the next one
+    assert next_local_midnight(_local(2026, 1, 5)) == _local(2026, 1, 6)
+
+
+def test_equality_ignores_cache() -> None:
+    """Test that schedules compare by their weekly tables."""
+    first = _schedule("06:00:00", "21:00:00")
+    second = _schedule("06:00:00", "21:00:00")
+    first.get_opening_hours_today(_local(2026, 1, 5, 12))
+
+    assert first == second
+    assert hash(first) == hash(second)
+    assert first != _schedule("06:00:00", "22:00:00")
+
+
+def _brute_force_between(
+    locations: dict[int, UnisportLocation],
+    start: datetime.datetime,
+    end: datetime.datetime,
+) -> list[tuple[datetime.datetime, datetime.datetime, int]]:
+    day = start.astimezone(UNISPORT_TZ).date() - datetime.timedelta(days=1)
+    intervals = []
+    while day <= end.astimezone(UNISPORT_TZ).date():
+        for location_id, location in locations.items():
+            hours = location.schedule.get_opening_hours(day)
+            if hours is not None and hours[0] < end and hours[1] > start:
+                intervals.append((*hours, location_id))
+        day += datetime.timedelta(days=1)
+    return sorted(intervals)
+
+
+def test_opening_index_between() -> None:
+    """Test the intervals of the index against the schedules, over DST too."""
+    locations = UnisportDecoder().decode(LOCATIONS, {})["locations"]
+    index = UnisportOpeningIndex()
+    assert index.update(locations)
+    assert not index.update(dict(locations))
+    rng = random.Random(19)  # noqa: S311 Not for cryptographic purposes
+    origin = _local(2026, 3, 20)
+
+    for _ in range(300):
+        start = origin + datetime.timedelta(minutes=rng.randrange(20 * 24 * 60))
+        end = start + datetime.timedelta(minutes=rng.randrange(-60, 3 * 24 * 60))
+        assert index.between(start, end) == _brute_force_between(locations, start, end)
+
+    # Otaniemi closes at midnight: open until then, not after
+    assert index.between(_local(2026, 3, 23, 23, 59), _local(2026, 3, 24)) == [
+        (_local(2026, 3, 23, 7), _local(2026, 3, 24), 2)
+    ]
+    assert index.next_interval(_local(2026, 3, 24)) == (
+        _local(2026, 3, 24, 6),
+        _local(2026, 3, 24, 21),
+        1,
+    )
@@ -0,0 +1,139 @@
+"""Tests for serving the last good data through upstream failures."""
+
+from __future__ import annotations
+
+import datetime
+from typing import TYPE_CHECKING, Any
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.unisport.api import (
+    UnisportApiClientAuthenticationError,
+    UnisportApiClientCommunicationError,
+)
+from custom_components.unisport.const import ATTR_AGE, DOMAIN
+from custom_components.unisport.serving import (
+    BREAKER_COOLDOWN,
+    BREAKER_THRESHOLD,
+    RETRY_INITIAL_DELAY,
+    RETRY_MAX_DELAY,
+    UnisportServingClient,
+)
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .conftest import PopulartimesServer
+
+NOW = datetime.datetime(2026, 1, 5, 10, tzinfo=datetime.UTC)
+MAX_AGE = datetime.timedelta(hours=1)
+FAILURE = UnisportApiClientCommunicationError("down")
+
+
+def _serving(*results: Any) -> tuple[UnisportServingClient, AsyncMock]:
+    client = AsyncMock()
+    client.async_get_data.side_effect = results
+    return UnisportServingClient(client, max_age=MAX_AGE), client.async_get_data
+
+
+async def test_serve_stale_within_max_age() -> None:
+    """Test that failures answer None while the last good data is recent enough."""
+    serving, _ = _serving({"data": 1}, FAILURE, FAILURE, {"data": 2})
+    assert await serving.async_get_data(now=NOW) == {"data": 1}
+
+    assert await serving.async_get_data(now=NOW + MAX_AGE) is None
+    assert serving.serving_stale
+    assert serving.age(NOW + MAX_AGE) == MAX_AGE
+    with pytest.raises(UnisportApiClientCommunicationError):
+        await serving.async_get_data(now=NOW + 2 * MAX_AGE)
+
+    assert await serving.async_get_data(now=NOW + 3 * MAX_AGE) == {"data": 2}
+    assert not serving.serving_stale
+    assert serving.retry_delay() is None
+
+
+async def test_no_data_yet() -> None:
+    """Test that failures raise without data to serve."""
+    serving, _ = _serving(FAILURE)
+
+    with pytest.raises(UnisportApiClientCommunicationError):
+        await serving.async_get_data(now=NOW)
+
+
+async def test_authentication_errors_raise() -> None:
+    """Test that authentication errors are not served over."""
+    serving, _ = _serving({}, UnisportApiClientAuthenticationError("denied"))
+    await serving.async_get_data(now=NOW)
+
+    with pytest.raises(UnisportApiClientAuthenticationError):
+        await serving.async_get_data(now=NOW)
+    assert not serving.serving_stale
+
+
+async def test_retry_backoff() -> None:
+    """Test that the retry delay doubles with every failure, with jitter."""
+    serving, _ = _serving({}, *[FAILURE] * 4)
+    await serving.async_get_data(now=NOW)
+
+    for failures in range(1, 5):
+        await serving.async_get_data(now=NOW)
+        delay = RETRY_INITIAL_DELAY * 2 ** (failures - 1)
+        with patch("custom_components.unisport.serving.random.random", return_value=0):
+            assert serving.retry_delay(NOW) == delay
+        with patch("custom_components.unisport.serving.random.random", return_value=1):
+            assert serving.retry_delay(NOW) == delay / 2
+
+    serving.failures = 100
+    with patch("custom_components.unisport.serving.random.random", return_value=0):
+        assert serving.retry_delay(NOW) == RETRY_MAX_DELAY
+
+
+async def test_breaker() -> None:
+    """Test that no requests are made for a while after failures in a row."""
+    serving, get_data = _serving({}, *[FAILURE] * BREAKER_THRESHOLD, {}, {})
+    await serving.async_get_data(now=NOW)
+    for _ in range(BREAKER_THRESHOLD):
+        await serving.async_get_data(now=NOW)
+    assert serving.open_until == NOW + BREAKER_COOLDOWN
+    assert serving.retry_delay(NOW) >= BREAKER_COOLDOWN
+
+    # Held back, served stale
+    assert await serving.async_get_data(now=NOW + BREAKER_COOLDOWN / 2) is None
+    assert get_data.await_count == BREAKER_THRESHOLD + 1
+    assert serving.last_error is FAILURE
+
+    # One request once cooled down, closing the circuit
+    assert await serving.async_get_data(now=NOW + BREAKER_COOLDOWN) == {}
+    assert serving.open_until is None
+    assert get_data.await_count == BREAKER_THRESHOLD + 2
+
+
+async def test_age_attribute(
+    hass: HomeAssistant,
+    populartimes: PopulartimesServer,
+) -> None:
+    """Test that every entity has an `age` while serving stale data, until recovery."""
+    entry = MockConfigEntry(domain=DOMAIN, title="Unisport")
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = entry.runtime_data.coordinator
+    entity_ids = (
+        "sensor.unisport_kluuvi_visitors",
+        "sensor.unisport_otaniemi_capacity",
+    )
+
+    populartimes.status = 500
+    await coordinator.async_refresh()
+    for entity_id in entity_ids:
+        assert ATTR_AGE in hass.states.get(entity_id).attributes
+
+    # Recovering with the same page, which does not change any location
+    populartimes.status = 200
+    await coordinator.async_refresh()
+    for entity_id in entity_ids:
+        state = hass.states.get(entity_id)
+        assert state.state != "unavailable"
+        assert ATTR_AGE not in state.attributes
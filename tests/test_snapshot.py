@@ -0,0 +1,46 @@
+"""Tests for the persisted populartimes snapshot."""
+
+from __future__ import annotations
+
+import datetime
+from typing import TYPE_CHECKING
+
+from custom_components.unisport.data import UnisportDecoder
+from custom_components.unisport.snapshot import UnisportSnapshotStore
+
+from . import LOCATIONS
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+UPDATED = datetime.datetime(2026, 1, 5, 10, tzinfo=datetime.UTC)
+
+
+async def test_round_trip(hass: HomeAssistant) -> None:
+    """Test that a saved snapshot decodes back to the same locations."""
+    decoded = UnisportDecoder().decode(LOCATIONS, {"1": 10, "2": 20})
+    snapshots = UnisportSnapshotStore(hass, "entry")
+    assert await snapshots.async_load() is None
+
+    snapshots.async_save(decoded, UPDATED)
+    await snapshots.async_flush()
+    snapshot = await UnisportSnapshotStore(hass, "entry").async_load()
+
+    assert snapshot is not None
+    locations, live_validations, updated = snapshot
+    assert locations == LOCATIONS
+    assert updated == UPDATED
+    reloaded = UnisportDecoder().decode(locations, live_validations)
+    assert reloaded["locations"] == decoded["locations"]
+    assert dict(reloaded["live_validations"]) == {1: 10, 2: 20}
+
+
+async def test_remove(hass: HomeAssistant) -> None:
+    """Test removing the snapshot."""
+    snapshots = UnisportSnapshotStore(hass, "entry")
+    snapshots.async_save(UnisportDecoder().decode(LOCATIONS, {}), UPDATED)
+    await snapshots.async_flush()
+
+    await UnisportSnapshotStore(hass, "entry").async_remove()
+
+    assert await UnisportSnapshotStore(hass, "entry").async_load() is None
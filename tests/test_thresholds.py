@@ -0,0 +1,138 @@
+"""Tests for the occupancy thresholds."""
+
+from __future__ import annotations
+
+import datetime
+from typing import TYPE_CHECKING
+
+from pytest_homeassistant_custom_component.common import (
+    async_capture_events,
+    async_fire_time_changed,
+)
+
+from custom_components.unisport.const import EVENT_OCCUPANCY_THRESHOLD
+from custom_components.unisport.data import UnisportLocation
+from custom_components.unisport.schedule import UnisportSchedule
+from custom_components.unisport.thresholds import (
+    STATE_ABOVE,
+    STATE_BELOW,
+    UnisportThreshold,
+    UnisportThresholdEngine,
+)
+
+if TYPE_CHECKING:
+    from freezegun.api import FrozenDateTimeFactory
+    from homeassistant.core import HomeAssistant
+
+LOCATIONS = {
+    1: UnisportLocation(
+        location_id=1,
+        name="Kluuvi",
+        max_capacity=100,
+        opening_hours={},
+        schedule=UnisportSchedule({}),
+    ),
+}
+
+
+def _threshold(**config: float) -> UnisportThreshold:
+    return UnisportThreshold.from_config({"location_id": 1, **config})
+
+
+def test_side_hysteresis() -> None:
+    """Test that the side only changes past the hysteresis band."""
+    threshold = _threshold(value=50, hysteresis=5)
+
+    assert threshold.side(55, STATE_BELOW) == STATE_ABOVE
+    assert threshold.side(54, STATE_BELOW) == STATE_BELOW
+    assert threshold.side(46, STATE_ABOVE) == STATE_ABOVE
+    assert threshold.side(45, STATE_ABOVE) == STATE_ABOVE
+    assert threshold.side(44.9, STATE_ABOVE) == STATE_BELOW
+    # Without a side yet, the value alone decides
+    assert threshold.side(50, None) == STATE_ABOVE
+    assert threshold.side(49, None) == STATE_BELOW
+
+
+async def test_crossing_with_hysteresis(hass: HomeAssistant) -> None:
+    """Test that one event fires per crossing, none within the band."""
+    events = async_capture_events(hass, EVENT_OCCUPANCY_THRESHOLD)
+    engine = UnisportThresholdEngine(
+        hass, "entry", [_threshold(value=50, hysteresis=5)]
+    )
+    for visitors in (40, 52, 54, 60, 70, 48, 46, 40):
+        engine.async_evaluate([1], LOCATIONS, {1: visitors})
+    await hass.async_block_till_done()
+
+    assert [(event.data["direction"], event.data["visitors"]) for event in events] == [
+        (STATE_ABOVE, 60),
+        (STATE_BELOW, 40),
+    ]
+    assert events[0].data["measure"] == 60
+    engine.async_shutdown()
+
+
+async def test_dwell(hass: HomeAssistant, freezer: FrozenDateTimeFactory) -> None:
+    """Test that a crossing only fires once it held for the dwell time."""
+    events = async_capture_events(hass, EVENT_OCCUPANCY_THRESHOLD)
+    engine = UnisportThresholdEngine(
+        hass, "entry", [_threshold(metric="visitors", value=50, dwell=10)]
+    )
+    engine.async_evaluate([1], LOCATIONS, {1: 40})
+    engine.async_evaluate([1], LOCATIONS, {1: 60})
+    # Back before the dwell time is over
+    freezer.tick(datetime.timedelta(minutes=5))
+    engine.async_evaluate([1], LOCATIONS, {1: 40})
+    freezer.tick(datetime.timedelta(minutes=10))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert not events
+
+    # Fires at the end of the dwell time, without a refresh
+    engine.async_evaluate([1], LOCATIONS, {1: 60})
+    freezer.tick(datetime.timedelta(minutes=10))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert [event.data["direction"] for event in events] == [STATE_ABOVE]
+    engine.async_shutdown()
+
+
+async def test_restore(hass: HomeAssistant, freezer: FrozenDateTimeFactory) -> None:
+    """Test that the sides and pending crossings survive a restart."""
+    events = async_capture_events(hass, EVENT_OCCUPANCY_THRESHOLD)
+    thresholds = [
+        _threshold(metric="visitors", value=50, name="busy"),
+        _threshold(metric="visitors", value=20, dwell=10, name="filling"),
+    ]
+    engine = UnisportThresholdEngine(hass, "entry", thresholds)
+    engine.async_evaluate([1], LOCATIONS, {1: 10})
+    engine.async_evaluate([1], LOCATIONS, {1: 60})
+    await hass.async_block_till_done()
+    assert [event.data["threshold"] for event in events] == ["busy"]
+    await engine._store.async_save(engine._data_to_save())
+    engine.async_shutdown()
+
+    # Restarted 5 minutes into the dwell time of "filling"
+    freezer.tick(datetime.timedelta(minutes=5))
+    restored = UnisportThresholdEngine(hass, "entry", thresholds)
+    await restored.async_load()
+    restored.async_evaluate([1], LOCATIONS, {1: 60})
+    await hass.async_block_till_done()
+    # Neither fires again, nor starts the dwell time over
+    assert len(events) == 1
+    freezer.tick(datetime.timedelta(minutes=5))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert [event.data["threshold"] for event in events] == ["busy", "filling"]
+    restored.async_shutdown()
+
+
+async def test_restore_ignores_removed_thresholds(hass: HomeAssistant) -> None:
+    """Test that the states of thresholds no longer configured are dropped."""
+    engine = UnisportThresholdEngine(hass, "entry", [_threshold(value=50)])
+    engine.async_evaluate([1], LOCATIONS, {1: 10})
+    await engine._store.async_save(engine._data_to_save())
+
+    restored = UnisportThresholdEngine(hass, "entry", [_threshold(value=60)])
+    await restored.async_load()
+
+    assert restored._sides == {}